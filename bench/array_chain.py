@@ -0,0 +1,99 @@
+'''
+Measure arrays/sec of NumPy arrays through an Info -> NoOp chain, pickled and
+shared (see scheduler.util.arrays).
+
+A feeder process sends arrays into the exported in-port of the chain while
+the main process reads them back from its exported out-port.  Every
+connection, including the exported ones, is configured the same way.
+'''
+import sys, time, argparse
+from multiprocessing import Process
+import numpy
+import scheduler.network
+import scheduler.util.editor
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-count', type=int, help='Number of arrays to send per test.', default=10000)
+    parser.add_argument('-size', type=int, help='Size of each array, in MB.', default=1)
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def infoChain(metadata):
+    '''
+    Build an Info -> NoOp chain.
+
+    Parameters:
+        metadata - The metadata of every connection in the chain.
+    Returns:
+        A graph with an exported in-port 'IN' and out-port 'OUT'.
+    '''
+    graph = scheduler.util.editor.newGraph()
+    scheduler.util.editor.process(graph, 'info', 'Info')
+    scheduler.util.editor.process(graph, 'noop', 'NoOp')
+    scheduler.util.editor.connection(graph, 'info', 'noop')
+    scheduler.util.editor.export(graph, 'IN', 'info', isInport=True)
+    scheduler.util.editor.export(graph, 'OUT', 'noop', isInport=False)
+    scheduler.util.editor.setConnectionDefaults(graph, metadata)
+    return graph
+
+def feed(conn, size, count):
+    '''
+    Send the given number of arrays and then close the connection.
+
+    Parameters:
+        conn - The connection to send on.
+        size - The number of bytes in each array.
+        count - The number of arrays to send.
+    '''
+    array = numpy.ones(size / 8)
+    for i in range(count):
+        conn.send(array)
+    conn.close()
+
+def run(count, size, metadata):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        count - The number of arrays to send.
+        size - The number of bytes in each array.
+        metadata - The metadata of every connection in the chain.
+    Returns:
+        The number of arrays per second that made it through the chain.
+    '''
+    network = scheduler.network.new(infoChain(metadata))
+    scheduler.network.start(network)
+    inConn  = network['interface']['inports']['IN'][0]
+    outConn = network['interface']['outports']['OUT'][0]
+    feeder  = Process(target=feed, args=(inConn, size, count))
+    start   = time.time()
+    feeder.start()
+    inConn.close()
+    for i in range(count):
+        outConn.recv()
+    elapsed = time.time() - start
+    feeder.join()
+    scheduler.network.stop(network)
+    return count / elapsed
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args  = parseArgs()
+    modes = [ ('pickled', {}),
+              ('shared',  { 'arrays' : {} }) ]
+    print '{0:>8} {1:>12} {2:>10}'.format('mode', 'arrays/sec', 'MB/sec')
+    for name, metadata in modes:
+        rate = run(args.count, args.size*1024*1024, metadata)
+        print '{name:>8} {rate:>12.1f} {mb:>10.1f}'.format(name=name, rate=rate, mb=rate*args.size)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+'''
+Measure IPs/sec through a chain of NoOp processes with and without batching.
+
+The chain runs from an exported in-port, through N NoOps, to an exported
+out-port.  A feeder thread sends small IPs into the chain while the main
+thread reads them back.  Every connection, including the exported ones, is
+configured with the same batch size; 'off' means plain Pipes.
+'''
+import sys, time, argparse
+from threading import Thread
+import scheduler.network
+import scheduler.util.editor
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-length', type=int, help='Number of NoOps in the chain.', default=4)
+    parser.add_argument('-count', type=int, help='Number of IPs to send per test.', default=100000)
+    parser.add_argument('-batches', type=int, nargs='+', help='Batch sizes to test (0 for plain Pipes).', default=[0, 1, 16, 256])
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def noopChain(length, batch):
+    '''
+    Build a chain of NoOps.
+
+    Parameters:
+        length - The number of NoOps.
+        batch - The number of IPs per frame or 0 to not batch.
+    Returns:
+        A graph with an exported in-port 'IN' and out-port 'OUT'.
+    '''
+    metadata = { 'batch' : { 'count' : batch } } if batch else None
+    graph    = scheduler.util.editor.newGraph()
+    names    = [ 'noop{index}'.format(index=i) for i in range(length) ]
+    for name in names:
+        scheduler.util.editor.process(graph, name, 'NoOp')
+    for src, tgt in zip(names[:-1], names[1:]):
+        scheduler.util.editor.connection(graph, src, tgt, metadata=metadata)
+    scheduler.util.editor.export(graph, 'IN', names[0], isInport=True)
+    scheduler.util.editor.export(graph, 'OUT', names[-1], isInport=False)
+    if metadata:
+        graph['inports']['IN']['metadata']   = metadata
+        graph['outports']['OUT']['metadata'] = metadata
+    return graph
+
+def feed(conn, count):
+    '''
+    Send the given number of small IPs and then close the connection.
+
+    Parameters:
+        conn - The connection to send on.
+        count - The number of IPs to send.
+    '''
+    for i in range(count):
+        conn.send(i)
+    conn.close()
+
+def run(length, count, batch):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        length - The number of NoOps in the chain.
+        count - The number of IPs to send.
+        batch - The number of IPs per frame or 0 to not batch.
+    Returns:
+        The number of IPs per second that made it through the chain.
+    '''
+    network = scheduler.network.new(noopChain(length, batch))
+    scheduler.network.start(network)
+    outConn = network['interface']['outports']['OUT'][0]
+    feeder  = Thread(target=feed, args=(network['interface']['inports']['IN'][0], count))
+    start   = time.time()
+    feeder.start()
+    for i in range(count):
+        outConn.recv()
+    elapsed = time.time() - start
+    feeder.join()
+    scheduler.network.stop(network)
+    return count / elapsed
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args = parseArgs()
+    print '{0:>6} {1:>12}'.format('batch', 'IPs/sec')
+    for batch in args.batches:
+        print '{batch:>6} {ips:>12.0f}'.format(batch=batch if batch else 'off', ips=run(args.length, args.count, batch))
+
+if __name__ == '__main__':
+    main()
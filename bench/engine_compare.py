@@ -0,0 +1,72 @@
+'''
+Compare one OS process per graph process with the single-thread generator
+engine (see scheduler.engine) on a long chain of NoOp processes.
+
+For each engine, report:
+* startup - seconds from building the network to the first IP coming out of
+            the end of the chain.
+* IPs/sec - small IPs through the whole chain once it is running.
+'''
+import sys, time, argparse
+from threading import Thread
+import scheduler.engine
+import scheduler.network
+from batch_chain import noopChain, feed
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-nodes', type=int, help='Number of NoOps in the chain.', default=200)
+    parser.add_argument('-count', type=int, help='Number of IPs to send per test.', default=5000)
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def run(nodes, count, runtime):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        nodes - The number of NoOps in the chain.
+        count - The number of IPs to send.
+        runtime - The module that runs the graph; 'scheduler.network' or
+                  'scheduler.engine'.
+    Returns:
+        A tuple of the form (startup, IPs/sec).
+    '''
+    start   = time.time()
+    network = runtime.new(noopChain(nodes, 0))
+    runtime.start(network)
+    inConn  = network['interface']['inports']['IN'][0]
+    outConn = network['interface']['outports']['OUT'][0]
+    inConn.send(-1)
+    outConn.recv()
+    startup = time.time() - start
+    feeder  = Thread(target=feed, args=(inConn, count))
+    start   = time.time()
+    feeder.start()
+    for i in range(count):
+        outConn.recv()
+    elapsed = time.time() - start
+    feeder.join()
+    runtime.stop(network)
+    return startup, count / elapsed
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args    = parseArgs()
+    engines = [ ('process',   scheduler.network),
+                ('generator', scheduler.engine) ]
+    print '{0:>10} {1:>10} {2:>10}'.format('engine', 'startup', 'IPs/sec')
+    for name, runtime in engines:
+        startup, ips = run(args.nodes, args.count, runtime)
+        print '{name:>10} {startup:>10.2f} {ips:>10.0f}'.format(name=name, startup=startup, ips=ips)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+'''
+Measure what it costs processes to wait for their inputs.
+
+A fan-in graph is built: N exported in-ports each feed a NoOp and all the
+NoOps feed the one multi-connected in-port of a Join.  After the network
+starts, nothing is sent for a while, so every process sits in its start-up
+gate; the CPU time the network burns during that idle period is reported.
+Then one IP is sent to every in-port and the time until the Join's tuple
+arrives on the exported out-port is reported as the start latency.
+
+To get the "before" numbers, run this script against an older checkout:
+    PYTHONPATH=/path/to/old/checkout python bench/fanin_wait.py
+'''
+import os, sys, time, argparse
+import scheduler.network
+import scheduler.util.editor
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-width', type=int, help='Number of processes feeding the fan-in.', default=200)
+    parser.add_argument('-idle', type=float, help='Seconds to leave the network idle.', default=2.0)
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def fanIn(width):
+    '''
+    Build a fan-in graph.
+
+    Parameters:
+        width - The number of NoOp processes feeding the Join.
+    Returns:
+        A graph with exported in-ports 'IN0'...'IN<width-1>' and one exported
+        out-port 'OUT'.
+    '''
+    graph = scheduler.util.editor.newGraph()
+    scheduler.util.editor.process(graph, 'join', 'Join')
+    for i in range(width):
+        processName = 'noop{index}'.format(index=i)
+        scheduler.util.editor.process(graph, processName, 'NoOp')
+        scheduler.util.editor.connection(graph, processName, 'join')
+        scheduler.util.editor.export(graph, 'IN{index}'.format(index=i), processName, isInport=True)
+    scheduler.util.editor.export(graph, 'OUT', 'join', isInport=False)
+    return graph
+
+def cpuSeconds(pids):
+    '''
+    Sum the user and system CPU time used by the given processes.
+    Note: Reads '/proc' so this only works on Linux.
+
+    Parameters:
+        pids - A list of process ids.
+    Returns:
+        The CPU time in seconds.
+    '''
+    ticks = 0
+    for pid in pids:
+        try:
+            with open('/proc/{pid}/stat'.format(pid=pid)) as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except IOError:
+            continue # process already exited
+        ticks += int(fields[11]) + int(fields[12]) # utime, stime
+    return float(ticks) / os.sysconf('SC_CLK_TCK')
+
+def main():
+    '''
+    Run the benchmark and print its results.
+    '''
+    args    = parseArgs()
+    graph   = fanIn(args.width)
+    network = scheduler.network.new(graph)
+    scheduler.network.start(network)
+    pids    = [ process.pid for process in network['processes'] if getattr(process, 'pid', None) ]
+    # idle CPU
+    before  = cpuSeconds(pids)
+    time.sleep(args.idle)
+    idleCpu = cpuSeconds(pids) - before
+    # start latency
+    start = time.time()
+    for i in range(args.width):
+        network['interface']['inports']['IN{index}'.format(index=i)][0].send(i)
+    network['interface']['outports']['OUT'][0].recv()
+    latency = time.time() - start
+    scheduler.network.stop(network)
+    print 'processes          : {count}'.format(count=len(pids))
+    print 'idle period        : {secs:.2f} s'.format(secs=args.idle)
+    print 'idle CPU (total)   : {secs:.3f} s ({pct:.1f}% of one core)'.format(secs=idleCpu, pct=100.0*idleCpu/args.idle)
+    print 'start latency      : {msecs:.2f} ms'.format(msecs=1000.0*latency)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+'''
+Measure the time to the first IP of a NoOp chain as the number of processes
+grows, with processes forked from this one and from a fork server (see
+scheduler.util.forkserver).
+
+A forked process is a copy of the process that builds the network, with every
+connection of the network to close; a process of the fork server is a copy of
+a small process that has only the component library loaded, with only its own
+connections.  The fork server is started once, before the first run, by a
+network of one process; its startup time is printed on its own.
+'''
+import sys, time, argparse
+import scheduler.network
+from batch_chain import noopChain
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-processes', type=int, nargs='+', help='Numbers of NoOps in the chain.', default=[10, 100, 1000])
+    parser.add_argument('-methods', type=str, nargs='+', help='Start methods to compare.', choices=['fork', 'spawn', 'forkserver'], default=['fork', 'forkserver'])
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def run(processes, startMethod):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        processes - The number of NoOps in the chain.
+        startMethod - 'fork', 'spawn' or 'forkserver' (see
+                      scheduler.network.new()).
+    Returns:
+        The time to the first IP in seconds.
+    '''
+    graph   = noopChain(processes, 0)
+    start   = time.time()
+    network = scheduler.network.new(graph, startMethod=startMethod)
+    scheduler.network.start(network)
+    network['interface']['inports']['IN'][0].send(-1)
+    network['interface']['outports']['OUT'][0].recv()
+    elapsed = time.time() - start
+    scheduler.network.stop(network)
+    return elapsed
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args = parseArgs()
+    if 'forkserver' in args.methods:
+        print 'fork server startup: {startup:.3f}'.format(startup=run(1, 'forkserver'))
+    print '{0:>10} {1:>11} {2:>12}'.format('processes', 'method', 'first IP')
+    for processes in args.processes:
+        for startMethod in args.methods:
+            print '{processes:>10} {method:>11} {firstIP:>12.3f}'.format(processes=processes, method=startMethod, firstIP=run(processes, startMethod))
+
+if __name__ == '__main__':
+    main()
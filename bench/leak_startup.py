@@ -0,0 +1,85 @@
+'''
+Measure the startup time of a network as its number of connections grows.
+
+Every process of a network inherits every connection and closes those it does
+not use (see scheduler.util.plumber); a spawned process is handed only its
+own (see scheduler.util.spawn).  The network is a chain of Merge processes
+where each link is made of many parallel connections, so the number of
+connections grows while the number of processes stays the same.
+
+Startup is the time from building the network to the first IP coming out of
+the end of the chain.
+'''
+import sys, time, argparse
+import scheduler.network
+import scheduler.util.editor
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-processes', type=int, help='Number of Merges in the chain.', default=20)
+    parser.add_argument('-connections', type=int, nargs='+', help='Numbers of connections in the network.', default=[100, 1000, 5000])
+    parser.add_argument('-methods', type=str, nargs='+', help='Start methods to compare.', choices=['fork', 'spawn'], default=['fork', 'spawn'])
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def mergeChain(processes, connections):
+    '''
+    Build a chain of Merges with parallel connections between them.
+
+    Parameters:
+        processes - The number of Merges in the chain.
+        connections - The total number of connections in the chain.
+    Returns:
+        A graph with an exported in-port 'IN' and out-port 'OUT'.
+    '''
+    graph = scheduler.util.editor.newGraph()
+    names = [ 'merge{index}'.format(index=i) for i in range(processes) ]
+    for name in names:
+        scheduler.util.editor.process(graph, name, 'Merge')
+    width = max(1, connections / max(1, processes - 1))
+    for src, tgt in zip(names[:-1], names[1:]):
+        for i in range(width):
+            scheduler.util.editor.connection(graph, src, tgt)
+    scheduler.util.editor.export(graph, 'IN', names[0], isInport=True)
+    scheduler.util.editor.export(graph, 'OUT', names[-1], isInport=False)
+    return graph
+
+def run(processes, connections, startMethod):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        processes - The number of Merges in the chain.
+        connections - The total number of connections in the chain.
+        startMethod - 'fork' or 'spawn' (see scheduler.network.new()).
+    Returns:
+        The startup time in seconds.
+    '''
+    graph   = mergeChain(processes, connections)
+    start   = time.time()
+    network = scheduler.network.new(graph, startMethod=startMethod)
+    scheduler.network.start(network)
+    network['interface']['inports']['IN'][0].send(-1)
+    network['interface']['outports']['OUT'][0].recv()
+    elapsed = time.time() - start
+    scheduler.network.stop(network)
+    return elapsed
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args = parseArgs()
+    print '{0:>12} {1:>8} {2:>10}'.format('connections', 'method', 'startup')
+    for connections in args.connections:
+        for startMethod in args.methods:
+            print '{connections:>12} {method:>8} {startup:>10.2f}'.format(connections=connections, method=startMethod, startup=run(args.processes, connections, startMethod))
+
+if __name__ == '__main__':
+    main()
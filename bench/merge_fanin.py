@@ -0,0 +1,129 @@
+'''
+Measure the throughput and latency of a Merge with many upstream connections.
+
+N exported in-ports all land on the one in-port of a Merge whose out-port is
+exported.  A feeder thread sends time-stamped IPs round-robin across the
+in-ports while the main thread reads them back from the out-port.  Before
+the run, one IP is pushed through (so the Merge is past its start-up gate)
+and the network is left idle for a while; the CPU time used by the Merge
+process meanwhile is reported as its busy-loop overhead.
+'''
+import sys, time, argparse
+from threading import Thread
+import scheduler.network
+import scheduler.util.editor
+import fanin_wait
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-widths', type=int, nargs='+', help='Numbers of upstream connections to test.', default=[2, 16, 128])
+    parser.add_argument('-count', type=int, help='Number of IPs to send per test.', default=20000)
+    parser.add_argument('-idle', type=float, help='Seconds to leave the Merge idle.', default=1.0)
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def mergeFanIn(width):
+    '''
+    Build a graph with one Merge fed by many exported in-ports.
+
+    Parameters:
+        width - The number of connections on the Merge in-port.
+    Returns:
+        A graph with exported in-ports 'IN0'...'IN<width-1>' and one exported
+        out-port 'OUT'.
+    '''
+    graph = scheduler.util.editor.newGraph()
+    scheduler.util.editor.process(graph, 'merge', 'Merge')
+    for i in range(width):
+        scheduler.util.editor.export(graph, 'IN{index}'.format(index=i), 'merge', isInport=True)
+    scheduler.util.editor.export(graph, 'OUT', 'merge', isInport=False)
+    return graph
+
+def feed(conns, count):
+    '''
+    Send time-stamped IPs round-robin across the given connections and then
+    close them.
+
+    Parameters:
+        conns - The connections to send on.
+        count - The total number of IPs to send.
+    '''
+    for i in range(count):
+        conns[i % len(conns)].send(time.time())
+    for conn in conns:
+        conn.close()
+
+def percentile(values, fraction):
+    '''
+    Get a percentile from a sorted list of values.
+
+    Parameters:
+        values - A sorted list of numbers.
+        fraction - The percentile as a number between 0 and 1.
+    Returns:
+        The value at the given percentile.
+    '''
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def run(width, count, idle):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        width - The number of connections on the Merge in-port.
+        count - The number of IPs to send.
+        idle - The number of seconds to leave the Merge idle.
+    Returns:
+        A dict of results.
+    '''
+    network = scheduler.network.new(mergeFanIn(width))
+    scheduler.network.start(network)
+    pids    = [ process.pid for process in network['processes'] ]
+    inConns = [ network['interface']['inports']['IN{index}'.format(index=i)][0] for i in range(width) ]
+    outConn = network['interface']['outports']['OUT'][0]
+    # Get the Merge running, then leave it without data
+    inConns[0].send(time.time())
+    outConn.recv()
+    before  = fanin_wait.cpuSeconds(pids)
+    time.sleep(idle)
+    idleCpu = fanin_wait.cpuSeconds(pids) - before
+    # Note: The exported in-port connections are closed by the feeder, so
+    #       stop() finds them closed already.
+    feeder  = Thread(target=feed, args=(inConns, count))
+    start   = time.time()
+    feeder.start()
+    latencies = []
+    for i in range(count):
+        latencies.append(time.time() - outConn.recv())
+    elapsed = time.time() - start
+    feeder.join()
+    scheduler.network.stop(network)
+    latencies.sort()
+    return { 'width'      : width,
+             'ips/sec'    : count / elapsed,
+             'p50 ms'     : 1000.0 * percentile(latencies, 0.50),
+             'p99 ms'     : 1000.0 * percentile(latencies, 0.99),
+             'idle cpu %' : 100.0 * idleCpu / idle }
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args = parseArgs()
+    print '{0:>6} {1:>12} {2:>10} {3:>10} {4:>11}'.format('width', 'IPs/sec', 'p50 ms', 'p99 ms', 'idle cpu %')
+    for width in args.widths:
+        result = run(width, args.count, args.idle)
+        print '{width:>6} {ips:>12.0f} {p50:>10.3f} {p99:>10.3f} {cpu:>11.1f}'.format(width=result['width'],
+                                                                                    ips=result['ips/sec'],
+                                                                                    p50=result['p50 ms'],
+                                                                                    p99=result['p99 ms'],
+                                                                                    cpu=result['idle cpu %'])
+
+if __name__ == '__main__':
+    main()
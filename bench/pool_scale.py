@@ -0,0 +1,93 @@
+'''
+Compare one OS process per graph process with a pool of worker processes
+(see scheduler.util.pool) on a long chain of NoOp processes.
+
+For each mode, report:
+* startup - seconds from building the network to the first IP coming out of
+            the end of the chain.
+* memory  - the proportional set size (PSS) of every process of the network,
+            summed; shared pages are split between the processes sharing them.
+* IPs/sec - small IPs through the whole chain once it is running.
+'''
+import os, sys, time, argparse
+from threading import Thread
+import scheduler.network
+import scheduler.util.editor
+from batch_chain import noopChain, feed
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-nodes', type=int, help='Number of NoOps in the chain.', default=500)
+    parser.add_argument('-count', type=int, help='Number of IPs to send per test.', default=5000)
+    parser.add_argument('-workers', type=int, help='Number of workers in the pool (0 for one per core).', default=0)
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def memory(pids):
+    '''
+    Parameters:
+        pids - A list of process ids.
+    Returns:
+        The summed PSS, in MB, of the given processes.
+    '''
+    total = 0
+    for pid in pids:
+        try:
+            with open('/proc/{pid}/smaps_rollup'.format(pid=pid)) as f:
+                total += sum( int(line.split()[1]) for line in f if line.startswith('Pss:') )
+        except IOError:
+            pass # process already gone
+    return total / 1024.0
+
+def run(nodes, count, workers):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        nodes - The number of NoOps in the chain.
+        count - The number of IPs to send.
+        workers - When 'None', one OS process per NoOp. Otherwise, the
+                  number of workers in the pool.
+    Returns:
+        A tuple of the form (startup, memory, IPs/sec).
+    '''
+    start   = time.time()
+    network = scheduler.network.new(noopChain(nodes, 0), workers=workers)
+    scheduler.network.start(network)
+    inConn  = network['interface']['inports']['IN'][0]
+    outConn = network['interface']['outports']['OUT'][0]
+    inConn.send(-1)
+    outConn.recv()
+    startup = time.time() - start
+    pids    = [ os.getpid() ] + [ process.pid for process in network['processes'] if hasattr(process, 'pid') ]
+    mb      = memory(pids)
+    feeder  = Thread(target=feed, args=(inConn, count))
+    start   = time.time()
+    feeder.start()
+    for i in range(count):
+        outConn.recv()
+    elapsed = time.time() - start
+    feeder.join()
+    scheduler.network.stop(network)
+    return startup, mb, count / elapsed
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args  = parseArgs()
+    modes = [ ('process', None),
+              ('pool',    args.workers) ]
+    print '{0:>8} {1:>10} {2:>10} {3:>10}'.format('mode', 'startup', 'memory MB', 'IPs/sec')
+    for name, workers in modes:
+        startup, mb, ips = run(args.nodes, args.count, workers)
+        print '{name:>8} {startup:>10.2f} {mb:>10.1f} {ips:>10.0f}'.format(name=name, startup=startup, mb=mb, ips=ips)
+
+if __name__ == '__main__':
+    main()
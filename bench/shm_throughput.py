@@ -0,0 +1,107 @@
+'''
+Measure MB/sec of large IPs through a chain of NoOp processes over Pipes and
+over shared-memory rings.
+
+The chain runs from an exported in-port, through N NoOps, to an exported
+out-port.  A feeder process sends string IPs of the given sizes into the chain
+while the main process reads them back.  The feeder is a process, not a thread,
+since copying into a ring holds the GIL and would stall the reader.  Every connection, including the
+exported ones, uses the same transport.
+'''
+import sys, time, argparse
+from multiprocessing import Process
+import scheduler.network
+import scheduler.util.editor
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-length', type=int, help='Number of NoOps in the chain.', default=1)
+    parser.add_argument('-count', type=int, help='Number of IPs to send per test.', default=50)
+    parser.add_argument('-sizes', type=int, nargs='+', help='IP sizes to test, in MB.', default=[1, 4, 16])
+    parser.add_argument('-ring', type=int, help='Size of each shared-memory ring, in MB.', default=16)
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def noopChain(length, metadata):
+    '''
+    Build a chain of NoOps.
+
+    Parameters:
+        length - The number of NoOps.
+        metadata - The metadata of every connection in the chain.
+    Returns:
+        A graph with an exported in-port 'IN' and out-port 'OUT'.
+    '''
+    graph = scheduler.util.editor.newGraph()
+    names = [ 'noop{index}'.format(index=i) for i in range(length) ]
+    for name in names:
+        scheduler.util.editor.process(graph, name, 'NoOp')
+    for src, tgt in zip(names[:-1], names[1:]):
+        scheduler.util.editor.connection(graph, src, tgt)
+    scheduler.util.editor.export(graph, 'IN', names[0], isInport=True)
+    scheduler.util.editor.export(graph, 'OUT', names[-1], isInport=False)
+    scheduler.util.editor.setConnectionDefaults(graph, metadata)
+    return graph
+
+def feed(conn, payload, count):
+    '''
+    Send the given IP a number of times and then close the connection.
+
+    Parameters:
+        conn - The connection to send on.
+        payload - The IP to send.
+        count - The number of times to send it.
+    '''
+    for i in range(count):
+        conn.send(payload)
+    conn.close()
+
+def run(length, count, size, metadata):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        length - The number of NoOps in the chain.
+        count - The number of IPs to send.
+        size - The number of bytes in each IP.
+        metadata - The metadata of every connection in the chain.
+    Returns:
+        The number of MB per second that made it through the chain.
+    '''
+    network = scheduler.network.new(noopChain(length, metadata))
+    scheduler.network.start(network)
+    outConn = network['interface']['outports']['OUT'][0]
+    payload = 'x' * size
+    inConn  = network['interface']['inports']['IN'][0]
+    feeder  = Process(target=feed, args=(inConn, payload, count))
+    start   = time.time()
+    feeder.start()
+    inConn.close()
+    for i in range(count):
+        outConn.recv()
+    elapsed = time.time() - start
+    feeder.join()
+    scheduler.network.stop(network)
+    return count * size / elapsed / (1024*1024)
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args       = parseArgs()
+    transports = [ ('pipe', { 'transport' : 'pipe' }),
+                   ('shm',  { 'transport' : 'shm', 'shm' : { 'size' : args.ring*1024*1024 } }) ]
+    print '{0:>6} {1:>10} {2:>10}'.format('MB', 'transport', 'MB/sec')
+    for size in args.sizes:
+        for name, metadata in transports:
+            rate = run(args.length, args.count, size*1024*1024, metadata)
+            print '{size:>6} {name:>10} {rate:>10.1f}'.format(size=size, name=name, rate=rate)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+'''
+Measure the latency of one step in '-sync' mode (see scheduler.util.debug).
+
+A chain of NoOp processes is configured so every process blocks until it is
+stepped.  Instead of waiting for the 'Enter'-key, the steps are sent, all at
+once, to the exported 'STEP' in-port; so the time it takes an IP to get
+through the chain, divided by the number of processes, is the time the
+framework spends on each step.
+'''
+import sys, time, argparse
+import scheduler.network
+import scheduler.util.debug
+import scheduler.util.editor
+from batch_chain import noopChain
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-lengths', type=int, nargs='+', help='Numbers of NoOps in the chain.', default=[10, 100])
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def run(length):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        length - The number of NoOps in the chain.
+    Returns:
+        The number of seconds per step.
+    '''
+    graph = noopChain(length, 0)
+    graph = scheduler.util.debug.add(graph, stdin=False)
+    start   = time.time()
+    network = scheduler.network.new(graph)
+    scheduler.network.start(network)
+    inConn   = network['interface']['inports']['IN'][0]
+    stepConn = network['interface']['inports']['STEP'][0]
+    outConn  = network['interface']['outports']['OUT'][0]
+    inConn.send('go')
+    for i in range(length):
+        stepConn.send('step')
+    outConn.recv()
+    elapsed = time.time() - start
+    scheduler.network.stop(network)
+    return elapsed / length
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args = parseArgs()
+    print '{0:>8} {1:>12}'.format('length', 'ms/step')
+    for length in args.lengths:
+        print '{length:>8} {ms:>12.2f}'.format(length=length, ms=run(length) * 1000)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+'''
+Measure what it costs to watch IPs go through a chain of NoOp processes.
+
+For each mode, report IPs/sec of small IPs and of large IPs (a list of 10,000
+floats; costly to turn into a string):
+* off   - the default log level ('WARN'); no IP is logged or traced.
+* trace - a binary trace of every IP (see scheduler.util.trace).
+* debug - every IP logged as text at the 'DEBUG' level, to a file.
+'''
+import os, sys, time, shutil, logging, argparse, tempfile
+from threading import Thread
+import scheduler.network
+import scheduler.util.trace
+from batch_chain import noopChain
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('-length', type=int, help='Number of NoOps in the chain.', default=4)
+    parser.add_argument('-count', type=int, help='Number of IPs to send per test.', default=2000)
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def feed(conn, data, count):
+    '''
+    Send the given IP the given number of times and then close the connection.
+    '''
+    for i in range(count):
+        conn.send(data)
+    conn.close()
+
+def run(length, count, data, mode, directory):
+    '''
+    Run one benchmark.
+
+    Parameters:
+        length - The number of NoOps in the chain.
+        count - The number of IPs to send.
+        data - The IP to send.
+        mode - 'off', 'trace' or 'debug'.
+        directory - A scratch directory for logs and traces.
+    Returns:
+        The number of IPs per second that made it through the chain.
+    '''
+    if mode == 'trace':
+        scheduler.util.trace.enable(os.path.join(directory, 'trace'))
+    if mode == 'debug':
+        logging.getLogger().setLevel(logging.DEBUG)
+    network = scheduler.network.new(noopChain(length, 0))
+    scheduler.network.start(network)
+    outConn = network['interface']['outports']['OUT'][0]
+    feeder  = Thread(target=feed, args=(network['interface']['inports']['IN'][0], data, count))
+    start   = time.time()
+    feeder.start()
+    for i in range(count):
+        outConn.recv()
+    elapsed = time.time() - start
+    feeder.join()
+    scheduler.network.stop(network)
+    scheduler.util.trace.disable()
+    logging.getLogger().setLevel(logging.WARN)
+    return count / elapsed
+
+def main():
+    '''
+    Run the benchmarks and print their results.
+    '''
+    args      = parseArgs()
+    small     = 1
+    large     = [ float(i) for i in range(10000) ]
+    directory = tempfile.mkdtemp()
+    # Logs go to a file, so the 'debug' mode is not slowed down by a terminal
+    logging.basicConfig(level=logging.WARN, filename=os.path.join(directory, 'debug.log'))
+    print '{0:>6} {1:>12} {2:>12}'.format('mode', 'small IPs/s', 'large IPs/s')
+    try:
+        for mode in ['off', 'trace', 'debug']:
+            print '{mode:>6} {small:>12.0f} {large:>12.0f}'.format(mode=mode,
+                                                                   small=run(args.length, args.count * 10, small, mode, directory),
+                                                                   large=run(args.length, args.count, large, mode, directory))
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
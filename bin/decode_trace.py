@@ -0,0 +1,38 @@
+import sys
+import glob
+import os
+import argparse
+import scheduler.util.trace
+
+def parseArgs():
+    '''
+    Defines command line arguments and parses them.
+
+    Returns:
+        An object with the parsed cmd line values.
+    '''
+    parser = argparse.ArgumentParser(prog=sys.argv[0])
+    parser.add_argument('paths', type=str, nargs='+', help='Trace files, or directories of trace files, written by "run_scheduler.py -trace".')
+    parser.add_argument('-time', help='Prefix each line with its timestamp.', action="store_true")
+    args = parser.parse_args(sys.argv[1:])
+    return args
+
+def main():
+    '''
+    Print the records of the given trace files as log lines, in time order.
+    '''
+    args  = parseArgs()
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths += sorted(glob.glob(os.path.join(path, '*.trace')))
+        else:
+            paths.append(path)
+    for timestamp, line in scheduler.util.trace.decode(paths):
+        if args.time:
+            print '{time:.6f} {line}'.format(time=timestamp, line=line)
+        else:
+            print line
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,14 @@
 import sys
 import logging
 import argparse
+import scheduler.engine
 import scheduler.network
 import scheduler.util.editor
 import scheduler.util.iip
+import scheduler.util.placement
 import scheduler.util.debug
+import scheduler.util.subnet
+import scheduler.util.trace
 
 def parseArgs():
     '''
@@ -18,8 +22,16 @@ def parseArgs():
     parser.add_argument('-file', type=str, help='Graph file to run.', required=True)
     parser.add_argument('-loglevel', type=str, help='Sets the log level; which is "WARN" by default.', default="WARN")
     parser.add_argument('-logfile', type=str, help='Redirect log entries to a file.', default=None)
+    parser.add_argument('-trace', type=str, help='Write a binary trace of every IP, per process, to files in a directory (see bin/decode_trace.py).', default=None)
     parser.add_argument('-sync', help='Step over processes, one-by-one, with the "Enter" key.', action="store_true")    
     parser.add_argument('-plot', type=str, help='Write a plot of the graph to a PNG file.', default=None)
+    parser.add_argument('-engine', type=str, help='Run components as OS processes or as generators in a single thread.', choices=['process', 'generator'], default='process')
+    parser.add_argument('-workers', type=int, nargs='?', const=0, help='Run processes as threads in a pool of N worker processes (one per core if N is omitted).', default=None)
+    parser.add_argument('-start', type=str, help='Start OS processes as forks of this one ("fork") or as fresh interpreters that inherit only their own connections ("spawn") or as forks of a server with the component library loaded ("forkserver").', choices=['fork', 'spawn', 'forkserver'], default='fork')
+    parser.add_argument('-preload', type=str, nargs='+', help='Modules to import before the graph is loaded, e.g. modules that add components to the library; also imported by the fork server of "-start forkserver".', default=[])
+    parser.add_argument('-placement', type=str, help='Run processes in threads or OS processes by component name ("names") or by cost ("auto").', choices=['names', 'auto'], default='names')
+    parser.add_argument('-plan', help='Print where each process runs, and why, before running the graph.', action="store_true")
+    parser.add_argument('-transport', type=str, help='Default transport for connections: "pipe" or "shm" (shared memory).', choices=['pipe', 'shm'], default=None)
     # parse command-line args
     args = parser.parse_args(sys.argv[1:])    
     return args
@@ -50,8 +62,20 @@ def main():
     args = parseArgs()
     # Initialize logger
     setupLogging(args.loglevel, args.logfile)
+    # Trace the IPs of every process
+    if args.trace:
+        scheduler.util.trace.enable(args.trace)
+    # Import modules that add components to the library
+    for module in args.preload:
+        __import__(module)
     # Load a graph from disk
     graph = scheduler.util.editor.json2graph(args.file)
+    # Inline the graphs of SubNet processes so IPs are not relayed through
+    # an extra process at every SubNet boundary
+    graph = scheduler.util.subnet.flatten(graph)
+    # Pick the transport of connections that do not pick their own
+    if args.transport:
+        scheduler.util.editor.setConnectionDefaults(graph, {'transport' : args.transport})
     # Extract IIPs that are embedded in the 
     # graph and apply them via a special IIP-process
     graph = scheduler.util.iip.addFromGraph(graph)
@@ -60,6 +84,10 @@ def main():
     #  2) the user hitting 'Enter' the key
     if args.sync:
         graph = scheduler.util.debug.add(graph)
+    # Decide which processes run in threads and which in OS processes
+    plan = scheduler.util.placement.apply(graph, args.placement)
+    if args.plan:
+        sys.stderr.write(scheduler.util.placement.table(graph, plan)+'\n')
     # Plot the graph we are about to run
     pngFilename = args.plot
     if pngFilename:
@@ -68,11 +96,16 @@ def main():
         G = plot.json2networkx(graph, 'untitled')
         plot.networkx2png(G, pngFilename)
     # Build a network from the graph
-    network = scheduler.network.new(graph)
+    if args.engine == 'generator':
+        runtime = scheduler.engine
+        network = scheduler.engine.new(graph)
+    else:
+        runtime = scheduler.network
+        network = scheduler.network.new(graph, workers=args.workers, startMethod=args.start, preload=args.preload)
     # Run the network
-    scheduler.network.start(network)
+    runtime.start(network)
     # Tear down the network
-    scheduler.network.stop(network)    
+    runtime.stop(network)    
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
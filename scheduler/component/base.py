@@ -1,11 +1,15 @@
 import os, logging
-from multiprocessing import Manager
+from multiprocessing import Event
+import scheduler.util.placement
 import scheduler.util.plumber
+import scheduler.util.ready
+import scheduler.util.connection
+import scheduler.util.trace
 
 def isThreaded(graph, processName):
     '''
     Determine weather the given component should be started as a system-thread 
-    or a system-process.
+    or a system-process (see scheduler.util.placement).
     
     Parameters:
         graph - A graph of components connected together by data ports
@@ -13,14 +17,7 @@ def isThreaded(graph, processName):
     Returns:
         'True' if the given worker process should run in a thread or else 'False'.
     '''
-    retval = False
-    # Use leading and trailing underscores to set default threading status
-    try:
-        componentName = graph['processes'][processName]['component']
-        retval = componentName.startswith('_') and componentName.endswith('_')
-    except KeyError:
-        pass
-    return retval
+    return scheduler.util.placement.isThreaded(graph, processName)
 
 def isFramework(processName):
     '''
@@ -35,6 +32,47 @@ def isFramework(processName):
     '''
     return processName.startswith('*') and processName.endswith('*') 
 
+def isBlocking(config, eventType=None):
+    '''
+    Determine weather the given process configuration makes an event block
+    the process that sends it (see internalEvent()).
+    
+    Parameters:
+        config - Configuration data of a process (see getConfig).
+        eventType - A string representing a special internal event. When 
+                    'None', the default, any event type.
+    Returns:
+        'True' if the event blocks or else 'False'.
+    '''
+    try:
+        if eventType is None:
+            return any(config['blocking'].values())
+        return bool(config['blocking'][eventType])
+    except TypeError:
+        # No config data for this process
+        return False
+    except KeyError:
+        # No blocking info in this config data
+        return False
+
+def newBlockers(graph):
+    '''
+    Preallocate the objects that blocking events wait on (see internalEvent());
+    one per process of the given graph that has blocking events.  Created once,
+    by scheduler.network.new(), and inherited by every process of the network.
+    
+    Parameters:
+        graph - A graph of components connected together by data ports
+    Returns:
+        A dict that maps process names to a multiprocessing.Event.
+    '''
+    blockers = {}
+    for processName, process in graph['processes'].items():
+        config = process.get('metadata', {}).get('config', None)
+        if isBlocking(config):
+            blockers[processName] = Event()
+    return blockers
+
 def internalEvent(core, eventType):
     '''
     Sends a message (or event), of the given type, out of the 'events'
@@ -42,7 +80,8 @@ def internalEvent(core, eventType):
     propagate through the graph like any other information packet.   
     Note: An event can block the execution of a process, if it has been 
           configured to do so (and must then be unblocked by the receiver
-          of the event).
+          of the event).  The receiver unblocks the sender with:
+              core['blockers'][event['blocker']].set()
     
     Parameters:
         core - a dictionary of internal framework attributes
@@ -53,27 +92,20 @@ def internalEvent(core, eventType):
     event  = {'sender' : eventSender,
               'type'   : eventType}
     # Does this event have framework-blocking powers?
-    config = core['getConfig']()
-    isEventBlocking = False
-    try:
-        isEventBlocking = config['blocking'][eventType]
-    except TypeError:
-        # No config data for this process
-        pass
-    except KeyError:
-        # No blocking info in this config data
-        pass
-    # If blocking enabled for the given event type attach an object to the out 
+    isEventBlocking = isBlocking(core['getConfig'](), eventType)
+    # If blocking enabled for the given event type attach a token to the out 
     # going message that allows a recipient to unblock this process. 
     if isEventBlocking:
-        event['blocker'] = Manager().Event()
+        blocker = core['blockers'][eventSender]
+        event['blocker'] = eventSender
         core['setData']('events', event)
-        event['blocker'].wait()
+        blocker.wait()
+        blocker.clear() # ready for the next event
     # Blocking in not enabled so just send the event.
     else:
         core['setData']('events', event)
     
-def fxn(core, inports, outports, fxn, wait=True):
+def fxn(core, inports, outports, fxn, wait=True, timeout=None):
     '''
     This is canonical framework functionality for a generic component:
     * handle Pipe file descriptor leak
@@ -91,9 +123,18 @@ def fxn(core, inports, outports, fxn, wait=True):
         wait - When 'True', the default, wait for data to arrive on all
                       in-ports before starting the process. If 'False', start 
                       as soon as any data arrives on any in-port.  
+        timeout - When 'None', the default, wait forever for data to arrive.
+                  Otherwise, the maximum number of seconds to wait before 
+                  starting the component logic anyway.
     '''
     # Log that this component has started
     logging.debug('BGIN: {name}'.format(name=core['name']))
+    # Logging every IP calls str() on it, so only do it when it is seen
+    # Note: The log level is checked once, not on every IP.
+    isLogging = logging.getLogger().isEnabledFor(logging.DEBUG)
+    tracer    = scheduler.util.trace.new(core['name'], inports.keys(), outports.keys())
+    if tracer:
+        tracer.record(scheduler.util.trace.BGIN)
     
     
     FIRST_CONN = 0
@@ -105,7 +146,17 @@ def fxn(core, inports, outports, fxn, wait=True):
     # Close un-used end of Pipe connection
     processName = core['name']
     scheduler.util.plumber.closeByProcess(core['leak'], processName)
+    # Out-port connections that may hold back IPs (see scheduler.util.batch)
+    heldConns = [ conn for conns in outports.values() for conn in conns if hasattr(conn, 'flush') ]
     # Create helper functions
+    def flushFxn():
+        '''
+        Send any IPs held back by out-port connections. Called before this 
+        process blocks on an in-port, so a downstream process that this
+        process is waiting on is never left waiting on held back IPs.
+        '''
+        for conn in heldConns:
+            scheduler.util.connection.flush(conn)
     def lenAtFxn(portName, inport=True):
         '''
         Gets the number of components connected to a single port.
@@ -163,11 +214,42 @@ def fxn(core, inports, outports, fxn, wait=True):
             if not conn.poll():
                 raise ValueError('In-port {proc}.{port} not ready for recv()'.format(proc=core['name'],
                                                                                      port=inportName))
+        elif heldConns and not conn.poll():
+            flushFxn()
         data = conn.recv()
-        logging.debug('RECV: {proc}.{port} = {data}'.format(data=str(data),
-                                                            proc=core['name'],
-                                                            port=inportName))
+        if isLogging:
+            logging.debug('RECV: {proc}.{port} = {data}'.format(data=str(data),
+                                                                proc=core['name'],
+                                                                port=inportName))
+        if tracer:
+            tracer.recv(inportName, data)
         return data
+    def readyAtFxn(inportName, connIndices=None, timeout=None):
+        '''
+        Block until at least one connection on the given in-port name is
+        ready; that is, has data waiting or has been closed upstream (so the
+        next get will not block).  The process sleeps while it waits.
+
+        Parameters:
+            inportName - The name of the in-port to wait on.
+            connIndices - When 'None', the default, wait on every connection
+                          of the in-port. Otherwise, a list of indices of the
+                          connections to wait on.
+            timeout - When 'None', the default, block forever. Otherwise, the
+                      maximum number of seconds to block.
+
+        Returns:
+            A list of the indices of the ready connections, in ascending
+            order. The list is empty if the timeout expired.
+        '''
+        conns = inports.get(inportName, [])
+        if connIndices is None:
+            connIndices = range(len(conns))
+        ready = scheduler.util.ready.wait([ conns[i] for i in connIndices ], timeout=0)
+        if not ready:
+            flushFxn()
+            ready = scheduler.util.ready.wait([ conns[i] for i in connIndices ], timeout=timeout)
+        return [ i for i in connIndices if conns[i] in ready ]
     def getDataFxn(inportName, block=True):
         '''
         Assuming the given in-port name has only one connection, get the next 
@@ -190,7 +272,7 @@ def fxn(core, inports, outports, fxn, wait=True):
                                                                                                          port=inportName,
                                                                                                          count=connCount))
         return getDataAtFxn(FIRST_CONN, inportName, block=block)
-    def setDataFxn(outportName, data):
+    def setDataFxn(outportName, data, block=True):
         '''
         Send the given information packet (or data object) through the given
         out-port. If there are multiple connections, on that single port, load
@@ -202,10 +284,21 @@ def fxn(core, inports, outports, fxn, wait=True):
         Parameters:
             outportName - The name of the out-port to send data to.
             data - an information packet (or data object)
+            block - When 'True', the default, this method blocks while the
+                    connection is at capacity (see scheduler.util.capacity).
+                    If 'False', it throws an exception instead, so the
+                    caller can drop the data or send it again; the next
+                    send goes to the next connection on the port.
+        
+        Exceptions:
+            Throws a 'scheduler.util.capacity.Full' (a 'ValueError') when 
+            blocking is disabled and the connection is at capacity.  Only
+            connections with a capacity in the graph file are ever full.
         '''
-        logging.debug('SEND: {proc}.{port} = {data}'.format(data=str(data),
-                                                            proc=core['name'],
-                                                            port=outportName))
+        if isLogging:
+            logging.debug('SEND: {proc}.{port} = {data}'.format(data=str(data),
+                                                                proc=core['name'],
+                                                                port=outportName))
         try:
             # Load balance across out connection (per port) 
             numSetCalls, numConnections = state['set data count'][outportName]
@@ -218,7 +311,12 @@ def fxn(core, inports, outports, fxn, wait=True):
                                                                                         proc=core['name'],
                                                                                         port=outportName))
             return
-        conn.send(data)
+        if block or not hasattr(conn, 'highWater'):
+            conn.send(data)
+        else:
+            conn.send(data, block=False)
+        if tracer:
+            tracer.send(outportName, data)
     def getConfigFxn():
         '''
         Get the configuration data for this process.   
@@ -238,6 +336,7 @@ def fxn(core, inports, outports, fxn, wait=True):
     core['setData']   = setDataFxn
     core['getConfig'] = getConfigFxn
     core['lenAt']     = lenAtFxn
+    core['readyAt']   = readyAtFxn
     
     # Collect all in-port connections
     inportConns = []
@@ -245,14 +344,16 @@ def fxn(core, inports, outports, fxn, wait=True):
         for conn in inports[inportName]:
             inportConns.append(conn)
     # Wait for data to arrive at...
+    # Note: The process sleeps on the connection file descriptors, so waiting
+    #       costs no CPU.
     if wait:
         # ...*all* in-ports
-        while not all([conn.poll() for conn in inportConns]):
-            continue
+        isReady = scheduler.util.ready.waitAll(inportConns, timeout=timeout)
     else:
         # ...*any* single in-port connection
-        while not any([conn.poll() for conn in inportConns]):
-                continue
+        isReady = scheduler.util.ready.waitAny(inportConns, timeout=timeout)
+    if not isReady:
+        logging.info('Timed out waiting for inputs: {proc}'.format(proc=core['name']))
     # Notify listeners that this process is ready to execute
     internalEvent(core, 'ReceivedAllInputs')
 
@@ -263,6 +364,14 @@ def fxn(core, inports, outports, fxn, wait=True):
         for portName, connList in ports.items():
             for conn in connList:
                 logging.debug('CONN: [{pid}] On exit, process "{proc}" closed "{proc}.{port}".'.format(pid=os.getpid(), proc=core['name'], port=portName))        
+                if hasattr(conn, 'highWater'):
+                    logging.info('CAP : {proc}.{port} high-water mark: {count} IPs, {bytes} bytes'.format(proc=core['name'],
+                                                                                                         port=portName,
+                                                                                                         count=conn.highWater,
+                                                                                                         bytes=conn.highWaterBytes))
                 conn.close()
     # Log that this component has finished       
-    logging.debug('END : {name}'.format(name=core['name']))
\ No newline at end of file
+    logging.debug('END : {name}'.format(name=core['name']))
+    if tracer:
+        tracer.record(scheduler.util.trace.END)
+        tracer.close()
\ No newline at end of file
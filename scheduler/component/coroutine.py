@@ -0,0 +1,108 @@
+import logging
+'''
+This module defines an alternative to the component protocol of
+scheduler.component.base, for components run by scheduler.engine.
+
+A component is a generator.  Instead of calling core['getData'] and
+core['setData'], and blocking its thread (or process) until they return, it
+yields a request and the engine resumes it once the request is done:
+    data = yield getData('in')        # the next IP on the in-port
+    yield setData('out', data)        # send an IP
+Errors are thrown into the generator at the 'yield' that made the request,
+the same ones the functions of scheduler.component.base throw: an 'EOFError'
+for a get on a connection that is closed upstream, an 'IOError' for a set on a
+connection that is closed downstream.
+
+The core of a generator component has the keys 'name', 'metadata',
+'getConfig' and 'lenAt'; these do not block and are called directly.
+'''
+
+# Request types
+GET   = 'get'
+READY = 'ready'
+SET   = 'set'
+WAIT  = 'wait'
+RUN   = 'run'
+
+def getData(inportName):
+    '''
+    Request the next information packet on the given in-port, assuming it
+    has only one connection (see scheduler.component.base).
+
+    Parameters:
+        inportName - The name of the in-port to receive data from.
+    Returns:
+        A request; yielding it returns the data.
+    '''
+    return (GET, inportName, 0)
+
+def getDataAt(connIndex, inportName):
+    '''
+    Request the next information packet from one connection (of many) on the
+    given in-port.
+
+    Parameters:
+        connIndex - An index representing one, of potentially many,
+                    connections on the given in-port name.
+        inportName - The name of the in-port to get data from.
+    Returns:
+        A request; yielding it returns the data.
+    '''
+    return (GET, inportName, connIndex)
+
+def readyAt(inportName, connIndices=None):
+    '''
+    Request the connections on the given in-port that are ready; that is,
+    have data waiting or have been closed upstream.
+
+    Parameters:
+        inportName - The name of the in-port to wait on.
+        connIndices - When 'None', the default, wait on every connection
+                      of the in-port. Otherwise, a list of indices of the
+                      connections to wait on.
+    Returns:
+        A request; yielding it returns a list of the indices of the ready
+        connections, in ascending order, once there is at least one.
+    '''
+    return (READY, inportName, connIndices)
+
+def setData(outportName, data):
+    '''
+    Request that the given information packet is sent through the given
+    out-port; load balanced across its connections, as in
+    scheduler.component.base.
+
+    Parameters:
+        outportName - The name of the out-port to send data to.
+        data - an information packet (or data object)
+    Returns:
+        A request; yielding it returns once the data is sent.
+    '''
+    return (SET, outportName, data)
+
+def fxn(core, fxn, wait=True):
+    '''
+    This is canonical framework functionality for a generic generator
+    component; the counterpart of scheduler.component.base.fxn():
+    * wait for data to arrive on in-ports
+    * run component logic
+    The engine closes all in-ports and out-ports once the component is done.
+
+    Parameters:
+        core - a dictionary of internal framework attributes
+        fxn - the component logic; a generator function that takes 'core'
+        wait - When 'True', the default, wait for data to arrive on all
+               in-ports before starting the component logic. If 'False',
+               start as soon as any data arrives on any in-port.
+    Returns:
+        A generator for the engine to run.
+    '''
+    logging.debug('BGIN: {name}'.format(name=core['name']))
+    yield (WAIT, wait)
+    # Notify listeners that this process is ready to execute
+    # Note: Events can not block a generator component.
+    yield setData('events', {'sender' : core['name'],
+                             'type'   : 'ReceivedAllInputs'})
+    # Hand over to the component logic; the engine runs it in place of this
+    # generator.
+    yield (RUN, fxn(core))
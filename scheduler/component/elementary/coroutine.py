@@ -0,0 +1,176 @@
+import sys, logging
+import scheduler.component.coroutine
+from scheduler.component.coroutine import getData, getDataAt, readyAt, setData
+'''
+Generator versions of the components in scheduler.component.elementary.test,
+for scheduler.engine (see scheduler.component.coroutine).  They have the same
+names and ports, so a graph runs on either engine.
+'''
+
+def add(core):
+    '''
+    Logic for a simple 'Add' component.
+
+    Call the '+' operator on its pair of inputs.
+
+    Parameters:
+        a - A connection to receive the left addend.
+        b - A connection to receive the right addend.
+        sum - A connection to send the result of a+b.
+    '''
+    def fxn(core):
+        try:
+            a = yield getData('a')
+            b = yield getData('b')
+        except EOFError:
+            return
+        try:
+            yield setData('sum', a+b)
+        except IOError:
+            pass # downstream connection is closed
+    return scheduler.component.coroutine.fxn(core, fxn)
+
+def stdout(core):
+    '''
+    Logic for the 'StdOut' component.
+
+    Writes to standard-out.
+
+    Parameters:
+        in - Data on this port is sent to standard-out.
+    '''
+    def fxn(core):
+        while True:
+            try:
+                line = yield getData('in')
+            except EOFError:
+                break # upstream connection closed
+            sys.stdout.write(str(line)+'\n')
+            sys.stdout.flush()
+    return scheduler.component.coroutine.fxn(core, fxn)
+
+def noop(core):
+    '''
+    Logic for the 'NoOp' component.
+
+    All in-coming data is immediately sent out unmolested.
+
+    Parameters:
+        in - Anything data object.
+        out - Everything data object, that arrived on the in-port, is forwarded
+              to this out-port.
+    '''
+    def fxn(core):
+        while True:
+            try:
+                data = yield getData('in')
+            except EOFError:
+                break # upstream data source stopped
+            try:
+                yield setData('out', data)
+            except IOError:
+                break # downstream connection is closed
+    return scheduler.component.coroutine.fxn(core, fxn)
+
+def info(core):
+    '''
+    Logic for the 'Info' component.
+
+    All in-coming data is immediately sent out unmolested.
+
+    Parameters:
+        in - Anything data object.
+        out - Everything data object, that arrived on the in-port, is forwarded
+              to this out-port.
+    '''
+    def fxn(core):
+        while True:
+            try:
+                data = yield getData('in')
+            except EOFError:
+                break # upstream data source stopped
+            logging.info(str(data))
+            try:
+                yield setData('out', data)
+            except IOError:
+                break # downstream connection is closed
+    return scheduler.component.coroutine.fxn(core, fxn)
+
+def merge(core):
+    '''
+    Logic for the 'Merge' component.
+
+    Listens to multiple connections on its single in-port and forwards all
+    input data to its single output on a first-in-first-out basis. Takes one
+    IP from every ready connection, starting from a connection that rotates
+    on each pass.
+
+    Parameters:
+        in - Anything data object, from multiple source connections.
+        out - Everything data object, that arrived on the multi-connected
+              in-port, in the order it was received.
+    '''
+    def fxn(core):
+        # Connections that have not reached EOF yet
+        numConns    = core['lenAt']('in')
+        openIndices = range(numConns)
+        turn        = 0
+        while openIndices:
+            ready = yield readyAt('in', connIndices=openIndices)
+            # Serve the ready connections starting from whose turn it is
+            first = [ connIndx for connIndx in ready if connIndx >= turn ]
+            rest  = [ connIndx for connIndx in ready if connIndx <  turn ]
+            for connIndx in first + rest:
+                try:
+                    data = yield getDataAt(connIndx, 'in')
+                except EOFError:
+                    # no more data is coming
+                    openIndices.remove(connIndx)
+                    continue
+                try:
+                    yield setData('out', data)
+                except IOError:
+                    return # downstream connection is closed
+            turn = (turn + 1) % numConns
+    return scheduler.component.coroutine.fxn(core, fxn, wait=False)
+
+def join(core):
+    '''
+    Logic for the 'Join' component.
+
+    Waits for data to arrive from each connection on its single in-port, then
+    sends the data, grouped into a tuple, to the out-port and starts over.
+
+    Parameters:
+        in - Anything data object, from multiple source connections.
+        out - A tuple of data packets; one from each of the in-coming
+              connections.
+    '''
+    def fxn(core):
+        connIndices = range(core['lenAt']('in'))
+        while True:
+            group = []
+            try:
+                for connIndx in connIndices:
+                    data = yield getDataAt(connIndx, 'in')
+                    group.append(data)
+            except EOFError:
+                break # if we get an EOF from any input we're done
+            try:
+                yield setData('out', tuple(group))
+            except IOError:
+                break # downstream connection is closed
+    return scheduler.component.coroutine.fxn(core, fxn)
+
+'''
+A dictionary that maps component names to a generator function. The function
+takes a core (see scheduler.component.coroutine) and returns a generator that
+runs the component's business logic.
+'''
+library = { 'Merge'    : merge,
+            'Join'     : join,
+            'Add'      : add,
+            '_StdOut_' : stdout,
+            'Info'     : info,
+            'NoOp'     : noop,
+            '_NoOp_'   : noop }
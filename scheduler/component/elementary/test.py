@@ -2,6 +2,7 @@ import os, sys, select, logging
 import scheduler.network
 import scheduler.component.base
 import scheduler.util.editor
+import scheduler.util.subnet
 
 def add(core, inports, outports):
     '''
@@ -95,15 +96,15 @@ def noop(core, inports, outports):
               to this out-port.
     '''
     def fxn(core):
-        try:
-            data = core['getData']('in')
-        except EOFError:
-            pass # upstream data source stopped
-        else:
+        while True:
+            try:
+                data = core['getData']('in')
+            except EOFError:
+                break # upstream data source stopped
             try:
                 core['setData']('out', data)
             except IOError:
-                pass # downstream connection is closed
+                break # downstream connection is closed
     scheduler.component.base.fxn(core, inports, outports, fxn)
 
 def info(core, inports, outports):
@@ -134,38 +135,39 @@ def merge(core, inports, outports):
     '''
     Logic for the 'Merge' component.
     
-    Listens to multiple connections on its single in-port and forwards all 
-    input data to its single output on a first-in-first-out basis.   
-    
+    Listens to multiple connections on its single in-port and forwards all
+    input data to its single output on a first-in-first-out basis.
+    The process sleeps until at least one connection is ready, then takes one
+    IP from every ready connection.  The connection served first rotates on
+    each pass so a busy upstream can not starve the others.
+
     Parameters:
         in - Anything data object, from multiple source connections.
         out - Everything data object, that arrived on the multi-connected
               in-port, in the order it was received.
     '''
     def fxn(core):
-        connIndices = range(core['lenAt']('in'))
-        # Keep track of the status of every connection to this port
-        eof = [False for connIndx in connIndices]
-        while True:
-            for connIndx in connIndices:
-                if not eof[connIndx]:
-                    try:
-                        data = core['getDataAt'](connIndx, 'in', block=False)
-                    except ValueError:                        
-                        # no data on in-port
-                        continue
-                    except EOFError:
-                        # no more data is coming                        
-                        eof[connIndx] = True
-                        continue
-                    try:
-                        core['setData']('out', data)
-                    except IOError:
-                        break # downstream connection is closed
-            if all(eof):
-                # All upstream connections are closed so stop polling 
-                # for data
-                break
+        # Connections that have not reached EOF yet
+        numConns    = core['lenAt']('in')
+        openIndices = range(numConns)
+        turn        = 0
+        while openIndices:
+            ready = core['readyAt']('in', connIndices=openIndices)
+            # Serve the ready connections starting from whose turn it is
+            first = [ connIndx for connIndx in ready if connIndx >= turn ]
+            rest  = [ connIndx for connIndx in ready if connIndx <  turn ]
+            for connIndx in first + rest:
+                try:
+                    data = core['getDataAt'](connIndx, 'in')
+                except EOFError:
+                    # no more data is coming
+                    openIndices.remove(connIndx)
+                    continue
+                try:
+                    core['setData']('out', data)
+                except IOError:
+                    return # downstream connection is closed
+            turn = (turn + 1) % numConns
     scheduler.component.base.fxn(core, inports, outports, fxn, wait=False)
 
 def join(core, inports, outports):
@@ -219,10 +221,10 @@ def unblock(core, inports, outports):
                 data = core['getData']('in')
             except EOFError:
                 break
-            # unblock Event contained in tuple            
+            # unblock the process whose Event is named in the tuple
             for elem in data:
                 try:
-                    elem['blocker'].set() # unblock this Event obj
+                    core['blockers'][elem['blocker']].set() # unblock this Event obj
                 except KeyError:
                     # dict has not Event blocking object
                     pass
@@ -234,15 +236,20 @@ def subnet(core, inports, outports):
     '''
     Creates a bridge between two independent networks by forwarding IPs to the
     right ports.
+    Note: SubNets are normally inlined into their parent graph (see 
+          scheduler.util.subnet) and only run as a process when their
+          metadata sets 'flatten' to false.
     '''
     def fxn(core):
         pid        = os.getpid() # for logging
+        isLogging  = logging.getLogger().isEnabledFor(logging.DEBUG) # log every IP
         FIRST_CONN = 0           # only one connection on exported ports
         
         # All inputs are ready so create the sub-network
         # Note: We ignore any IIPs returned for the new network.
         config = core['getConfig']()
         graph  = scheduler.util.editor.json2graph(config['graph'])
+        graph  = scheduler.util.subnet.flatten(graph)
         
         # These are the open file descriptors (or connections) associated with
         # the ports on this process' external interface.  When this process 
@@ -302,9 +309,10 @@ def subnet(core, inports, outports):
                     # Forward the data from the external in-port to internal
                     # in-port.
                     conn.send(data)
-                    logging.debug('SEND: {proc}.{port} = {data} (internal)'.format(data=str(data),
-                                                                                   proc=processName,
-                                                                                   port=inportName))
+                    if isLogging:
+                        logging.debug('SEND: {proc}.{port} = {data} (internal)'.format(data=str(data),
+                                                                                       proc=processName,
+                                                                                       port=inportName))
             # Handle data exiting the sub-net via connections to out-ports on
             # internal sub-processes.
             for outportName in interface['outports'].keys():
@@ -319,9 +327,10 @@ def subnet(core, inports, outports):
                         continue
                     try:
                         data = conn.recv()
-                        logging.debug('RECV: {proc}.{port} = {data} (internal)'.format(data=str(data),
-                                                                                       proc=processName,
-                                                                                       port=outportName))                        
+                        if isLogging:
+                            logging.debug('RECV: {proc}.{port} = {data} (internal)'.format(data=str(data),
+                                                                                           proc=processName,
+                                                                                           port=outportName))
                     except EOFError:
                         # no more data is coming
                         eof[outs][outportName] = True
@@ -364,4 +373,21 @@ library = { 'Merge'    : merge,
             '_StdOut_' : stdout,
             'Info'     : info,
             'NoOp'     : noop,
-            '_NoOp_'   : noop }
\ No newline at end of file
+            '_NoOp_'   : noop }
+'''
+A dictionary that maps component names to what they cost to run (see
+scheduler.util.placement):
+* 'io'   - mostly waits on I/O.
+* 'cpu'  - does real work (or runs a whole network).
+* 'pure' - trivially cheap; forwards or combines IPs.
+'''
+costs = { 'Merge'    : 'pure',
+          'Join'     : 'pure',
+          'UnBlock'  : 'pure',
+          'SubNet'   : 'cpu',
+          'Add'      : 'pure',
+          '_StdIn_'  : 'io',
+          '_StdOut_' : 'io',
+          'Info'     : 'io',
+          'NoOp'     : 'pure',
+          '_NoOp_'   : 'pure' }
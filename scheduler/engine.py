@@ -0,0 +1,410 @@
+import logging
+from collections import deque
+from threading import Thread
+import scheduler.network
+import scheduler.component.coroutine
+import scheduler.component.elementary.coroutine
+import scheduler.util.capacity
+import scheduler.util.connection
+import scheduler.util.local
+import scheduler.util.ready
+from scheduler.component.coroutine import GET, READY, SET, WAIT, RUN
+'''
+This module runs a graph of generator components (see
+scheduler.component.coroutine) in a single thread, as an alternative to the
+one-process-per-component network of scheduler.network.
+
+Every process of the graph is a task.  The engine resumes a task with the
+result of its last request and runs it until it makes a request that can not
+be done yet (or for at most QUANTUM requests, so no task hogs the engine).
+A blocked task is resumed once one of the connections it waits on changes.
+
+Connections between tasks are in-memory Channels; IPs are handed over by
+reference.  The exported ports of the graph are in-memory connections (see
+scheduler.util.local), so the thread that calls start() and stop() can send
+and receive IPs while the engine runs.
+'''
+
+QUANTUM = 64 # requests a task may make before other tasks get a turn
+
+# How a task stopped running (see step())
+BLOCKED  = 'blocked'
+YIELDED  = 'yielded'
+FINISHED = 'finished'
+
+class Channel(object):
+    '''
+    A connection between two tasks.  Tasks blocked on the channel are woken
+    (put back on the run queue) whenever it changes.
+    '''
+    def __init__(self, runq, count=None):
+        '''
+        Parameters:
+            runq - The run queue of the engine.
+            count - When 'None', the default, the channel has no limit on the
+                    number of IPs it holds. Otherwise, its capacity in IPs.
+        '''
+        self.runq           = runq
+        self.count          = count
+        self.objs           = deque()
+        self.waiters        = set()
+        self.readerClosed   = False
+        self.writerClosed   = False
+        self.highWater      = 0
+
+    def wake(self):
+        for task in self.waiters:
+            if not task.queued:
+                task.queued = True
+                self.runq.append(task)
+        self.waiters.clear()
+
+class Reader(object):
+    '''
+    The receiving end of a Channel.
+    '''
+    def __init__(self, channel):
+        self.channel = channel
+        self.closed  = False
+
+    def poll(self):
+        return bool(self.channel.objs) or self.channel.writerClosed
+
+    def recv(self):
+        '''
+        Take the next IP off the channel. Only called when poll() is 'True'.
+
+        Exceptions:
+            Throws an 'EOFError' when the channel is empty and the sending end
+            is closed.
+        '''
+        channel = self.channel
+        if not channel.objs:
+            raise EOFError
+        if channel.count and channel.waiters:
+            channel.wake()
+        return channel.objs.popleft()
+
+    def close(self):
+        self.closed = True
+        self.channel.readerClosed = True
+        self.channel.wake()
+
+class Writer(object):
+    '''
+    The sending end of a Channel.
+    '''
+    def __init__(self, channel):
+        self.channel = channel
+        self.closed  = False
+
+    def send(self, obj, block=False):
+        '''
+        Put the given IP on the channel.
+
+        Exceptions:
+            Throws 'scheduler.util.capacity.Full' when the channel is full;
+            the engine never blocks in a send. Throws an 'IOError' when the
+            receiving end is closed.
+        '''
+        channel = self.channel
+        if channel.readerClosed:
+            raise IOError('Receiving end of the channel is closed')
+        if channel.count and len(channel.objs) >= channel.count:
+            raise scheduler.util.capacity.Full('Channel is at capacity')
+        channel.objs.append(obj)
+        if len(channel.objs) > channel.highWater:
+            channel.highWater = len(channel.objs)
+        if channel.waiters:
+            channel.wake()
+
+    @property
+    def highWater(self):
+        return self.channel.highWater
+
+    def close(self):
+        self.closed = True
+        self.channel.writerClosed = True
+        self.channel.wake()
+
+class Task(object):
+    '''
+    A process of the graph and the state the engine keeps for it.
+    '''
+    def __init__(self, name, gen, inports, outports):
+        self.name     = name
+        self.gen      = gen
+        self.inports  = inports
+        self.outports = outports
+        self.sent     = dict( (portName, 0) for portName in outports ) # round robin support
+        self.request  = None  # the request waiting to be done
+        self.queued   = False # on the run queue
+        self.finished = False
+        self.isLogging = logging.getLogger().isEnabledFor(logging.DEBUG) # log every IP
+
+def new(graph, parentProcessName='root', library=None):
+    '''
+    Given a graph, generate a set of tasks wired together by Channels.
+
+    Parameters:
+        graph - A graph of components connected together by data ports
+        parentProcessName - The name of the conceptual process that contains
+                            the given graph (see scheduler.network.new()).
+        library - When 'None', the default, use the generator components of
+                  scheduler.component.elementary.coroutine. Otherwise, a dict
+                  that maps component names to generator functions.
+    Returns:
+        A dict representing the tasks and connections of the given graph.
+        The dict is of the form:
+          { 'name'      : parentProcessName,
+            'tasks'     : listOfTasks,
+            'runq'      : runQueueOfTasks,
+            'interface' : exportedInterface,
+            'thread'    : None }
+    Exceptions:
+        Throws a 'ValueError' when a component has no generator version.
+    '''
+    library    = library or scheduler.component.elementary.coroutine.library
+    runq       = deque()
+    interfaces = {parentProcessName:{'inports':{}, 'outports':{}}}
+    for pipeIter in [scheduler.network.connectionIter(graph, metadata=True), scheduler.network.exportIter(graph, parentProcessName, metadata=True)]:
+        for srcInfo, tgtInfo, dataInfo, metadata in pipeIter:
+            srcProcessName, srcPortName = srcInfo
+            tgtProcessName, tgtPortName = tgtInfo
+            isSendingData,  data        = dataInfo
+            if parentProcessName in (srcProcessName, tgtProcessName):
+                # Crosses into the calling thread
+                tgtConn, srcConn = scheduler.util.connection.newLocal(metadata)
+            else:
+                channel = Channel(runq, count=(metadata.get('capacity', None) or {}).get('count', None))
+                tgtConn, srcConn = Reader(channel), Writer(channel)
+            logging.debug('PIPE: {srcProc}.{srcPort} -> {tgtProc}.{tgtPort}'.format(srcProc=srcProcessName,
+                                                                                    srcPort=srcPortName,
+                                                                                    tgtProc=tgtProcessName,
+                                                                                    tgtPort=tgtPortName))
+            # Build the interface of a task based on its connections
+            scrPortType = 'outports' if srcProcessName != parentProcessName else 'inports' # exported in-ports connect to internal in-ports
+            interfaces.setdefault(srcProcessName, {}).setdefault(scrPortType, {}).setdefault(str(srcPortName), []).append(srcConn)
+            tgtPortType = 'inports' if tgtProcessName != parentProcessName else 'outports' # exported out-ports connect to internal out-ports
+            interfaces.setdefault(tgtProcessName, {}).setdefault(tgtPortType, {}).setdefault(str(tgtPortName), []).append(tgtConn)
+            # Deliver IIP
+            if isSendingData:
+                srcConn.send(data)
+                srcConn.close()
+    tasks = []
+    for processName in sorted(graph['processes'].keys()):
+        componentName = graph['processes'][processName]['component']
+        if componentName not in library:
+            raise ValueError('Component "{comp}" of process "{proc}" has no generator version'.format(comp=componentName,
+                                                                                                       proc=processName))
+        interface = interfaces.setdefault(processName, {})
+        inports   = interface.setdefault('inports',  {})
+        outports  = interface.setdefault('outports', {})
+        metadata  = graph['processes'][processName].get('metadata', {})
+        core      = { 'name'      : processName,
+                      'metadata'  : metadata,
+                      'getConfig' : lambda metadata=metadata: metadata.get('config', None),
+                      'lenAt'     : lambda portName, inport=True, inports=inports, outports=outports: len((inports if inport else outports)[portName]) }
+        task = Task(processName, library[componentName](core), inports, outports)
+        task.queued = True
+        runq.append(task)
+        tasks.append(task)
+        logging.debug('PROC: {proc} ({comp})'.format(proc=processName, comp=componentName))
+    return { 'name'      : parentProcessName,
+             'tasks'     : tasks,
+             'runq'      : runq,
+             'interface' : interfaces[parentProcessName],
+             'thread'    : None }
+
+def do(task, request):
+    '''
+    Try to do the given request of the given task.
+
+    Parameters:
+        task - A Task.
+        request - A request (see scheduler.component.coroutine).
+    Returns:
+        A tuple of the form (isDone, value, exception, conns). When the
+        request is done, 'value' or 'exception' is its result.  Otherwise,
+        'conns' are the connections whose change may let it be done.
+    '''
+    kind = request[0]
+    if kind == GET:
+        _, portName, connIndex = request
+        try:
+            conn = task.inports[portName][connIndex]
+        except KeyError, e:
+            logging.info('Data requested from an unconnected port: {proc}.{port}'.format(proc=task.name, port=portName))
+            return True, None, e, None
+        if not conn.poll():
+            return False, None, None, [ conn ]
+        try:
+            data = conn.recv()
+        except EOFError, e:
+            return True, None, e, None
+        if task.isLogging:
+            logging.debug('RECV: {proc}.{port} = {data}'.format(data=str(data), proc=task.name, port=portName))
+        return True, data, None, None
+    if kind == SET:
+        _, portName, data = request
+        conns = task.outports.get(portName, None)
+        if not conns:
+            logging.info('Data ({data}) sent to unconnected port: {proc}.{port}'.format(data=str(data), proc=task.name, port=portName))
+            return True, None, None, None
+        # Load balance across out connection (per port)
+        conn = conns[task.sent[portName] % len(conns)]
+        try:
+            conn.send(data, block=False)
+        except scheduler.util.capacity.Full:
+            return False, None, None, [ conn ]
+        except IOError, e:
+            return True, None, e, None
+        task.sent[portName] += 1
+        if task.isLogging:
+            logging.debug('SEND: {proc}.{port} = {data}'.format(data=str(data), proc=task.name, port=portName))
+        return True, None, None, None
+    if kind == READY:
+        _, portName, connIndices = request
+        conns = task.inports.get(portName, [])
+        if connIndices is None:
+            connIndices = range(len(conns))
+        ready = [ i for i in connIndices if conns[i].poll() ]
+        if ready:
+            return True, ready, None, None
+        return False, None, None, [ conns[i] for i in connIndices ]
+    if kind == WAIT:
+        _, isAll = request
+        conns = [ conn for connList in task.inports.values() for conn in connList ]
+        waiting = [ conn for conn in conns if not conn.poll() ]
+        if not conns or (isAll and not waiting) or (not isAll and len(waiting) < len(conns)):
+            return True, None, None, None
+        return False, None, None, waiting
+    return True, None, ValueError('Unknown request: {request}'.format(request=request)), None
+
+def step(task, external):
+    '''
+    Run the given task until it blocks, finishes or has made QUANTUM
+    requests.
+
+    Parameters:
+        task - A Task.
+        external - A dict that maps tasks blocked on connections to the
+                   calling thread, to those connections.
+    Returns:
+        BLOCKED, YIELDED or FINISHED.
+    '''
+    value, exception = None, None
+    for i in range(QUANTUM):
+        request = task.request
+        if request is not None:
+            isDone, value, exception, conns = do(task, request)
+            if not isDone:
+                for conn in conns:
+                    if isinstance(conn, (Reader, Writer)):
+                        conn.channel.waiters.add(task)
+                    else:
+                        external.setdefault(task, []).append(conn)
+                return BLOCKED
+        try:
+            if exception is None:
+                request = task.gen.send(value)
+            else:
+                request = task.gen.throw(exception)
+            while request[0] == RUN:
+                # Continue with the component logic in place of the framework
+                task.gen = request[1]
+                request  = task.gen.next()
+        except StopIteration:
+            return FINISHED
+        except Exception:
+            logging.exception('Process "{proc}" failed'.format(proc=task.name))
+            return FINISHED
+        value, exception = None, None
+        task.request = request
+    return YIELDED
+
+def finish(task):
+    '''
+    Close all connections of the given task.
+
+    Parameters:
+        task - A Task.
+    '''
+    task.finished = True
+    for ports in [task.inports, task.outports]:
+        for portName, connList in ports.items():
+            for conn in connList:
+                if hasattr(conn, 'highWater'):
+                    logging.info('CAP : {proc}.{port} high-water mark: {count} IPs'.format(proc=task.name,
+                                                                                            port=portName,
+                                                                                            count=conn.highWater))
+                conn.close()
+    logging.debug('END : {name}'.format(name=task.name))
+
+def run(engine):
+    '''
+    Run the tasks of the given engine until all of them have finished.
+
+    Parameters:
+        engine - A dict returned from new().
+    '''
+    runq     = engine['runq']
+    alive    = len(engine['tasks'])
+    external = {}
+    switches = 0
+    while alive:
+        if external and (not runq or switches % QUANTUM == 0):
+            # Sleep on the connections to the calling thread, if there is
+            # nothing else to do.
+            # Note: A task waiting to send to the calling thread has no file
+            #       descriptor to wait on, so it tries again every so often.
+            conns     = [ conn for connList in external.values() for conn in connList ]
+            readers   = [ conn for conn in conns if not isinstance(conn, scheduler.util.local.Writer) ]
+            isWriting = len(readers) < len(conns)
+            ready     = scheduler.util.ready.wait(readers, timeout=0 if runq else (0.01 if isWriting else None))
+            for task, connList in external.items():
+                if any( conn in ready or isinstance(conn, scheduler.util.local.Writer) for conn in connList ):
+                    del external[task]
+                    if not task.queued:
+                        task.queued = True
+                        runq.append(task)
+        if not runq:
+            if not external:
+                logging.warning('ENG : {count} tasks are blocked on each other; stopping.'.format(count=alive))
+                break
+            continue
+        switches += 1
+        task = runq.popleft()
+        task.queued = False
+        if task.finished:
+            continue
+        external.pop(task, None)
+        state = step(task, external)
+        if state == FINISHED:
+            finish(task)
+            alive -= 1
+        elif state == YIELDED and not task.queued:
+            task.queued = True
+            runq.append(task)
+
+def start(engine):
+    '''
+    Run the engine in a thread of this process.
+
+    Parameters:
+        engine - A dict returned from new().
+    '''
+    engine['thread'] = Thread(target=run, args=(engine,))
+    engine['thread'].daemon = True
+    engine['thread'].start()
+
+def stop(engine):
+    '''
+    Block until all tasks have finished; see scheduler.network.stop().
+
+    Parameters:
+        engine - A dict returned from new().
+    '''
+    scheduler.network.closePortsByType(engine, isInport=True)
+    engine['thread'].join()
+    scheduler.network.closePortsByType(engine, isInport=False)
@@ -1,11 +1,16 @@
 import logging, os
-from multiprocessing import Process, Pipe
+from multiprocessing import Process
 from threading import Thread
 import scheduler.component.base
 import scheduler.component.elementary.test
+import scheduler.util.placement
 import scheduler.util.plumber
+import scheduler.util.connection
+import scheduler.util.pool
+import scheduler.util.spawn
+import scheduler.util.forkserver
 
-def connectionIter(graph, iips=True):
+def connectionIter(graph, iips=True, metadata=False):
     '''
     Iterate over both IIP and regular connections in the given graph and always
     yield a source, target and data field.  For IIPs, the source is a non-existent
@@ -17,6 +22,8 @@ def connectionIter(graph, iips=True):
         graph - A graph of components connected together by data ports
         iips - When 'True', the default, if there are IIPs in the given graph,
                yield connections for them; otherwise ignore (or skip) IIPs.
+        metadata - When 'True', append the connection's metadata (or an empty
+                   dict) to each yielded tuple. 'False' by default.
     Returns:
         A tuple representing a pipe between two processes, and the initial 
         data, if any, that should pass between them. The tuple is of the 
@@ -26,6 +33,8 @@ def connectionIter(graph, iips=True):
         * dataInfo == (isDataUsed,     data)
         Note: The data can be 'None' so 'isDataUsed' determines whether the 
               data should be stuffed into the pipe as an IIP.
+        When metadata is requested, the tuple is of the form 
+        (srcInfo, tgtInfo, dataInfo, metadata).
     '''
     for i, connection in enumerate(graph['connections']):
         # Get connection info
@@ -40,9 +49,12 @@ def connectionIter(graph, iips=True):
             srcInfo  = ('_iips_', i)
             dataInfo = (True, connection['data'])
         tgtInfo = (connection['tgt']['process'], connection['tgt']['port'])
-        yield srcInfo, tgtInfo, dataInfo
+        if metadata:
+            yield srcInfo, tgtInfo, dataInfo, connection.get('metadata', {})
+        else:
+            yield srcInfo, tgtInfo, dataInfo
 
-def exportIter(graph, parentProcessName):
+def exportIter(graph, parentProcessName, metadata=False):
     '''
     Iterate over both exported in-ports and exported out-ports in the given 
     graph and always yield a source, target and data field.  For in-ports, the
@@ -53,6 +65,8 @@ def exportIter(graph, parentProcessName):
         graph - A graph of components connected together by data ports
         parentProcessName - The name of the composite component that contains 
                             the given graph (or 'root' for a top-level network).
+        metadata - When 'True', append the exported port's metadata (or an
+                   empty dict) to each yielded tuple. 'False' by default.
     Returns:
         A tuple representing a pipe between two processes, and the initial 
         data, if any, that should pass between them. The tuple is of the 
@@ -61,6 +75,8 @@ def exportIter(graph, parentProcessName):
         * tgtInfo  == (tgtProcessName, tgtPortName)
         * dataInfo == (isDataUsed,     data)
         Note: The 'data' value is always 'None'.
+        When metadata is requested, the tuple is of the form 
+        (srcInfo, tgtInfo, dataInfo, metadata).
     '''    # Define top-level interface
     for exportType in ['inports', 'outports']:
         for exportItem in graph[exportType].items():
@@ -79,12 +95,17 @@ def exportIter(graph, parentProcessName):
             srcInfo  = (connData[srcIdx][processIdx], connData[srcIdx][portIdx])
             tgtInfo  = (connData[tgtIdx][processIdx], connData[tgtIdx][portIdx])
             dataInfo = (False, None)   
-            yield srcInfo, tgtInfo, dataInfo
+            if metadata:
+                yield srcInfo, tgtInfo, dataInfo, internalInfo.get('metadata', {})
+            else:
+                yield srcInfo, tgtInfo, dataInfo
 
-def new(graph, parentProcessName='root', iips=True, leak=None):
+def new(graph, parentProcessName='root', iips=True, leak=None, workers=None, startMethod='fork', preload=None):
     '''
     Given a graph and a component library generate a sub-network of Python
     multiprocessing Process objects wired to together with Pipe objects.
+    Note: A connection can change how its Pipe is used through its metadata
+          (see scheduler.util.connection.new).
     
     Parameters:
         graph - A graph of components connected together by data ports
@@ -99,6 +120,21 @@ def new(graph, parentProcessName='root', iips=True, leak=None):
                and stuff these data into the appropriate pipes on start-up.
         leak - A list of connections (or file descriptors) that are already 
                open for this PID.
+        workers - When 'None', the default, every process of the graph gets
+                  its own OS process (or thread). Otherwise, the processes 
+                  run as threads in a pool of this many worker processes; 0
+                  means one per core (see scheduler.util.pool).
+        startMethod - When 'fork', the default, every OS process is a fork()
+                      of this one, and closes the connections it inherits
+                      but does not use. If 'spawn', every OS process is a
+                      fresh interpreter handed only its own connections
+                      (see scheduler.util.spawn). If 'forkserver', every OS
+                      process is a fork() of a server that has the component
+                      library loaded, handed only its own connections (see
+                      scheduler.util.forkserver).
+        preload - A list of module names for the fork server to import
+                  before it forks any process (e.g. modules that add
+                  components to the library); only used with 'forkserver'.
     Returns:
         A dict representing the processes and connections of the given graph.
         The dict is of the form: 
@@ -106,7 +142,15 @@ def new(graph, parentProcessName='root', iips=True, leak=None):
             'processes' : listOfProcesses,
             'interface' : exportedInterface,
             'leak'      : leakedFileDescriptors }
+    Exceptions:
+        Throws a 'ValueError' for an unknown start method, or when the graph
+        can not be spawned (see scheduler.util.spawn).
     '''
+    isSpawning = startMethod in ('spawn', 'forkserver')
+    if startMethod not in ('fork', 'spawn', 'forkserver'):
+        raise ValueError('Unknown start method "{method}".'.format(method=startMethod))
+    if isSpawning and workers is not None:
+        raise ValueError('Spawned processes can not run in a worker pool.')
     logging.debug("NET : %s" % parentProcessName )
     # Not using default kwarg for 'leak'. Only *one* object will be created
     # and Python will try to share it with other calls of this function.
@@ -127,15 +171,31 @@ def new(graph, parentProcessName='root', iips=True, leak=None):
     #                                   'b'   : connTgtForPortB,
     #                                   'sum' : connSrcForPortSum} }
     interfaces = {parentProcessName:{'inports':{}, 'outports':{}}}
+    # A mapping of process names to the index of the worker that runs them
+    pool = {}
+    if workers is not None:
+        pool = scheduler.util.pool.assign(graph, workers)
+    # The objects that blocking events wait on; created once for the network
+    blockers = scheduler.component.base.newBlockers(graph)
+    if isSpawning and blockers:
+        raise ValueError('Spawned processes can not block on events.')
+    # Start the fork server, if need be, while the graph is built
+    if startMethod == 'forkserver':
+        scheduler.util.forkserver.server(preload)
+    # Only log IIPs when the log is seen; str() of an IIP can be costly
+    isLogging = logging.getLogger().isEnabledFor(logging.DEBUG)
     # parse connections (and build interfaces based on these connections)
-    for pipeIter in [connectionIter(graph, iips=iips), exportIter(graph, parentProcessName)]:
+    for pipeIter in [connectionIter(graph, iips=iips, metadata=True), exportIter(graph, parentProcessName, metadata=True)]:
         for pipe in pipeIter:
-            tgtConn, srcConn = Pipe()
-            
-            srcInfo, tgtInfo, dataInfo  = pipe
+            srcInfo, tgtInfo, dataInfo, metadata = pipe
             srcProcessName, srcPortName = srcInfo
             tgtProcessName, tgtPortName = tgtInfo
             isSendingData,  data        = dataInfo
+            # Processes in the same worker share memory
+            if srcProcessName in pool and pool[srcProcessName] == pool.get(tgtProcessName):
+                tgtConn, srcConn = scheduler.util.connection.newLocal(metadata)
+            else:
+                tgtConn, srcConn = scheduler.util.connection.new(metadata)
             logging.debug('PIPE: {srcProc}.{srcPort} -> {tgtProc}.{tgtPort}'.format(srcProc=srcProcessName,
                                                                                     srcPort=srcPortName,
                                                                                     tgtProc=tgtProcessName,
@@ -150,19 +210,23 @@ def new(graph, parentProcessName='root', iips=True, leak=None):
             # Deliver IIP
             if isSendingData:
                 srcConn.send(data)
-                logging.debug('SEND: {proc}.{port} = {data}'.format(data=str(data),
-                                                                    proc=srcProcessName,
-                                                                    port=srcPortName))
+                # Don't let the IIP sit in a buffer that every worker inherits
+                scheduler.util.connection.flush(srcConn)
+                if isLogging:
+                    logging.debug('SEND: {proc}.{port} = {data}'.format(data=str(data),
+                                                                        proc=srcProcessName,
+                                                                        port=srcPortName))
             # Keep track of all open connections (or leaks)
             # Note: All connections will be inherited by spawned child processes
             #       (or threads).  These leaked connections should be closed, by 
             #       the child, if they are inherited as open.
-            tgtIsThread = scheduler.component.base.isThreaded(graph, tgtProcessName)
+            tgtIsThread = scheduler.util.placement.isThreaded(graph, tgtProcessName)
             scheduler.util.plumber.append(leak, parentProcessName, tgtConn, tgtProcessName, tgtPortName, tgtIsThread, inport=True)
-            srcIsThread = scheduler.component.base.isThreaded(graph, srcProcessName)
+            srcIsThread = scheduler.util.placement.isThreaded(graph, srcProcessName)
             scheduler.util.plumber.append(leak, parentProcessName, srcConn, srcProcessName, srcPortName, srcIsThread, inport=False)
     # parse processes
     processes = []
+    members   = {} # pooled processes by worker index
     for processName in graph['processes'].keys():
         # Every process has a complete interface (even if it has no connections)         
         interfaces[processName].setdefault('inports',  {})
@@ -172,14 +236,27 @@ def new(graph, parentProcessName='root', iips=True, leak=None):
         interfaces[processName]['core']['name']     = processName
         interfaces[processName]['core']['metadata'] = graph['processes'][processName].get('metadata', {}) 
         interfaces[processName]['core']['leak']     = leak
+        interfaces[processName]['core']['blockers'] = blockers
         # Generate a process instance from a component name
         componentName = graph['processes'][processName]['component']
         fxn           = scheduler.component.elementary.test.library[componentName]
-        if scheduler.component.base.isThreaded(graph, processName):
+        if processName in pool:
+            members.setdefault(pool[processName], []).append( (processName, fxn, interfaces[processName]) )
+        elif scheduler.util.placement.isThreaded(graph, processName):
             processes.append( Thread(target=fxn, kwargs=interfaces[processName]) )
+        elif startMethod == 'forkserver':
+            processes.append( scheduler.util.forkserver.Process(processName, componentName, interfaces[processName]) )
+        elif isSpawning:
+            processes.append( scheduler.util.spawn.Process(processName, componentName, interfaces[processName]) )
         else:
             processes.append( Process(target=fxn, kwargs=interfaces[processName]) )
         logging.debug('PROC: {proc} ({comp})'.format(proc=processName, comp=componentName))
+    for index, workerMembers in sorted(members.items()):
+        workerName = 'worker{index}'.format(index=index)
+        processes.append( Process(target=scheduler.util.pool.run, kwargs={ 'name'    : workerName,
+                                                                            'members' : workerMembers,
+                                                                            'leak'    : leak }) )
+        logging.debug('PROC: {proc} ({count} processes)'.format(proc=workerName, count=len(workerMembers)))
     return { 'name'      : parentProcessName,
              'processes' : processes,
              'interface' : interfaces[parentProcessName],
@@ -0,0 +1,112 @@
+import unittest
+from threading import Thread
+import scheduler.engine
+import scheduler.util.editor
+from scheduler.component.coroutine import getData, setData
+
+def feed(conn, data):
+    for item in data:
+        conn.send(item)
+    conn.close()
+
+def run(graph, inputs):
+    '''
+    Run the given graph on the engine, sending each list of inputs to the
+    exported in-port of the same name, and collect everything that comes out
+    of the exported out-port 'OUT'.
+    '''
+    engine = scheduler.engine.new(graph)
+    scheduler.engine.start(engine)
+    feeders = [ Thread(target=feed, args=(engine['interface']['inports'][portName][0], data)) for portName, data in inputs.items() ]
+    for feeder in feeders:
+        feeder.start()
+    outputs = []
+    while True:
+        try:
+            outputs.append(engine['interface']['outports']['OUT'][0].recv())
+        except EOFError:
+            break
+    for feeder in feeders:
+        feeder.join()
+    scheduler.engine.stop(engine)
+    return outputs
+
+class TestEngine(unittest.TestCase):
+
+    def test_chain(self):
+        graph = scheduler.util.editor.newGraph()
+        names = [ 'noop{index}'.format(index=i) for i in range(100) ]
+        for name in names:
+            scheduler.util.editor.process(graph, name, 'NoOp')
+        for src, tgt in zip(names[:-1], names[1:]):
+            scheduler.util.editor.connection(graph, src, tgt)
+        scheduler.util.editor.export(graph, 'IN', names[0], isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', names[-1], isInport=False)
+        self.assertEqual(range(1000), run(graph, { 'IN' : range(1000) }))
+
+    def test_iips(self):
+        # (1+2) + (3+4)
+        graph = scheduler.util.editor.newGraph()
+        for name in ['add1', 'add2', 'add3']:
+            scheduler.util.editor.process(graph, name, 'Add')
+        scheduler.util.editor.iip(graph, 1, ('add1', 'a'))
+        scheduler.util.editor.iip(graph, 2, ('add1', 'b'))
+        scheduler.util.editor.iip(graph, 3, ('add2', 'a'))
+        scheduler.util.editor.iip(graph, 4, ('add2', 'b'))
+        scheduler.util.editor.connection(graph, ('add1', 'sum'), ('add3', 'a'))
+        scheduler.util.editor.connection(graph, ('add2', 'sum'), ('add3', 'b'))
+        scheduler.util.editor.export(graph, 'OUT', ('add3', 'sum'), isInport=False)
+        self.assertEqual([10], run(graph, {}))
+
+    def test_mergeAndJoin(self):
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'merge', 'Merge')
+        scheduler.util.editor.process(graph, 'join', 'Join')
+        scheduler.util.editor.process(graph, 'noop', 'NoOp')
+        scheduler.util.editor.export(graph, 'IN1', ('merge', 'in'), isInport=True)
+        scheduler.util.editor.export(graph, 'IN2', ('noop', 'in'), isInport=True)
+        scheduler.util.editor.connection(graph, ('noop', 'out'), ('merge', 'in'))
+        scheduler.util.editor.connection(graph, ('merge', 'out'), ('join', 'in'))
+        scheduler.util.editor.iip(graph, 'x', ('join', 'in'))
+        scheduler.util.editor.export(graph, 'OUT', ('join', 'out'), isInport=False)
+        outputs = run(graph, { 'IN1' : range(0, 50), 'IN2' : range(50, 100) })
+        # The IIP connection ends the join after one group
+        self.assertEqual(1, len(outputs))
+        self.assertEqual('x', outputs[0][1])
+        self.assertTrue(outputs[0][0] in range(100))
+
+    def test_capacity(self):
+        # A producer that would flood an unbounded channel
+        def produce(core):
+            for i in range(1000):
+                yield setData('out', i)
+        def consume(core):
+            total = 0
+            while True:
+                try:
+                    total += yield getData('in')
+                except EOFError:
+                    break
+            yield setData('out', total)
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'produce', 'Produce')
+        scheduler.util.editor.process(graph, 'consume', 'Consume')
+        scheduler.util.editor.connection(graph, ('produce', 'out'), ('consume', 'in'), metadata={ 'capacity' : { 'count' : 4 } })
+        scheduler.util.editor.export(graph, 'OUT', ('consume', 'out'), isInport=False)
+        engine = scheduler.engine.new(graph, library={ 'Produce' : produce, 'Consume' : consume })
+        scheduler.engine.run(engine)
+        self.assertEqual(sum(range(1000)), engine['interface']['outports']['OUT'][0].recv())
+        self.assertEqual(4, engine['tasks'][1].outports['out'][0].highWater)
+
+    def test_unknownComponent(self):
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'stdin', '_StdIn_')
+        self.assertRaises(ValueError, scheduler.engine.new, graph)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.test.test_engine')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
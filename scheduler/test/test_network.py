@@ -1,6 +1,8 @@
 import unittest, sys
 import scheduler.network
+import scheduler.component.base
 import scheduler.util.editor
+import scheduler.util.debug
 from multiprocessing import Pipe
 
 class TestNetwork(unittest.TestCase):
@@ -199,6 +201,53 @@ class TestNetwork(unittest.TestCase):
         # Check that all workers have terminated
         self.assertTrue( all([ not process.is_alive() for process in network['processes'] ]) )
 
+    def test_merge(self):
+        numInPorts = 3
+        numIPs     = 50
+        graph      = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'merge', 'Merge')
+        for i in range(numInPorts):
+            scheduler.util.editor.export(graph, 'IN{num}'.format(num=i), 'merge', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', 'merge', isInport=False)
+        network = scheduler.network.new(graph)
+        scheduler.network.start(network)
+        # Kick the network
+        for j in range(numIPs):
+            for i in range(numInPorts):
+                network['interface']['inports']['IN{num}'.format(num=i)][0].send((i, j))
+        scheduler.network.closePortsByType(network, isInport=True)
+        # Check that everything arrived and each connection kept its order
+        results = [ network['interface']['outports']['OUT'][0].recv() for _ in range(numIPs*numInPorts) ]
+        for i in range(numInPorts):
+            self.assertEqual(range(numIPs), [ j for k, j in results if k == i ])
+        # Check that the Merge stopped once all its upstreams closed
+        self.assertRaises(EOFError, network['interface']['outports']['OUT'][0].recv)
+        scheduler.network.stop(network)
+
+    def test_sync(self):
+        numProcesses = 3
+        graph        = scheduler.util.editor.newGraph()
+        names        = [ 'noop{num}'.format(num=i) for i in range(numProcesses) ]
+        for name in names:
+            scheduler.util.editor.process(graph, name, 'NoOp')
+        for src, tgt in zip(names[:-1], names[1:]):
+            scheduler.util.editor.connection(graph, src, tgt)
+        scheduler.util.editor.export(graph, 'IN', names[0], isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', names[-1], isInport=False)
+        graph   = scheduler.util.debug.add(graph, stdin=False)
+        # One blocker per blocking process
+        self.assertEqual(set(names), set(scheduler.component.base.newBlockers(graph).keys()))
+        network = scheduler.network.new(graph)
+        scheduler.network.start(network)
+        network['interface']['inports']['IN'][0].send('go')
+        outConn = network['interface']['outports']['OUT'][0]
+        # Every process waits for its step
+        for i in range(numProcesses):
+            self.assertFalse(outConn.poll(0.1))
+            network['interface']['inports']['STEP'][0].send('step')
+        self.assertEqual('go', outConn.recv())
+        scheduler.network.stop(network)
+
     def test_closePortsByType(self):
         tgtConn, srcConn = Pipe()
         network = { 'interface': { 'inports'  : { 'IN1'  : [srcConn] },
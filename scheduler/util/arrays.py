@@ -0,0 +1,210 @@
+import os, mmap, ctypes, weakref, tempfile
+from collections import namedtuple
+import _multiprocessing
+import numpy
+'''
+This module sends NumPy arrays between processes without pickling them.
+
+The data of an array is copied once into a shared-memory segment: an
+unlinked file in /dev/shm.  Only a small Descriptor of the array is sent over
+the Pipe, followed by the file descriptor of its segment (passed with
+SCM_RIGHTS).  The receiver maps the segment and gets an array that is a view
+on it; no copy is made.  When such an array is sent on, its segment is passed
+along as-is, so a chain of processes that forward an array copies it once.
+
+A segment is released by the kernel once every process that maps it has let
+go of every array that views it; there is no bookkeeping between processes.
+Note: Like any shared memory, a process that keeps an array after sending it
+      sees changes made to it downstream.
+
+The sending end of a connection is wrapped by a Sender and the receiving end
+by a Receiver.  Both keep the send()/recv()/poll()/fileno()/close() surface
+of a multiprocessing Connection, so component code is unchanged.
+'''
+
+'''
+Describes an array in a segment; see numpy.ndarray() for the fields.
+'''
+Descriptor = namedtuple('Descriptor', ['shape', 'dtype', 'strides', 'offset', 'size'])
+
+THRESHOLD = 64*1024 # smaller arrays are cheaper to pickle
+
+'''
+Maps the id() of the buffer of each live segment in this process to a weak
+reference to that buffer and the segment's file descriptor.
+'''
+segments = {}
+
+def directory():
+    '''
+    Returns:
+        The directory segments are created in; a RAM-backed file system if
+        there is one.
+    '''
+    if os.path.isdir('/dev/shm'):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+def newSegment(size):
+    '''
+    Create a shared-memory segment.
+
+    Parameters:
+        size - The number of bytes in the segment.
+    Returns:
+        The buffer of the segment (see mapSegment()).
+    '''
+    fd, path = tempfile.mkstemp(prefix='scheduler-', dir=directory())
+    try:
+        os.unlink(path)
+        os.ftruncate(fd, size)
+        return mapSegment(fd, size)
+    except:
+        os.close(fd)
+        raise
+
+def mapSegment(fd, size):
+    '''
+    Map a shared-memory segment into this process.
+
+    Parameters:
+        fd - The file descriptor of the segment. It is closed when the
+             returned buffer is garbage collected.
+        size - The number of bytes in the segment.
+    Returns:
+        A ctypes buffer over the segment.  Arrays that view the segment keep
+        this buffer alive.
+    '''
+    mm  = mmap.mmap(fd, size)
+    buf = (ctypes.c_char * size).from_buffer(mm)
+    key = id(buf)
+    # Note: The buffer holds on to the mapping; both go when it is collected.
+    def release(ref):
+        del segments[key]
+        os.close(fd)
+    segments[key] = (weakref.ref(buf, release), fd)
+    return buf
+
+def segmentOf(array):
+    '''
+    Find the segment an array views.
+
+    Parameters:
+        array - A NumPy array.
+    Returns:
+        The buffer of the segment or 'None' if the array is not in one.
+    '''
+    base = array.base
+    while isinstance(base, numpy.ndarray):
+        base = base.base
+    if id(base) in segments and segments[id(base)][0]() is base:
+        return base
+    return None
+
+def isShareable(obj, threshold=THRESHOLD):
+    '''
+    Check if the given IP should be sent through a segment.
+
+    Parameters:
+        obj - An information packet (or data object).
+        threshold - The minimum number of bytes in a shared array.
+    Returns:
+        'True' for NumPy arrays of plain data that hold at least 'threshold'
+        bytes.
+    '''
+    return (isinstance(obj, numpy.ndarray) and
+            not obj.dtype.hasobject and
+            obj.nbytes >= threshold)
+
+class Sender(object):
+    '''
+    The sending end of a connection that shares NumPy arrays.  Large arrays
+    travel through segments and everything else is pickled, as usual.
+    '''
+    def __init__(self, conn, threshold=THRESHOLD):
+        '''
+        Parameters:
+            conn - The sending end of a Pipe.
+            threshold - The minimum number of bytes in a shared array.
+        '''
+        self.conn      = conn
+        self.threshold = threshold
+
+    def send(self, obj):
+        '''
+        Send the given IP.
+
+        Parameters:
+            obj - An information packet (or data object).
+        '''
+        if not isShareable(obj, self.threshold):
+            self.conn.send(obj)
+            return
+        buf = segmentOf(obj)
+        if buf is None:
+            buf  = newSegment(obj.nbytes)
+            copy = numpy.ndarray(obj.shape, obj.dtype, buffer=buf)
+            copy[...] = obj
+            obj = copy
+        offset = obj.__array_interface__['data'][0] - ctypes.addressof(buf)
+        self.conn.send(Descriptor(obj.shape, obj.dtype.str, obj.strides, offset, len(buf)))
+        _multiprocessing.sendfd(self.conn.fileno(), segments[id(buf)][1])
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def closed(self):
+        return self.conn.closed
+
+    def fileno(self):
+        return self.conn.fileno()
+
+    def poll(self, timeout=0.0):
+        return self.conn.poll(timeout)
+
+    def recv(self):
+        return self.conn.recv()
+
+class Receiver(object):
+    '''
+    The receiving end of a connection that shares NumPy arrays.
+    '''
+    def __init__(self, conn):
+        '''
+        Parameters:
+            conn - The receiving end of a Pipe.
+        '''
+        self.conn = conn
+
+    def recv(self):
+        '''
+        Get the next IP.  A shared array is returned as a view on its segment.
+
+        Returns:
+            An information packet (or data object).
+        Exceptions:
+            Throws an 'EOFError' when the sending end of the Pipe is closed.
+        '''
+        obj = self.conn.recv()
+        if type(obj) is not Descriptor:
+            return obj
+        buf = mapSegment(_multiprocessing.recvfd(self.conn.fileno()), obj.size)
+        return numpy.ndarray(obj.shape, numpy.dtype(obj.dtype), buffer=buf,
+                             offset=obj.offset, strides=obj.strides)
+
+    def poll(self, timeout=0.0):
+        return self.conn.poll(timeout)
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def closed(self):
+        return self.conn.closed
+
+    def fileno(self):
+        return self.conn.fileno()
+
+    def send(self, obj):
+        self.conn.send(obj)
@@ -0,0 +1,197 @@
+import sys, logging
+from collections import deque
+from threading import Condition, Lock, Thread
+'''
+This module ships many information packets (IPs) through a Pipe as one
+frame, so sending N small IPs costs one pickle and one write (and one read)
+instead of N of each.
+
+The sending end of a connection is wrapped by a Sender and the receiving end
+by a Receiver.  Both keep the send()/recv()/poll()/fileno()/close() surface
+of a multiprocessing Connection, so component code is unchanged.  A frame is
+a list of IPs.
+'''
+
+def sizeOf(obj):
+    '''
+    Cheaply estimate the number of bytes the given IP adds to a frame.
+    Note: Strings (and other buffers) are measured exactly. Anything else is
+          measured shallowly with sys.getsizeof(), since pickling just to
+          measure would cost as much as the send being saved.
+
+    Parameters:
+        obj - An information packet (or data object).
+    Returns:
+        A number of bytes.
+    '''
+    if isinstance(obj, (str, unicode, bytearray, buffer)):
+        return len(obj)
+    return sys.getsizeof(obj)
+
+class Sender(object):
+    '''
+    The sending end of a batching connection.  IPs are buffered until there
+    are 'count' of them, they hold 'bytes' bytes, or the oldest one has waited
+    'linger' seconds; whichever comes first.  Then they are sent as one frame.
+    '''
+    def __init__(self, conn, count=64, bytes=None, linger=0.01):
+        '''
+        Parameters:
+            conn - The sending end of a Pipe.
+            count - The maximum number of IPs in a frame.
+            bytes - When 'None', the default, frames have no size limit.
+                    Otherwise, a frame is sent once its IPs hold at least
+                    this many bytes (see sizeOf()).
+            linger - When 'None', IPs wait in the buffer until it is full,
+                     flush() is called or the connection is closed.
+                     Otherwise, the maximum number of seconds an IP waits
+                     in the buffer.
+        '''
+        self.conn    = conn
+        self.count   = max(1, count)
+        self.bytes   = bytes
+        self.linger  = linger
+        self.objs    = []
+        self.size    = 0
+        self.frames  = 0     # number of frames sent
+        self.flusher = None  # started by the first send(), after any fork
+        self.lock    = Lock()
+        self.cond    = Condition(self.lock)
+
+    def send(self, obj):
+        '''
+        Buffer the given IP and send the buffer if it is full.
+
+        Parameters:
+            obj - An information packet (or data object).
+        '''
+        with self.lock:
+            self.objs.append(obj)
+            if self.bytes:
+                self.size += sizeOf(obj)
+            if len(self.objs) >= self.count or (self.bytes and self.size >= self.bytes):
+                self.sendFrame()
+            elif len(self.objs) == 1 and self.linger is not None:
+                if self.flusher is None:
+                    self.flusher = Thread(target=self.lingerLoop)
+                    self.flusher.daemon = True
+                    self.flusher.start()
+                self.cond.notify()
+
+    def lingerLoop(self):
+        '''
+        Send the buffer once the oldest IP in it has waited long enough.
+        Note: Runs on its own thread, where there is no caller to report a
+              closed downstream connection to.
+        '''
+        with self.cond:
+            while not self.conn.closed:
+                if not self.objs:
+                    self.cond.wait()
+                    continue
+                frame = self.frames
+                self.cond.wait(self.linger)
+                if frame != self.frames or self.conn.closed:
+                    continue # already sent
+                try:
+                    self.sendFrame()
+                except IOError:
+                    logging.debug('BTCH: Downstream connection closed; dropped a batch.')
+                    return
+
+    def flush(self):
+        '''
+        Send every buffered IP now.
+        '''
+        with self.lock:
+            self.sendFrame()
+
+    def sendFrame(self):
+        '''
+        Send the buffered IPs as one frame.
+        Note: The caller must hold the lock.
+        '''
+        if not self.objs:
+            return
+        objs, self.objs = self.objs, []
+        self.size    = 0
+        self.frames += 1
+        self.conn.send(objs)
+
+    def close(self):
+        '''
+        Send any buffered IPs and then close the connection.
+        '''
+        with self.lock:
+            try:
+                if not self.conn.closed:
+                    self.sendFrame()
+            finally:
+                self.conn.close()
+                self.cond.notify()
+
+    @property
+    def closed(self):
+        return self.conn.closed
+
+    def fileno(self):
+        return self.conn.fileno()
+
+    def poll(self, timeout=0.0):
+        return self.conn.poll(timeout)
+
+    def recv(self):
+        return self.conn.recv()
+
+class Receiver(object):
+    '''
+    The receiving end of a batching connection.  Frames are unpacked into a
+    local buffer and recv() hands out one IP at a time.
+    '''
+    def __init__(self, conn):
+        '''
+        Parameters:
+            conn - The receiving end of a Pipe.
+        '''
+        self.conn = conn
+        self.objs = deque()
+
+    def recv(self):
+        '''
+        Get the next IP, reading a frame from the Pipe if the local buffer is
+        empty.
+
+        Returns:
+            An information packet (or data object).
+        Exceptions:
+            Throws an 'EOFError' when the buffer is empty and the sending end
+            of the Pipe is closed.
+        '''
+        if not self.objs:
+            self.objs.extend(self.conn.recv())
+        return self.objs.popleft()
+
+    @property
+    def buffered(self):
+        '''
+        The number of IPs that were received, but not handed out yet.
+        Note: These IPs are not visible to select() or poll() on the file
+              descriptor. See scheduler.util.ready.wait().
+        '''
+        return len(self.objs)
+
+    def poll(self, timeout=0.0):
+        return bool(self.objs) or self.conn.poll(timeout)
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def closed(self):
+        return self.conn.closed
+
+    def fileno(self):
+        return self.conn.fileno()
+
+    def send(self, obj):
+        self.conn.send(obj)
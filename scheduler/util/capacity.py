@@ -0,0 +1,217 @@
+import errno
+from collections import deque
+import scheduler.util.batch
+'''
+This module bounds the number of information packets (IPs), and/or bytes,
+that can be in flight on a connection; its capacity, in FBP terms.  Without
+it, a connection holds whatever the OS socket buffer behind the Pipe allows.
+
+The receiving end tells the sending end how many IPs it has taken off the
+connection by sending a count back through the same (duplex) Pipe.  The
+sending end keeps track of what is in flight and, when the connection is
+full, blocks until the receiving end takes something off it or, if asked not
+to block, throws 'Full'.
+
+The sending end of a connection is wrapped by a Sender and the receiving end
+by a Receiver.  Both keep the send()/recv()/poll()/fileno()/close() surface
+of a multiprocessing Connection, so component code is unchanged.
+'''
+
+class Full(ValueError):
+    '''
+    Thrown by a non-blocking send on a connection that is at capacity.
+    '''
+    pass
+
+class Sender(object):
+    '''
+    The sending end of a connection with a capacity.
+    '''
+    def __init__(self, conn, count=None, bytes=None):
+        '''
+        Parameters:
+            conn - The sending end of a duplex Pipe (or of a wrapper around
+                   one, see scheduler.util.connection.new).
+            count - When 'None', the default, there is no limit on the number
+                    of IPs in flight. Otherwise, the maximum number of IPs.
+            bytes - When 'None', the default, there is no limit on the bytes
+                    in flight. Otherwise, the maximum number of bytes (see
+                    scheduler.util.batch.sizeOf()).  A single IP larger than
+                    this is let through when the connection is empty.
+        '''
+        self.conn           = conn
+        self.count          = count
+        self.bytes          = bytes
+        self.inFlight       = 0
+        self.inFlightBytes  = 0
+        self.sizes          = deque() # bytes of each IP in flight
+        self.highWater      = 0       # most IPs ever in flight
+        self.highWaterBytes = 0       # most bytes ever in flight
+
+    def send(self, obj, block=True):
+        '''
+        Send the given IP, once there is room for it on the connection.
+
+        Parameters:
+            obj - An information packet (or data object).
+            block - When 'True', the default, wait while the connection is
+                    full. If 'False', throw 'Full' instead.
+        Exceptions:
+            Throws 'Full' when blocking is disabled and the connection is
+            full. Throws an 'IOError' when the receiving end is closed.
+        '''
+        size = scheduler.util.batch.sizeOf(obj) if self.bytes else 0
+        self.takeCredit()
+        while self.isFull(size):
+            if not block:
+                raise Full('Connection is at capacity: {count} IPs, {bytes} bytes'.format(count=self.inFlight,
+                                                                                          bytes=self.inFlightBytes))
+            self.waitForCredit()
+        self.conn.send(obj)
+        self.inFlight += 1
+        self.highWater = max(self.highWater, self.inFlight)
+        if self.bytes:
+            self.sizes.append(size)
+            self.inFlightBytes += size
+            self.highWaterBytes = max(self.highWaterBytes, self.inFlightBytes)
+
+    def isFull(self, size):
+        '''
+        Check if an IP of the given size would go over capacity.
+
+        Parameters:
+            size - The number of bytes in the IP.
+        Returns:
+            'True' if the IP has to wait.
+        '''
+        if self.count and self.inFlight >= self.count:
+            return True
+        return bool(self.bytes and self.inFlight and self.inFlightBytes + size > self.bytes)
+
+    def credit(self, taken):
+        '''
+        Account for IPs the receiving end has taken off the connection.
+
+        Parameters:
+            taken - A number of IPs.
+        '''
+        self.inFlight -= taken
+        if self.bytes:
+            for i in range(taken):
+                self.inFlightBytes -= self.sizes.popleft()
+
+    def takeCredit(self):
+        '''
+        Account for every count the receiving end has sent back so far.
+        '''
+        try:
+            while self.conn.poll():
+                self.credit(self.conn.recv())
+        except EOFError:
+            pass # receiving end is closed; the next send will tell
+
+    def waitForCredit(self):
+        '''
+        Sleep until the receiving end takes IPs off the connection.
+
+        Exceptions:
+            Throws an 'IOError' when the receiving end is closed.
+        '''
+        # IPs held back by a wrapped connection can not be taken off it
+        self.flush()
+        try:
+            self.credit(self.conn.recv())
+        except EOFError:
+            raise IOError(errno.EPIPE, 'Receiving end of the connection is closed')
+
+    def flush(self):
+        if hasattr(self.conn, 'flush'):
+            self.conn.flush()
+
+    def close(self):
+        '''
+        Close the connection.
+        Note: Counts left unread would make the receiving end see a reset
+              connection, instead of end-of-file, once it runs dry.
+        '''
+        if not self.conn.closed:
+            try:
+                self.takeCredit()
+            except IOError:
+                pass
+        self.conn.close()
+
+    @property
+    def closed(self):
+        return self.conn.closed
+
+    def fileno(self):
+        return self.conn.fileno()
+
+    def poll(self, timeout=0.0):
+        return self.conn.poll(timeout)
+
+    def recv(self):
+        return self.conn.recv()
+
+class Receiver(object):
+    '''
+    The receiving end of a connection with a capacity.
+    '''
+    def __init__(self, conn, count=None):
+        '''
+        Parameters:
+            conn - The receiving end of a duplex Pipe (or of a wrapper around
+                   one, see scheduler.util.connection.new).
+            count - The capacity of the connection in IPs, if it has one.
+                    Used to send counts back in fewer, larger messages.
+        '''
+        self.conn      = conn
+        self.threshold = max(1, count / 2) if count else 64
+        self.taken     = 0 # IPs taken, but not counted back yet
+
+    def recv(self):
+        '''
+        Get the next IP.  The sending end is told about it once half the
+        capacity has been taken or the connection runs dry.
+
+        Returns:
+            An information packet (or data object).
+        Exceptions:
+            Throws an 'EOFError' when the sending end is closed.
+        '''
+        try:
+            obj = self.conn.recv()
+        except IOError, e:
+            if e.errno != errno.ECONNRESET:
+                raise
+            # The sending end closed before reading the last count back
+            raise EOFError
+        self.taken += 1
+        if self.taken >= self.threshold or not self.conn.poll():
+            try:
+                self.conn.send(self.taken)
+            except IOError:
+                pass # sending end is closed; it does not need the count
+            self.taken = 0
+        return obj
+
+    @property
+    def buffered(self):
+        return getattr(self.conn, 'buffered', 0)
+
+    def poll(self, timeout=0.0):
+        return self.conn.poll(timeout)
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def closed(self):
+        return self.conn.closed
+
+    def fileno(self):
+        return self.conn.fileno()
+
+    def send(self, obj):
+        self.conn.send(obj)
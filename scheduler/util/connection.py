@@ -0,0 +1,112 @@
+from multiprocessing import Pipe
+import scheduler.util.arrays
+import scheduler.util.batch
+import scheduler.util.capacity
+import scheduler.util.local
+import scheduler.util.ring
+'''
+This module builds the two ends of a connection between a pair of ports.  By
+default, a connection is a plain multiprocessing.Pipe.  A connection in a
+graph file can ask for a different transport in its metadata.
+Example:
+    { "src"      : { "process" : "proc1", "port" : "out" },
+      "tgt"      : { "process" : "proc2", "port" : "in" },
+      "metadata" : { "transport" : "shm",
+                     "shm"       : { "size" : 16777216 },
+                     "batch"     : { "count" : 256, "bytes" : 65536, "linger" : 0.01 } } }
+    { "src"      : { "process" : "proc2", "port" : "out" },
+      "tgt"      : { "process" : "proc3", "port" : "in" },
+      "metadata" : { "arrays"    : { "threshold" : 65536 },
+                     "capacity"  : { "count" : 100, "bytes" : 1048576 } } }
+'''
+
+'''
+A dictionary that maps transport names to a function object. The function
+takes the connection's metadata and returns the two ends of a connection
+in the form (tgtConn, srcConn).
+'''
+transports = { 'pipe' : lambda metadata: Pipe(),
+               'shm'  : lambda metadata: scheduler.util.ring.Pipe(size=metadata.get('shm', {}).get('size', scheduler.util.ring.SIZE)) }
+
+def new(metadata=None):
+    '''
+    Create both ends of a connection.
+
+    Parameters:
+        metadata - When 'None', the default, create a plain Pipe. Otherwise,
+                   the metadata of a connection from a graph file.
+                   Supported keys:
+                   * 'transport' - The name of a transport in 'transports';
+                                   'pipe' by default. 'shm' is a shared-memory
+                                   ring (see scheduler.util.ring), sized by
+                                   the optional key 'shm': { 'size' : bytes }.
+                   * 'batch' - Ship IPs in frames (see scheduler.util.batch).
+                               A dict with the optional keys 'count', 'bytes'
+                               and 'linger'.
+                   * 'arrays' - Share NumPy arrays instead of pickling them
+                                (see scheduler.util.arrays). A dict, which
+                                may be empty, with the optional key
+                                'threshold'. Only for plain, unbatched Pipes.
+                   * 'capacity' - Bound the IPs in flight (see
+                                  scheduler.util.capacity). A dict with the
+                                  optional keys 'count' and 'bytes'. Not for
+                                  'shm', which is bounded by its size.
+    Returns:
+        A tuple of the form (tgtConn, srcConn) where the target process
+        receives from 'tgtConn' and the source process sends on 'srcConn'.
+    Exceptions:
+        Throws a 'ValueError' when the metadata asks for options that do not
+        work together.
+    '''
+    metadata  = metadata or {}
+    transport = metadata.get('transport', 'pipe')
+    tgtConn, srcConn = transports[transport](metadata)
+    arrays = metadata.get('arrays', None)
+    batch  = metadata.get('batch', None)
+    if arrays is not None:
+        if transport != 'pipe' or batch:
+            raise ValueError('Shared arrays need a plain Pipe, not: {metadata}'.format(metadata=metadata))
+        tgtConn = scheduler.util.arrays.Receiver(tgtConn)
+        srcConn = scheduler.util.arrays.Sender(srcConn,
+                                               threshold=arrays.get('threshold', scheduler.util.arrays.THRESHOLD))
+    if batch:
+        tgtConn = scheduler.util.batch.Receiver(tgtConn)
+        srcConn = scheduler.util.batch.Sender(srcConn,
+                                              count=batch.get('count', 64),
+                                              bytes=batch.get('bytes', None),
+                                              linger=batch.get('linger', 0.01))
+    capacity = metadata.get('capacity', None)
+    if capacity:
+        if transport != 'pipe':
+            raise ValueError('A capacity needs a Pipe, not: {metadata}'.format(metadata=metadata))
+        tgtConn = scheduler.util.capacity.Receiver(tgtConn, count=capacity.get('count', None))
+        srcConn = scheduler.util.capacity.Sender(srcConn,
+                                                 count=capacity.get('count', None),
+                                                 bytes=capacity.get('bytes', None))
+    return tgtConn, srcConn
+
+def newLocal(metadata=None):
+    '''
+    Create both ends of a connection between two threads of one process (see
+    scheduler.util.local).  Only the 'capacity' of the given metadata applies;
+    the other keys of new() are about getting IPs across processes.
+
+    Parameters:
+        metadata - When 'None', the default, the connection is unbounded.
+                   Otherwise, the metadata of a connection from a graph file.
+    Returns:
+        A tuple of the form (tgtConn, srcConn); see new().
+    '''
+    capacity = (metadata or {}).get('capacity', None) or {}
+    return scheduler.util.local.Pipe(count=capacity.get('count', None),
+                                     bytes=capacity.get('bytes', None))
+
+def flush(conn):
+    '''
+    Send anything the given connection is holding back.
+
+    Parameters:
+        conn - The sending end of a connection built by new().
+    '''
+    if hasattr(conn, 'flush'):
+        conn.flush()
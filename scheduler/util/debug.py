@@ -4,7 +4,7 @@ Synchronize user input with the start of a process
 
 import scheduler.util.editor
 
-def add(graph):
+def add(graph, stdin=True):
     '''
     Adds a debug tool to the given graph. All internal messages are sent to a
     Merge node.  The output of the Merge is synchronized with the output of a
@@ -14,6 +14,9 @@ def add(graph):
     
     Parameters:
         graph - Debug nodes are added to the given graph
+        stdin - When 'True', the default, steps come from standard-in. If 
+                'False', they come from an exported in-port named 'STEP'; one
+                IP per step.
     Returns:
         The altered graph with the additional debug nodes wired up.
     '''
@@ -21,7 +24,8 @@ def add(graph):
     graphEdits = {}
     # add processes
     scheduler.util.editor.process(graphEdits, '*events*' , 'Merge')
-    scheduler.util.editor.process(graphEdits, '*stdin*'  , '_StdIn_')
+    if stdin:
+        scheduler.util.editor.process(graphEdits, '*stdin*'  , '_StdIn_')
     scheduler.util.editor.process(graphEdits, '*sync*'   , 'Join')
     scheduler.util.editor.process(graphEdits, '*unblock*', 'UnBlock')
     # add connections
@@ -32,7 +36,10 @@ def add(graph):
         # send the events of every process to a Merge component
         scheduler.util.editor.connection(graphEdits, (processName, 'events'), '*events*')
     scheduler.util.editor.connection(graphEdits, '*events*', '*sync*')
-    scheduler.util.editor.connection(graphEdits, '*stdin*' , '*sync*')
+    if stdin:
+        scheduler.util.editor.connection(graphEdits, '*stdin*' , '*sync*')
+    else:
+        scheduler.util.editor.export(graphEdits, 'STEP', '*sync*', isInport=True)
     scheduler.util.editor.connection(graphEdits, '*sync*'  , '*unblock*')
     # add edits to given graph
     scheduler.util.editor.modify(graph, graphEdits)
@@ -45,7 +45,7 @@ def process( graph, name, componentName, config=None, metadata=None ):
     if config:
         setConfig(graph, name, config)        
 
-def connection(graph, src, tgt):
+def connection(graph, src, tgt, metadata=None):
     '''
     Add a new connection, to the supplied graph, with the given source and
     target end-points.   
@@ -56,6 +56,7 @@ def connection(graph, src, tgt):
              (srcProcess, srcPort)
         tgt - A process-port specification (to send data to) of the from:
              (tgtProcess, tgtPort)
+        metadata - Some optional metadata for the new connection.
     '''    
     if issubclass(type(src), basestring):
         srcProcessName, srcPortName = src, 'out'
@@ -70,7 +71,8 @@ def connection(graph, src, tgt):
                             "port"    : srcPortName }, 
                    "tgt": { "process" : tgtProcessName,
                             "port"    : tgtPortName } }
-    
+    if metadata:
+        connection['metadata'] = metadata
     graph.setdefault( 'connections', [] ).append(connection)
 
 def modify(graph, edits):
@@ -160,4 +162,22 @@ def export(graph, portName, tgt, isInport=True):
         tgtProcessName, tgtPortName = tgt
     export = { portName : { "process" : tgtProcessName, 
                             "port"    : tgtPortName } }
-    graph.setdefault( portType[isInport], {} ).update(export)
\ No newline at end of file
+    graph.setdefault( portType[isInport], {} ).update(export)
+
+def setConnectionDefaults(graph, metadata):
+    '''
+    Apply the given connection metadata to every connection (and exported
+    port) in the supplied graph that does not already set it. 
+    Example: Make every connection a shared-memory ring, except those that
+             ask for something else.
+        setConnectionDefaults(graph, { 'transport' : 'shm' })
+    
+    Parameters:
+        graph - A graph to modify.
+        metadata - Connection metadata (see scheduler.util.connection.new).
+    '''
+    endpoints  = [ connection for connection in graph.get('connections', []) if 'src' in connection ]
+    endpoints += graph.get('inports', {}).values() + graph.get('outports', {}).values()
+    for endpoint in endpoints:
+        for key, value in metadata.items():
+            endpoint.setdefault('metadata', {}).setdefault(key, value)
@@ -0,0 +1,257 @@
+import os, sys, atexit, signal, logging, subprocess
+from threading import Lock
+from multiprocessing import Pipe
+import _multiprocessing
+import scheduler
+import scheduler.component.elementary.test
+import scheduler.util.plumber
+import scheduler.util.spawn
+import scheduler.util.trace
+'''
+This module starts the processes of a graph as forks of a small, long-lived
+server process (a "zygote") instead of forks of the process that builds the
+network.
+
+The server is a fresh interpreter, started once, that imports the component
+library (and any other modules it is asked to preload, e.g. modules that add
+components to the library) and then waits for requests.  A request is the
+description of a batch of graph processes, as for scheduler.util.spawn,
+followed by the file descriptors of their connections; the server forks a
+child for each process, with exactly the connections of that process.  A
+child costs a fork of the small server image, not of the parent with its
+graphs and imports, and nothing leaks into it.
+
+A whole network is started by one request (see Process.startAll()), without
+waiting on any child; children set themselves up in parallel.  The
+descriptors are in flight (and held open by the kernel) once the request is
+sent, so the parent may close its copies right away; the Process-before-Thread
+order of scheduler.util.plumber.start() still holds.
+
+The limits of scheduler.util.spawn apply: plain Pipes only, and no blocking
+events.
+'''
+
+# The modules the server imports before it forks any child
+PRELOAD = ['scheduler.component.elementary.test']
+
+# Requests
+START = 'start'
+LOAD  = 'load'
+
+# The server of this process, started by the first request (see server()).
+state = { 'conn'    : None,
+          'process' : None,
+          'pid'     : None,
+          'preload' : set(),
+          'lock'    : Lock() }
+
+def server(preload=None):
+    '''
+    Start the server of this process, if it is not running yet, and make sure
+    it has imported the given modules.
+
+    Parameters:
+        preload - A list of module names to import in the server, besides
+                  PRELOAD.
+    Returns:
+        The connection to send requests to the server on.
+    '''
+    modules = PRELOAD + [ module for module in (preload or []) if module not in PRELOAD ]
+    with state['lock']:
+        if state['conn'] is None or state['pid'] != os.getpid():
+            conn, serverConn = Pipe()
+            args = [ sys.executable, '-m', 'scheduler.util.forkserver', str(serverConn.fileno()) ] + modules
+            env  = dict(os.environ)
+            root = os.path.dirname(os.path.dirname(os.path.abspath(scheduler.__file__)))
+            env['PYTHONPATH'] = os.pathsep.join([ root ] + [ path for path in [ env.get('PYTHONPATH') ] if path ])
+            fd   = serverConn.fileno()
+            state['process'] = subprocess.Popen(args, env=env, preexec_fn=lambda: scheduler.util.spawn.inheritOnly([ fd ]))
+            serverConn.close()
+            state['conn']    = conn
+            state['pid']     = os.getpid()
+            state['preload'] = set(modules)
+            logging.debug('FSRV: [{pid}] started'.format(pid=state['process'].pid))
+        missing = [ module for module in modules if module not in state['preload'] ]
+        if missing:
+            state['conn'].send( (LOAD, missing) )
+            state['preload'].update(missing)
+            logging.debug('FSRV: [{pid}] preload {modules}'.format(pid=state['process'].pid, modules=missing))
+        return state['conn']
+
+def stop():
+    '''
+    Stop the server of this process, if there is one; children already
+    started keep running.
+    '''
+    with state['lock']:
+        if state['conn'] is None or state['pid'] != os.getpid():
+            return
+        state['conn'].close() # the server exits on end-of-file
+        state['process'].wait()
+        state['conn'] = None
+
+atexit.register(stop)
+
+def fdOrder(spec):
+    '''
+    Parameters:
+        spec - The description of a graph process (see Process.startAll()).
+    Returns:
+        The file descriptors of its connections, in the order they are sent
+        to the server.
+    '''
+    return [ fd for portType in ['inports', 'outports'] for portName, fds in sorted(spec[portType].items()) for fd in fds ]
+
+class Process(scheduler.util.spawn.Process):
+    '''
+    A graph process forked by the server; it has the start() and join()
+    methods of a multiprocessing.Process.
+    '''
+    def __init__(self, name, componentName, kwargs):
+        '''
+        See scheduler.util.spawn.Process.
+        '''
+        super(Process, self).__init__(name, componentName, kwargs)
+        self.status = None
+        self._pid   = None
+
+    @property
+    def pid(self):
+        if self._pid is None and self.status is not None:
+            self._pid = self.status.recv() # the child sends its pid first
+        return self._pid
+
+    def start(self):
+        '''
+        Send a request to start the process to the server.
+        '''
+        Process.startAll([ self ])
+
+    @staticmethod
+    def startAll(processes):
+        '''
+        Send one request to start all the given processes to the server; it
+        returns without waiting on any of them (see
+        scheduler.util.plumber.start()).
+
+        Parameters:
+            processes - A list of Process objects.
+        '''
+        conn  = server()
+        specs = []
+        fds   = []
+        statusConns = []
+        for process in processes:
+            # The child holds the other end of a status connection until it
+            # exits, so join() waits for end-of-file.
+            process.status, childStatus = Pipe()
+            statusConns.append(childStatus)
+            spec = dict(process.spec)
+            spec['loglevel'] = logging.getLogger().getEffectiveLevel()
+            spec['logfile']  = scheduler.util.spawn.logFilename()
+            spec['trace']    = scheduler.util.trace.directory
+            specs.append(spec)
+            fds.extend(fdOrder(spec) + [ childStatus.fileno() ])
+        with state['lock']:
+            conn.send( (START, specs) )
+            for fd in fds:
+                _multiprocessing.sendfd(conn.fileno(), fd)
+        for childStatus in statusConns:
+            childStatus.close()
+        logging.debug('FORK: {procs} (forkserver)'.format(procs=', '.join( process.name for process in processes )))
+
+    def join(self):
+        '''
+        Block until the process has terminated.
+        '''
+        if self.status is None:
+            return
+        self.pid # not sent yet if nobody asked for it
+        try:
+            self.status.recv()
+        except EOFError:
+            pass
+        self.status.close()
+
+def child(spec, fds):
+    '''
+    The logic of a forked child: rebuild its connections and run its
+    component (see Process.startAll()).
+
+    Parameters:
+        spec - The description of a graph process (see Process.startAll()).
+        fds - The file descriptors it was sent (see fdOrder()), then that of
+              its status connection.
+    '''
+    status = _multiprocessing.Connection(fds.pop())
+    status.send(os.getpid())
+    logging.basicConfig(level=spec['loglevel'], filename=spec['logfile'])
+    if spec['trace']:
+        scheduler.util.trace.enable(spec['trace'])
+    kwargs = { 'core'     : { 'name'     : spec['name'],
+                              'metadata' : spec['metadata'],
+                              'leak'     : scheduler.util.plumber.newLeak(), # nothing leaked
+                              'blockers' : {} },
+               'inports'  : {},
+               'outports' : {} }
+    # The descriptors were renumbered on the way; only their order is kept
+    fds = iter(fds)
+    for portType in ['inports', 'outports']:
+        for portName, portFds in sorted(spec[portType].items()):
+            kwargs[portType][portName] = [ _multiprocessing.Connection(fds.next()) for fd in portFds ]
+    fxn = scheduler.component.elementary.test.library[spec['component']]
+    fxn(**kwargs)
+    status.close()
+
+def fork(conn, spec, fds):
+    '''
+    Fork a child that runs the given process (see child()).
+
+    Parameters:
+        conn - The connection to the parent; closed in the child.
+        spec - The description of a graph process.
+        fds - Its file descriptors (see child()); closed in the server.
+    '''
+    if os.fork() == 0:
+        conn.close()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        code = 0
+        try:
+            child(spec, fds)
+        except:
+            logging.exception('Process "{proc}" failed.'.format(proc=spec['name']))
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+    for fd in fds:
+        os.close(fd)
+
+def main():
+    '''
+    The logic of the server: preload modules, then serve requests until the
+    connection to the parent is closed.
+    '''
+    conn = _multiprocessing.Connection(int(sys.argv[1]))
+    for module in sys.argv[2:]:
+        __import__(module)
+    # Children are not waited on; the kernel reaps them
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        try:
+            request, data = conn.recv()
+        except EOFError:
+            break
+        if request == LOAD:
+            for module in data:
+                __import__(module)
+            continue
+        # Fork each child as soon as its descriptors are in, and before those
+        # of the next one, so no child inherits those of another
+        for spec in data:
+            fds = [ _multiprocessing.recvfd(conn.fileno()) for fd in fdOrder(spec) + [ None ] ] # and the status connection
+            fork(conn, spec, fds)
+
+if __name__ == '__main__':
+    main()
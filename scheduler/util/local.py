@@ -0,0 +1,196 @@
+import os, errno
+from collections import deque
+from threading import Condition, Lock
+import scheduler.util.batch
+import scheduler.util.capacity
+import scheduler.util.ready
+import scheduler.util.ring
+'''
+This module connects two threads of the same process with an in-memory
+queue.  Information packets (IPs) are handed over by reference; there is no
+pickling, copying or system call per IP.
+
+Like scheduler.util.ring, each connection has an OS pipe used as a doorbell,
+so it can be waited on by scheduler.util.ready along with Pipes.  The doorbell
+is only rung when the queue goes from empty to non-empty.  When every copy of
+the sending end is closed, the doorbell reads end-of-file.
+'''
+
+def Pipe(count=None, bytes=None):
+    '''
+    Create a one-way in-memory connection.
+
+    Parameters:
+        count - When 'None', the default, the queue has no limit on the number
+                of IPs it holds. Otherwise, the maximum number of IPs (see
+                scheduler.util.capacity).
+        bytes - When 'None', the default, the queue has no limit on the bytes
+                it holds. Otherwise, the maximum number of bytes (see
+                scheduler.util.batch.sizeOf()).
+    Returns:
+        A tuple of the form (reader, writer); matching the (tgtConn, srcConn)
+        order of multiprocessing.Pipe() in scheduler.network.
+    '''
+    queue = Queue(count, bytes)
+    return Reader(queue), Writer(queue)
+
+class Queue(object):
+    '''
+    The state shared by both ends of an in-memory connection.
+    '''
+    def __init__(self, count, bytes):
+        self.objs           = deque()
+        self.sizes          = deque()
+        self.size           = 0
+        self.count          = count
+        self.bytes          = bytes
+        self.lock           = Lock()
+        self.cond           = Condition(self.lock)
+        self.readerClosed   = False
+        self.writerClosed   = False
+        self.highWater      = 0
+        self.highWaterBytes = 0
+        self.doorR, self.doorW = os.pipe()
+        scheduler.util.ring.setNonBlocking(self.doorR)
+        scheduler.util.ring.setNonBlocking(self.doorW)
+
+    def isFull(self, size):
+        '''
+        Check if an IP of the given size would go over capacity; see
+        scheduler.util.capacity.Sender.isFull().
+        '''
+        if self.count and len(self.objs) >= self.count:
+            return True
+        return bool(self.bytes and self.objs and self.size + size > self.bytes)
+
+class Writer(object):
+    '''
+    The sending end of an in-memory connection.
+    '''
+    def __init__(self, queue):
+        self.queue  = queue
+        self.closed = False
+
+    def send(self, obj, block=True):
+        '''
+        Put the given IP on the queue.
+
+        Parameters:
+            obj - An information packet (or data object).
+            block - When 'True', the default, wait while the queue is full.
+                    If 'False', throw 'scheduler.util.capacity.Full' instead.
+        Exceptions:
+            Throws an 'IOError' when the receiving end is closed.
+        '''
+        queue = self.queue
+        size  = scheduler.util.batch.sizeOf(obj) if queue.bytes else 0
+        with queue.lock:
+            while not queue.readerClosed and queue.isFull(size):
+                if not block:
+                    raise scheduler.util.capacity.Full('Connection is at capacity: {count} IPs, {bytes} bytes'.format(count=len(queue.objs),
+                                                                                                                      bytes=queue.size))
+                queue.cond.wait()
+            if queue.readerClosed:
+                raise IOError(errno.EPIPE, 'Receiving end of the queue is closed')
+            queue.objs.append(obj)
+            if queue.bytes:
+                queue.sizes.append(size)
+                queue.size += size
+            queue.highWater      = max(queue.highWater, len(queue.objs))
+            queue.highWaterBytes = max(queue.highWaterBytes, queue.size)
+            if len(queue.objs) == 1:
+                queue.cond.notify_all()
+                scheduler.util.ring.ring(queue.doorW)
+
+    @property
+    def highWater(self):
+        return self.queue.highWater
+
+    @property
+    def highWaterBytes(self):
+        return self.queue.highWaterBytes
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            with self.queue.lock:
+                self.queue.writerClosed = True
+                self.queue.cond.notify_all()
+                # Wake a reader waiting on the doorbell now; it would see
+                # end-of-file only once every process has closed its copy.
+                scheduler.util.ring.ring(self.queue.doorW)
+            os.close(self.queue.doorW)
+
+    def fileno(self):
+        return self.queue.doorW
+
+class Reader(object):
+    '''
+    The receiving end of an in-memory connection.
+    '''
+    def __init__(self, queue):
+        self.queue  = queue
+        self.closed = False
+
+    def recv(self):
+        '''
+        Take the next IP off the queue, blocking while the queue is empty.
+
+        Returns:
+            An information packet (or data object).
+        Exceptions:
+            Throws an 'EOFError' when the queue is empty and the sending end
+            is closed.
+        '''
+        queue = self.queue
+        with queue.lock:
+            while not queue.objs:
+                if queue.writerClosed:
+                    raise EOFError
+                queue.cond.wait()
+            obj = queue.objs.popleft()
+            if queue.bytes:
+                queue.size -= queue.sizes.popleft()
+            if queue.count or queue.bytes:
+                queue.cond.notify_all()
+            return obj
+
+    @property
+    def buffered(self):
+        '''
+        The number of IPs on the queue.
+        '''
+        return len(self.queue.objs)
+
+    def poll(self, timeout=0.0):
+        '''
+        Check if a recv() would return without waiting on the writer.
+
+        Parameters:
+            timeout - The maximum number of seconds to wait for data.
+        Returns:
+            'True' if there is data on the queue or the sending end is closed.
+        '''
+        queue = self.queue
+        with queue.lock:
+            if queue.objs or queue.writerClosed:
+                return True
+            # Silence the doorbell while holding the lock, so a ring for an
+            # IP put on the queue after this is never missed.
+            if not scheduler.util.ring.drain(queue.doorR):
+                return True
+        if timeout:
+            scheduler.util.ready.waitFds([queue.doorR], timeout)
+            return self.poll()
+        return False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            with self.queue.lock:
+                self.queue.readerClosed = True
+                self.queue.cond.notify_all()
+            os.close(self.queue.doorR)
+
+    def fileno(self):
+        return self.queue.doorR
@@ -0,0 +1,155 @@
+import logging
+import scheduler.component.elementary.test
+'''
+This module decides whether each process of a graph runs as a thread of its
+parent process or as an OS process of its own.
+
+A process can say where it runs, in its metadata:
+    'metadata' : { 'placement' : 'thread' }  # or 'process'
+Or it can say what it costs, and leave the placement to a policy:
+    'metadata' : { 'cost' : 'io' }           # or 'cpu', 'pure'
+A process that does neither gets the cost of its component (see
+scheduler.component.elementary.test.costs).
+
+Policies:
+* 'names' - The default.  A component whose name has leading and trailing
+            underscores (e.g. '_StdIn_') runs in a thread; all others run in
+            processes.
+* 'auto'  - I/O-bound ('io') and trivially cheap ('pure') processes run in
+            threads, where they are cheap to start and do not need their
+            own core; CPU-heavy ('cpu') processes run in processes.  A
+            process of unknown cost falls back to the 'names' policy.
+An explicit placement always wins over the policy.
+'''
+
+# Placements
+THREAD  = 'thread'
+PROCESS = 'process'
+
+# Costs
+IO   = 'io'
+CPU  = 'cpu'
+PURE = 'pure'
+
+# Policies
+NAMES = 'names'
+AUTO  = 'auto'
+
+def cost(graph, processName):
+    '''
+    Parameters:
+        graph - A graph of components connected together by data ports
+        processName - The name of a process.
+    Returns:
+        The cost of the given process ('io', 'cpu' or 'pure'), from its
+        metadata or else its component; 'None' if neither says.
+    '''
+    process = graph['processes'][processName]
+    try:
+        return process['metadata']['cost']
+    except KeyError:
+        return scheduler.component.elementary.test.costs.get(process['component'])
+
+def choose(graph, processName, policy=NAMES):
+    '''
+    Decide where the given process runs.
+
+    Parameters:
+        graph - A graph of components connected together by data ports
+        processName - The name of a process.
+        policy - 'names', the default, or 'auto' (see above).
+    Returns:
+        A tuple of the form (placement, reason) where the placement is
+        'thread' or 'process' and the reason is one of 'metadata', 'cost' or
+        'name'; whichever decided it.
+    Exceptions:
+        ValueError - Raised for an unknown policy, placement or cost.
+    '''
+    if policy not in (NAMES, AUTO):
+        raise ValueError('Unknown placement policy "{policy}".'.format(policy=policy))
+    process = graph['processes'][processName]
+    placement = process.get('metadata', {}).get('placement')
+    if placement is not None:
+        if placement not in (THREAD, PROCESS):
+            raise ValueError('Process "{proc}" has an unknown placement "{placement}".'.format(proc=processName, placement=placement))
+        return placement, 'metadata'
+    if policy == AUTO:
+        processCost = cost(graph, processName)
+        if processCost in (IO, PURE):
+            return THREAD, 'cost'
+        elif processCost == CPU:
+            return PROCESS, 'cost'
+        elif processCost is not None:
+            raise ValueError('Process "{proc}" has an unknown cost "{cost}".'.format(proc=processName, cost=processCost))
+    # Use leading and trailing underscores to set default threading status
+    componentName = process['component']
+    if componentName.startswith('_') and componentName.endswith('_'):
+        return THREAD, 'name'
+    return PROCESS, 'name'
+
+def isThreaded(graph, processName):
+    '''
+    Determine weather the given process should be started as a system-thread
+    or a system-process; by its metadata or else by its component name.
+    Note: Run apply() on a graph first to use another policy.
+
+    Parameters:
+        graph - A graph of components connected together by data ports
+        processName - The name of a worker process
+    Returns:
+        'True' if the given worker process should run in a thread or else 'False'.
+    '''
+    try:
+        placement, reason = choose(graph, processName)
+    except KeyError:
+        return False # not a process of this graph (e.g. the parent)
+    return placement == THREAD
+
+def plan(graph, policy=NAMES):
+    '''
+    Decide where every process of the given graph runs.
+
+    Parameters:
+        graph - A graph of components connected together by data ports
+        policy - 'names', the default, or 'auto' (see above).
+    Returns:
+        A dict that maps each process name to a tuple of the form
+        (placement, reason) (see choose()).
+    '''
+    return dict( (processName, choose(graph, processName, policy)) for processName in graph['processes'] )
+
+def apply(graph, policy=NAMES):
+    '''
+    Record the placement of every process, chosen by the given policy, in
+    the metadata of any process that does not already set one; so the graph
+    runs with that placement (see scheduler.network.new).
+
+    Parameters:
+        graph - A graph to modify.
+        policy - 'names', the default, or 'auto' (see above).
+    Returns:
+        The plan that was applied (see plan()).
+    '''
+    processPlan = plan(graph, policy)
+    for processName, (placement, reason) in processPlan.items():
+        graph['processes'][processName].setdefault('metadata', {})['placement'] = placement
+        logging.debug('PLAC: {proc} = {placement} (by {reason})'.format(proc=processName, placement=placement, reason=reason))
+    return processPlan
+
+def table(graph, processPlan):
+    '''
+    Parameters:
+        graph - A graph of components connected together by data ports
+        processPlan - A plan for the given graph (see plan()).
+    Returns:
+        A human readable table of the given plan; one line per process.
+    '''
+    lines = [ '{0:<24} {1:<16} {2:<6} {3:<9} {4}'.format('process', 'component', 'cost', 'placement', 'reason') ]
+    for processName in sorted(processPlan):
+        placement, reason = processPlan[processName]
+        lines.append('{0:<24} {1:<16} {2:<6} {3:<9} {4}'.format(processName,
+                                                                graph['processes'][processName]['component'],
+                                                                cost(graph, processName) or '-',
+                                                                placement,
+                                                                reason))
+    return '\n'.join(lines)
@@ -1,5 +1,4 @@
 import logging, os
-from multiprocessing import Process
 from threading import Thread
 
 '''
@@ -35,7 +34,8 @@ Repro:
 def compareWorkers(a,b):
     '''
     A compare function used to sort workers such that all 
-    multiprocessing.Process objects appear in a list before any
+    multiprocessing.Process objects (or other OS processes, see
+    scheduler.util.spawn) appear in a list before any
     multiprocessing.Thread objects.
 
     Parameters:
@@ -47,9 +47,9 @@ def compareWorkers(a,b):
         is considered "smaller" than, equal to, or "larger" than the second argument.
         Process objs are "smaller" than Threads, so the sort first in a list.
     '''
-    if   isinstance(a, Process) and isinstance(b, Thread):
+    if   not isinstance(a, Thread) and isinstance(b, Thread):
         retval = -1
-    elif isinstance(a, Thread) and isinstance(b, Process):
+    elif isinstance(a, Thread) and not isinstance(b, Thread):
         retval =  1
     else:
         retval =  0
@@ -77,8 +77,18 @@ def start(workers, leak, processName):
         processName - The parent (or composite) process responsible for managing 
                       its network sub-processes. 
     '''
-    for worker in sorted(workers, cmp=compareWorkers):
-        worker.start() # fork new process (or thread)
+    workers = sorted(workers, cmp=compareWorkers)
+    # Processes that can be started together (see scheduler.util.forkserver)
+    # are started in one batch; before any Thread
+    batches = {}
+    for worker in workers:
+        if hasattr(worker, 'startAll'):
+            batches.setdefault(type(worker), []).append(worker)
+    for kind, batch in batches.items():
+        kind.startAll(batch)
+    for worker in workers:
+        if not hasattr(worker, 'startAll'):
+            worker.start() # fork new process (or thread)
     # Closed un-used file descriptors held by the given process.
     # Note: start() gets called by thread that creates the network (or the main
     #       thread) so it must also close its connections after all processes
@@ -120,16 +130,24 @@ def closeByProcess(leak, processName):
         # Treat all aliases as one since they share the same process id
         processNames = leak['threads']
     else:
-        processNames = [ processName ]
-        
+        processNames = set([ processName ])
+    # Only build log messages if they will be seen; there are two for every
+    # connection of the network.
+    isLogging = logging.getLogger().isEnabledFor(logging.DEBUG)
     pid = os.getpid()
-    for connInfo in leak['connections']['inports'] + leak['connections']['outports']:
-        logging.debug('LEAK: [{pid}] On init, process "{proc}" opened "{pipeProc}.{pipePort}".'.format(pid=pid, pipeProc=connInfo['process'], pipePort=connInfo['port'], proc=processName))
+    # Walk the connections by the process that uses them, so the connections
+    # of the given process are skipped wholesale.
+    for owner, conns in leak['index'].items():
         # MAINT: Take connInfo['parent'] into account     
-        if connInfo['process'] in processNames:
-            continue
-        logging.debug('LEAK: [{pid}] On init, process "{proc}" closed "{pipeProc}.{pipePort}".'.format(pid=pid, pipeProc=connInfo['process'], pipePort=connInfo['port'], proc=processName))
-        connInfo['connection'].close()
+        isUsed = owner in processNames
+        for connInfo in conns['inports'] + conns['outports']:
+            if isLogging:
+                logging.debug('LEAK: [{pid}] On init, process "{proc}" opened "{pipeProc}.{pipePort}".'.format(pid=pid, pipeProc=connInfo['process'], pipePort=connInfo['port'], proc=processName))
+            if isUsed:
+                continue
+            if isLogging:
+                logging.debug('LEAK: [{pid}] On init, process "{proc}" closed "{pipeProc}.{pipePort}".'.format(pid=pid, pipeProc=connInfo['process'], pipePort=connInfo['port'], proc=processName))
+            connInfo['connection'].close()
 
 def newLeak(inports=[], outports=[], threads=set([])):
     '''
@@ -145,14 +163,34 @@ def newLeak(inports=[], outports=[], threads=set([])):
     Returns:
         A dictionary representing A list of all connections (and associated 
         metadata) in-use by a network of processes. one end of a Pipe. 
+        The connections are also indexed by the process that uses them, 
+        under the key 'index':
+          { processName : { 'inports' : ..., 'outports' : ... } }
     '''
     # the default value is only created once so return copies of the 
     # incoming mutable objects  
     retval = { 'connections' : { 'inports'  : list(inports),
                                  'outports' : list(outports) },
-               'threads'     : set(threads) } 
+               'threads'     : set(threads),
+               'index'       : {} } 
+    for portType, connInfos in retval['connections'].items():
+        for connInfo in connInfos:
+            index(retval, connInfo, portType)
     return retval 
 
+def index(leak, connInfo, portType):
+    '''
+    Index the given connection by the process that uses it.
+    
+    Parameters:
+        leak - A list of all connections (see newLeak()).
+        connInfo - A connection and its metadata (see connectionInfo()).
+        portType - 'inports' or 'outports'
+    '''
+    conns = leak['index'].setdefault(connInfo['process'], { 'inports'  : [],
+                                                           'outports' : [] })
+    conns[portType].append(connInfo)
+
 def getLeakByProcess(leak, processName):
     '''
     Create an object that knows about all of the leaked Pipe connections
@@ -173,8 +211,9 @@ def getLeakByProcess(leak, processName):
     aliases = [ processName ]
     if processName in leak['threads']:
         aliases = list(leak['threads'])
-    ins     = [ connInfo for connInfo in leak['connections']['inports']  if connInfo['process'] in aliases]
-    outs    = [ connInfo for connInfo in leak['connections']['outports'] if connInfo['process'] in aliases]
+    conns   = [ leak['index'][alias] for alias in aliases if alias in leak['index'] ]
+    ins     = [ connInfo for aliasConns in conns for connInfo in aliasConns['inports'] ]
+    outs    = [ connInfo for aliasConns in conns for connInfo in aliasConns['outports'] ]
     threads = set(aliases)
     return newLeak(inports=ins, outports=outs, threads=threads)
 
@@ -203,7 +242,9 @@ def append(leak, parentProcessName, connection, processName, portName, isThread,
     if isRoot:
         namespace = None
     # Keep a list of all in-ports and out-ports
-    leak['connections'].setdefault(portType[inport], []).append( connectionInfo(connection, processName, portName, parent=namespace) )
+    connInfo = connectionInfo(connection, processName, portName, parent=namespace)
+    leak['connections'].setdefault(portType[inport], []).append(connInfo)
+    index(leak, connInfo, portType[inport])
     # Keep track of workers that share a PID (and thus share file descriptors)
     if isThread:
         leak['threads'].add(processName)
\ No newline at end of file
@@ -0,0 +1,101 @@
+import logging, multiprocessing
+from threading import Thread
+import scheduler.util.placement
+import scheduler.util.plumber
+'''
+This module runs the processes of a graph in a fixed pool of worker
+processes, instead of one OS process per graph process.  Each worker runs the
+graph processes assigned to it as threads.  Connections between two graph
+processes in the same worker are in-memory queues (see scheduler.util.local);
+connections between workers stay Pipes.
+
+Graph processes that already run as threads of the main process (see
+scheduler.util.placement.isThreaded()) are left out of the pool.
+'''
+
+def size(workers=None):
+    '''
+    Parameters:
+        workers - When 'None' or 0, the default, use one worker per core.
+                  Otherwise, the number of workers.
+    Returns:
+        The number of workers in a pool.
+    '''
+    return workers or multiprocessing.cpu_count()
+
+def order(graph):
+    '''
+    Order the processes of the given graph such that processes connected to
+    each other tend to be next to each other; a depth-first walk downstream
+    from every process without upstream connections.
+
+    Parameters:
+        graph - A graph of components connected together by data ports
+    Returns:
+        A list of process names.
+    '''
+    downstream = {}
+    upstream   = set()
+    for connection in graph.get('connections', []):
+        if 'src' not in connection:
+            continue # IIP
+        src = connection['src']['process']
+        tgt = connection['tgt']['process']
+        downstream.setdefault(src, []).append(tgt)
+        upstream.add(tgt)
+    names   = sorted(graph['processes'].keys())
+    roots   = [ name for name in names if name not in upstream ] + names
+    ordered = []
+    visited = set()
+    for root in roots:
+        stack = [ root ]
+        while stack:
+            name = stack.pop()
+            if name in visited or name not in graph['processes']:
+                continue
+            visited.add(name)
+            ordered.append(name)
+            stack.extend(reversed(downstream.get(name, [])))
+    return ordered
+
+def assign(graph, workers=None):
+    '''
+    Assign the processes of the given graph to workers.  Connected processes
+    are kept in the same worker where possible, by splitting order() into
+    contiguous runs of (nearly) equal length.
+
+    Parameters:
+        graph - A graph of components connected together by data ports
+        workers - The number of workers (see size()).
+    Returns:
+        A dict that maps each pooled process name to a worker index.
+    '''
+    names   = [ name for name in order(graph) if not scheduler.util.placement.isThreaded(graph, name) ]
+    workers = min(size(workers), len(names)) or 1
+    return dict( (name, i * workers / len(names)) for i, name in enumerate(names) )
+
+def run(name, members, leak):
+    '''
+    The logic of a worker process: run each of its graph processes in a
+    thread and wait for all of them to finish.
+
+    Parameters:
+        name - The name of the worker.
+        members - A list of tuples of the form (processName, fxn, interface)
+                  where 'fxn' is a component function and 'interface' its
+                  keyword arguments (see scheduler.network.new()).
+        leak - A list of all connections (or file descriptors) in-use by the
+               network of processes.
+    '''
+    logging.debug('POOL: {name} runs {count} processes'.format(name=name, count=len(members)))
+    # The graph processes of this worker share its PID, like threads of the
+    # main process do.
+    # Note: This is the worker's own copy of the leak.
+    leak['threads'].clear()
+    leak['threads'].update([ name ] + [ processName for processName, fxn, interface in members ])
+    scheduler.util.plumber.closeByProcess(leak, name)
+    threads = [ Thread(target=fxn, kwargs=interface) for processName, fxn, interface in members ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
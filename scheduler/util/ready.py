@@ -0,0 +1,139 @@
+import time, select, errno
+'''
+This module blocks on the file descriptors behind multiprocessing.Pipe
+connections until they are ready to be read.  A connection is "ready" when
+there is data waiting on it or when the other end of the Pipe has closed (so
+a recv() returns immediately, either with data or with an EOFError).  While
+waiting, the calling process sleeps in the kernel and uses no CPU.
+
+The poll() system call is used when available since, unlike select(), it has
+no upper limit on the value of a file descriptor.
+'''
+
+def remaining(deadline):
+    '''
+    Get the time left before the given deadline.
+
+    Parameters:
+        deadline - An absolute time, as returned by time.time(), or 'None' for
+                   no deadline.
+    Returns:
+        The number of seconds left (never negative) or 'None' when there is no
+        deadline.
+    '''
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.time())
+
+def deadlineFor(timeout):
+    '''
+    Convert a relative timeout into an absolute deadline.
+
+    Parameters:
+        timeout - A number of seconds or 'None' to wait forever.
+    Returns:
+        An absolute time, comparable to time.time(), or 'None'.
+    '''
+    if timeout is None:
+        return None
+    return time.time() + timeout
+
+def wait(conns, timeout=None):
+    '''
+    Block until at least one of the given connections is ready to be read.
+
+    Parameters:
+        conns - A list of Connection objects (or anything with a fileno()).
+        timeout - When 'None', the default, block forever. Otherwise, the
+                  maximum number of seconds to block.
+    Returns:
+        The list of given connections that are ready, in the order they were
+        given. The list is empty when the timeout expired or when no
+        connections were given.
+    '''
+    if not conns:
+        return []
+    # IPs already unpacked into a connection's local buffer (see 
+    # scheduler.util.batch) are invisible to the kernel, but ready all the same.
+    buffered = [ conn for conn in conns if getattr(conn, 'buffered', 0) ]
+    if buffered:
+        return buffered
+    fd2conns = {}
+    for conn in conns:
+        fd2conns.setdefault(conn.fileno(), []).append(conn)
+    deadline = deadlineFor(timeout)
+    while True:
+        try:
+            readyFds = set(waitFds(fd2conns.keys(), remaining(deadline)))
+        except (select.error, IOError, OSError), e:
+            # Interrupted by a signal; try again with the time that is left.
+            if e.args[0] != errno.EINTR:
+                raise
+            continue
+        ready = [ conn for conn in conns if conn.fileno() in readyFds ]
+        # A connection that buffers in user space can have a readable file
+        # descriptor with nothing to receive yet (see scheduler.util.ring),
+        # so let it confirm.
+        ready = [ conn for conn in ready if not hasattr(conn, 'buffered') or conn.poll() ]
+        if ready or remaining(deadline) == 0:
+            return ready
+
+def waitFds(fds, timeout):
+    '''
+    Block on the given file descriptors with poll() (or select(), where
+    poll() is not available).
+
+    Parameters:
+        fds - A list of file descriptors to read from.
+        timeout - The maximum number of seconds to block or 'None' to block
+                  forever.
+    Returns:
+        A list of the file descriptors that are ready to be read.
+    '''
+    if hasattr(select, 'poll'):
+        poller = select.poll()
+        mask   = select.POLLIN | select.POLLPRI | select.POLLHUP | select.POLLERR
+        for fd in fds:
+            poller.register(fd, mask)
+        msecs = None if timeout is None else int(round(timeout * 1000))
+        return [ fd for fd, _ in poller.poll(msecs) ]
+    readyFds, _, _ = select.select(fds, [], [], timeout)
+    return readyFds
+
+def waitAny(conns, timeout=None):
+    '''
+    Block until any one of the given connections is ready to be read.
+
+    Parameters:
+        conns - A list of Connection objects.
+        timeout - When 'None', the default, block forever. Otherwise, the
+                  maximum number of seconds to block.
+    Returns:
+        'True' if a connection is ready (or there are no connections to wait
+        on) and 'False' if the timeout expired.
+    '''
+    if not conns:
+        return True
+    return len(wait(conns, timeout=timeout)) > 0
+
+def waitAll(conns, timeout=None):
+    '''
+    Block until every one of the given connections is ready to be read.
+    Note: Connections that become ready are dropped from the set being waited
+          on, so each wake-up only pays for the connections still pending.
+
+    Parameters:
+        conns - A list of Connection objects.
+        timeout - When 'None', the default, block forever. Otherwise, the
+                  maximum number of seconds to block, in total.
+    Returns:
+        'True' if all connections are ready and 'False' if the timeout expired.
+    '''
+    deadline = deadlineFor(timeout)
+    pending  = list(conns)
+    while pending:
+        ready = wait(pending, timeout=remaining(deadline))
+        if not ready:
+            return False
+        pending = [ conn for conn in pending if conn not in ready ]
+    return True
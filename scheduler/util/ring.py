@@ -0,0 +1,301 @@
+import os, mmap, errno, fcntl, struct, cPickle
+import scheduler.util.ready
+'''
+This module connects two processes, on the same host, with a ring buffer in
+shared memory instead of a socket.  Pickled information packets are copied
+into the ring by the writer and out of it by the reader, so large payloads
+do not pass through a kernel socket buffer.
+
+Python 2 has no eventfd, so each direction has an OS pipe used as a doorbell:
+* The writer rings the 'data' doorbell (writes a byte) after it adds bytes
+  to the ring. The reader sleeps on this doorbell when the ring is empty; it
+  is also the file descriptor that scheduler.util.ready waits on. When every
+  copy of the writer end is closed, the reader sees end-of-file.
+* The reader rings the 'space' doorbell after it removes bytes from the
+  ring. The writer sleeps on this doorbell when the ring is full. When every
+  copy of the reader end is closed, the writer gets an IOError on send().
+
+The ring is laid out as:
+    <head> <tail> <padding> <data ...>
+where 'head' and 'tail' are unsigned 64-bit counters of the bytes ever
+written and read.  Each message in the data is a length and a kind followed
+by the bytes of the message.  Only the writer moves 'head' and only the reader moves
+'tail', so there is one writer and one reader per ring.
+'''
+
+COUNTERS = struct.Struct('=QQ')
+COUNTER  = struct.Struct('=Q')
+FRAME    = struct.Struct('=QB') # length and kind of each message
+PICKLED  = 0
+STRING   = 1 # a str IP, copied as-is since pickling it only adds copies
+HEADER   = 64 # bytes before the data; keeps the counters on their own cache line
+SIZE     = 4*1024*1024 # default number of data bytes in a ring
+
+def Pipe(size=SIZE):
+    '''
+    Create a one-way shared-memory connection.
+    Note: The ring lives in an anonymous shared mapping, so both ends must be
+          handed to child processes by fork (as scheduler.network does). The
+          mapping is shared by both ends and released when neither uses it.
+
+    Parameters:
+        size - The number of data bytes the ring holds. IPs larger than the
+               ring are streamed through it in pieces.
+    Returns:
+        A tuple of the form (reader, writer); matching the (tgtConn, srcConn)
+        order of multiprocessing.Pipe() in scheduler.network.
+    '''
+    mm = mmap.mmap(-1, HEADER + size)
+    COUNTERS.pack_into(mm, 0, 0, 0)
+    dataR,  dataW  = os.pipe()
+    spaceR, spaceW = os.pipe()
+    for fd in [dataR, dataW, spaceR, spaceW]:
+        setNonBlocking(fd)
+    return Reader(mm, size, dataR, spaceW), Writer(mm, size, dataW, spaceR)
+
+def setNonBlocking(fd):
+    '''
+    Make reads and writes on the given file descriptor return right away.
+
+    Parameters:
+        fd - A file descriptor.
+    '''
+    flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+    fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+def ring(fd):
+    '''
+    Ring a doorbell.
+    Note: A full doorbell is already ringing and a closed one has no one
+          listening, so neither is an error.
+
+    Parameters:
+        fd - The write end of a doorbell pipe.
+    '''
+    try:
+        os.write(fd, 'x')
+    except OSError, e:
+        if e.errno not in (errno.EAGAIN, errno.EPIPE):
+            raise
+
+def drain(fd):
+    '''
+    Silence a doorbell.
+
+    Parameters:
+        fd - The read end of a doorbell pipe.
+    Returns:
+        'False' if every copy of the write end is closed, or else 'True'.
+    '''
+    while True:
+        try:
+            if not os.read(fd, 4096):
+                return False
+        except OSError, e:
+            if e.errno == errno.EAGAIN:
+                return True
+            raise
+
+class Writer(object):
+    '''
+    The sending end of a shared-memory connection.
+    '''
+    def __init__(self, mm, size, dataW, spaceR):
+        self.mm     = mm
+        self.size   = size
+        self.dataW  = dataW
+        self.spaceR = spaceR
+        self.closed = False
+
+    def send(self, obj):
+        '''
+        Copy the given IP into the ring, blocking while the ring is full.
+
+        Parameters:
+            obj - An information packet (or data object).
+        Exceptions:
+            Throws an 'IOError' when the receiving end is closed.
+        '''
+        if type(obj) is str:
+            self.sendFrame(obj, STRING)
+        else:
+            self.sendFrame(cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL), PICKLED)
+
+    def send_bytes(self, data):
+        '''
+        Copy the given string into the ring as-is (see Reader.recv_bytes()).
+        '''
+        self.sendFrame(data, STRING)
+
+    def sendFrame(self, data, kind):
+        '''
+        Copy one message into the ring and let the reader know.
+
+        Parameters:
+            data - A string.
+            kind - How the reader turns 'data' back into an IP; PICKLED or
+                   STRING.
+        '''
+        if not drain(self.spaceR):
+            raise IOError(errno.EPIPE, 'Receiving end of the ring is closed')
+        self.write(FRAME.pack(len(data), kind))
+        self.write(data)
+        ring(self.dataW)
+
+    def write(self, data):
+        '''
+        Copy the given string into the ring, in pieces if it does not fit.
+
+        Parameters:
+            data - A string.
+        '''
+        offset = 0
+        while offset < len(data):
+            head, tail = COUNTERS.unpack_from(self.mm, 0)
+            free = self.size - (head - tail)
+            if not free:
+                self.waitForSpace()
+                continue
+            count = min(free, len(data) - offset)
+            start = head % self.size
+            first = min(count, self.size - start)
+            # Note: Only the writer moves the mapping's file position.
+            self.mm.seek(HEADER+start)
+            self.mm.write(buffer(data, offset, first))
+            if first < count:
+                self.mm.seek(HEADER)
+                self.mm.write(buffer(data, offset+first, count-first))
+            COUNTER.pack_into(self.mm, 0, head + count)
+            offset += count
+
+    def waitForSpace(self):
+        '''
+        Sleep until the reader removes bytes from the ring.
+        '''
+        # Let the reader know what is already in the ring before sleeping
+        ring(self.dataW)
+        scheduler.util.ready.waitFds([self.spaceR], None)
+        if not drain(self.spaceR):
+            raise IOError(errno.EPIPE, 'Receiving end of the ring is closed')
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            os.close(self.dataW)
+            os.close(self.spaceR)
+
+    def fileno(self):
+        return self.spaceR
+
+class Reader(object):
+    '''
+    The receiving end of a shared-memory connection.
+    '''
+    def __init__(self, mm, size, dataR, spaceW):
+        self.mm     = mm
+        self.size   = size
+        self.dataR  = dataR
+        self.spaceW = spaceW
+        self.closed = False
+
+    def recv(self):
+        '''
+        Copy the next IP out of the ring, blocking while the ring is empty.
+
+        Returns:
+            An information packet (or data object).
+        Exceptions:
+            Throws an 'EOFError' when the ring is empty and the sending end
+            is closed.
+        '''
+        length, kind = FRAME.unpack(self.read(FRAME.size))
+        if kind == STRING:
+            return self.read(length)
+        return cPickle.loads(self.read(length))
+
+    def recv_bytes(self):
+        '''
+        Copy the next string out of the ring (see Writer.send_bytes()).
+        '''
+        length, kind = FRAME.unpack(self.read(FRAME.size))
+        return self.read(length)
+
+    def read(self, length):
+        '''
+        Copy the given number of bytes out of the ring.
+
+        Parameters:
+            length - A number of bytes.
+        Returns:
+            A string.
+        '''
+        pieces = []
+        while length:
+            head, tail = COUNTERS.unpack_from(self.mm, 0)
+            if head == tail:
+                self.waitForData()
+                continue
+            count = min(head - tail, length)
+            start = tail % self.size
+            first = min(count, self.size - start)
+            pieces.append(self.mm[HEADER+start:HEADER+start+first])
+            if first < count:
+                pieces.append(self.mm[HEADER:HEADER+count-first])
+            COUNTER.pack_into(self.mm, COUNTER.size, tail + count)
+            ring(self.spaceW)
+            length -= count
+        if len(pieces) == 1:
+            return pieces[0]
+        return ''.join(pieces)
+
+    def waitForData(self):
+        '''
+        Sleep until the writer adds bytes to the ring.
+
+        Exceptions:
+            Throws an 'EOFError' when the ring is empty and the sending end
+            is closed.
+        '''
+        while not self.poll():
+            scheduler.util.ready.waitFds([self.dataR], None)
+        if not self.buffered:
+            raise EOFError
+
+    @property
+    def buffered(self):
+        '''
+        The number of bytes in the ring that have not been received yet.
+        '''
+        head, tail = COUNTERS.unpack_from(self.mm, 0)
+        return head - tail
+
+    def poll(self, timeout=0.0):
+        '''
+        Check if a recv() would return without waiting on the writer.
+
+        Parameters:
+            timeout - The maximum number of seconds to wait for data.
+        Returns:
+            'True' if there is data in the ring or the sending end is closed.
+        '''
+        if self.buffered:
+            return True
+        # Silence the doorbell before looking at the ring again, so a byte
+        # written (and rung for) in between is never missed.
+        if not drain(self.dataR):
+            return True
+        if self.buffered:
+            return True
+        if timeout:
+            scheduler.util.ready.waitFds([self.dataR], timeout)
+            return self.poll()
+        return False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            os.close(self.dataR)
+            os.close(self.spaceW)
+
+    def fileno(self):
+        return self.dataR
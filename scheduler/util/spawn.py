@@ -0,0 +1,169 @@
+import os, sys, fcntl, base64, pickle, logging, subprocess
+import _multiprocessing
+import scheduler
+import scheduler.component.elementary.test
+import scheduler.util.plumber
+import scheduler.util.trace
+'''
+This module starts the processes of a graph without fork()ing a copy of the
+parent; each one is a fresh Python interpreter that is handed only the file
+descriptors of its own connections.  Nothing leaks into the child, so there
+is nothing for it to close (see scheduler.util.plumber).
+
+Between fork() and exec() of a child, every file descriptor but standard
+in, out and error and those of the child's own connections is made
+close-on-exec (see inheritOnly()).  The child rebuilds its connections from
+the descriptor numbers it is given on its command line and runs its
+component.
+
+Limits:
+* Connections must be plain Pipes (the default transport); batching,
+  capacities, shared arrays and shared-memory rings keep state that can not
+  be rebuilt from a file descriptor alone.
+* Blocking events (see scheduler.util.debug) are not supported.
+'''
+
+def inherit(conn, inheritable=True):
+    '''
+    Set whether the file descriptor of the given connection is inherited
+    across exec().
+
+    Parameters:
+        conn - A connection (or a file descriptor).
+        inheritable - When 'True', the default, the descriptor is inherited.
+                      If 'False', it is closed on exec().
+    '''
+    fd    = conn if isinstance(conn, int) else conn.fileno()
+    flags = fcntl.fcntl(fd, fcntl.F_GETFD)
+    if inheritable:
+        flags &= ~fcntl.FD_CLOEXEC
+    else:
+        flags |= fcntl.FD_CLOEXEC
+    fcntl.fcntl(fd, fcntl.F_SETFD, flags)
+
+def inheritOnly(fds):
+    '''
+    Make the given file descriptors, and standard in, out and error, the only
+    ones inherited across exec().
+    Note: Called in a child between fork() and exec(); the cost is one call
+          per open descriptor of the child, not per connection of the network.
+
+    Parameters:
+        fds - A list of file descriptors.
+    '''
+    keep = set([0, 1, 2] + fds)
+    try:
+        openFds = [ int(fd) for fd in os.listdir('/proc/self/fd') ]
+    except OSError:
+        openFds = range(3, os.sysconf('SC_OPEN_MAX'))
+    for fd in openFds:
+        try:
+            inherit(fd, fd in keep)
+        except IOError:
+            pass # not open (e.g. the descriptor listdir() used)
+
+def isSpawnable(conn):
+    '''
+    Parameters:
+        conn - One end of a connection (see scheduler.util.connection.new).
+    Returns:
+        'True' if the given connection can be handed to a spawned process.
+    '''
+    return isinstance(conn, _multiprocessing.Connection)
+
+def logFilename():
+    '''
+    Returns:
+        The file the root logger writes to, or 'None' for standard-error.
+    '''
+    for handler in logging.getLogger().handlers:
+        filename = getattr(handler, 'baseFilename', None)
+        if filename:
+            return filename
+    return None
+
+class Process(object):
+    '''
+    A graph process run in a fresh interpreter; it has the start() and join()
+    methods of a multiprocessing.Process.
+    '''
+    def __init__(self, name, componentName, kwargs):
+        '''
+        Parameters:
+            name - The name of the graph process.
+            componentName - The name of its component (see
+                            scheduler.component.elementary.test.library).
+            kwargs - The interface of the process, as passed to a component
+                     (see scheduler.network.new()).
+        Exceptions:
+            Throws a 'ValueError' when a connection of the process can not be
+            handed to another interpreter.
+        '''
+        self.name  = name
+        self.popen = None
+        ports = {}
+        for portType in ['inports', 'outports']:
+            ports[portType] = {}
+            for portName, conns in kwargs[portType].items():
+                for conn in conns:
+                    if not isSpawnable(conn):
+                        raise ValueError('Process "{proc}" can not be spawned; "{proc}.{port}" is not a plain Pipe.'.format(proc=name, port=portName))
+                ports[portType][portName] = [ conn.fileno() for conn in conns ]
+        self.fds  = [ fd for portType in ports.values() for fds in portType.values() for fd in fds ]
+        self.spec = { 'name'      : name,
+                      'component' : componentName,
+                      'metadata'  : kwargs['core']['metadata'],
+                      'inports'   : ports['inports'],
+                      'outports'  : ports['outports'] }
+
+    @property
+    def pid(self):
+        return self.popen.pid if self.popen else None
+
+    def start(self):
+        '''
+        Start the process.
+        '''
+        spec = dict(self.spec)
+        spec['loglevel'] = logging.getLogger().getEffectiveLevel()
+        spec['logfile']  = logFilename()
+        spec['trace']    = scheduler.util.trace.directory
+        args = [ sys.executable, '-m', 'scheduler.util.spawn', base64.b64encode(pickle.dumps(spec, pickle.HIGHEST_PROTOCOL)) ]
+        # Make sure the child finds this copy of the framework
+        env  = dict(os.environ)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(scheduler.__file__)))
+        env['PYTHONPATH'] = os.pathsep.join([ root ] + [ path for path in [ env.get('PYTHONPATH') ] if path ])
+        fds  = self.fds
+        self.popen = subprocess.Popen(args, env=env, preexec_fn=lambda: inheritOnly(fds))
+        logging.debug('SPWN: {proc} [{pid}]'.format(proc=self.name, pid=self.popen.pid))
+
+    def join(self):
+        '''
+        Block until the process has terminated.
+        '''
+        if self.popen:
+            self.popen.wait()
+
+def main():
+    '''
+    The logic of a spawned process: rebuild its connections and run its
+    component (see Process.start()).
+    '''
+    spec = pickle.loads(base64.b64decode(sys.argv[1]))
+    logging.basicConfig(level=spec['loglevel'], filename=spec['logfile'])
+    if spec['trace']:
+        scheduler.util.trace.enable(spec['trace'])
+    kwargs = { 'core'     : { 'name'     : spec['name'],
+                              'metadata' : spec['metadata'],
+                              'leak'     : scheduler.util.plumber.newLeak(), # nothing leaked
+                              'blockers' : {} },
+               'inports'  : {},
+               'outports' : {} }
+    for portType in ['inports', 'outports']:
+        for portName, fds in spec[portType].items():
+            kwargs[portType][portName] = [ _multiprocessing.Connection(fd) for fd in fds ]
+    fxn = scheduler.component.elementary.test.library[spec['component']]
+    fxn(**kwargs)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+'''
+Inline the graphs of SubNet processes into the graph that contains them.
+'''
+import logging
+import scheduler.util.editor
+
+'''
+Joins the name of a SubNet process to the names of the processes inlined
+from its graph. Ex. process 'proc3' of SubNet 'subnet' becomes 'subnet/proc3'.
+'''
+SEPARATOR = '/'
+
+def isFlattened(process):
+    '''
+    Determine weather the given process is a SubNet that should be inlined.
+    Note: Every SubNet is inlined unless its metadata says otherwise.
+          Example:
+              { 'component' : 'SubNet',
+                'metadata'  : { 'flatten' : false,
+                                'config'  : { 'graph' : '/path/to/graph.json' } } }
+
+    Parameters:
+        process - A process from a graph's 'processes' attribute.
+    Returns:
+        'True' if the given process should be inlined or else 'False'.
+    '''
+    if process['component'] != 'SubNet':
+        return False
+    return process.get('metadata', {}).get('flatten', True)
+
+def flatten(graph):
+    '''
+    Replace every SubNet process, in the given graph, by the processes and
+    connections of its graph (recursively), so data crossing the SubNet's
+    boundary travels straight to (or from) the internal process instead of
+    being relayed by the SubNet process.
+    Note: The SubNet runtime ignores IIPs in its graph, so IIPs of inlined
+          graphs are dropped too.
+
+    Parameters:
+        graph - A graph to modify.
+
+    Returns:
+        The modified graph.
+    '''
+    for processName in graph['processes'].keys():
+        process = graph['processes'][processName]
+        if not isFlattened(process):
+            continue
+        config   = process.get('metadata', {}).get('config', {})
+        subgraph = flatten(scheduler.util.editor.json2graph(config['graph']))
+        inline(graph, processName, subgraph)
+    return graph
+
+def inline(graph, processName, subgraph):
+    '''
+    Replace the given process, in the given graph, by the given subgraph.
+    Connections to (and from) the ports of the process are rewired to the
+    internal ports that the subgraph exports under the same names.
+
+    Parameters:
+        graph - A graph to modify.
+        processName - The name of the process to replace.
+        subgraph - The graph to put in place of the process.
+    '''
+    namespace = lambda name: processName + SEPARATOR + name
+    exports   = { 'inports'  : subgraph.get('inports',  {}),
+                  'outports' : subgraph.get('outports', {}) }
+    def rewire(endpoint, exportType):
+        '''
+        Point the given end of a connection at the internal port behind the
+        exported port it refers to.
+
+        Parameters:
+            endpoint - A process-port specification of the form:
+                       { 'process' : processName, 'port' : portName }
+            exportType - 'inports' or 'outports'
+        Returns:
+            'False' if the end of the connection is on a port the subgraph
+            does not export, or else 'True'.
+        '''
+        if endpoint['process'] != processName:
+            return True
+        try:
+            internal = exports[exportType][endpoint['port']]
+        except KeyError:
+            logging.info('Dropped connection to unexported port: {proc}.{port}'.format(proc=processName,
+                                                                                         port=endpoint['port']))
+            return False
+        endpoint['process'] = namespace(internal['process'])
+        endpoint['port']    = internal['port']
+        return True
+    # Replace the process by the processes of the subgraph
+    del graph['processes'][processName]
+    for name, process in subgraph['processes'].items():
+        graph['processes'][namespace(name)] = process
+    # Rewire the connections to (and from) the process
+    connections = []
+    for connection in graph['connections']:
+        if 'src' in connection and not rewire(connection['src'], 'outports'):
+            continue
+        if not rewire(connection['tgt'], 'inports'):
+            continue
+        connections.append(connection)
+    # Add the connections of the subgraph (but not its IIPs)
+    for connection in subgraph.get('connections', []):
+        if 'src' not in connection:
+            continue
+        src = (namespace(connection['src']['process']), connection['src']['port'])
+        tgt = (namespace(connection['tgt']['process']), connection['tgt']['port'])
+        scheduler.util.editor.connection({'connections' : connections}, src, tgt, metadata=connection.get('metadata', None))
+    graph['connections'] = connections
+    # Rewire the exported ports of the graph
+    for exportType in ['inports', 'outports']:
+        for portName, endpoint in graph.get(exportType, {}).items():
+            if not rewire(endpoint, exportType):
+                del graph[exportType][portName]
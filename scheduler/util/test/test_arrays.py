@@ -0,0 +1,87 @@
+import unittest
+import numpy
+import scheduler.network
+import scheduler.util.arrays
+import scheduler.util.connection
+import scheduler.util.editor
+
+class TestArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.tgtConn, self.srcConn = scheduler.util.connection.new({ 'arrays' : { 'threshold' : 1024 } })
+
+    def tearDown(self):
+        self.tgtConn.close()
+        self.srcConn.close()
+
+    def test_sendRecv(self):
+        array = numpy.arange(1000, dtype=numpy.float64).reshape(10, 100)
+        self.srcConn.send(array)
+        received = self.tgtConn.recv()
+        numpy.testing.assert_array_equal(array, received)
+        self.assertTrue(scheduler.util.arrays.segmentOf(received) is not None)
+        # strided views are shared as they are
+        self.srcConn.send(received[::2, 3:])
+        numpy.testing.assert_array_equal(array[::2, 3:], self.tgtConn.recv())
+
+    def test_smallAndOther(self):
+        small = numpy.arange(10)
+        self.srcConn.send(small)
+        self.srcConn.send({ 'key' : 'value' })
+        received = self.tgtConn.recv()
+        numpy.testing.assert_array_equal(small, received)
+        self.assertEqual(None, scheduler.util.arrays.segmentOf(received))
+        self.assertEqual({ 'key' : 'value' }, self.tgtConn.recv())
+
+    def test_forwardWithoutCopy(self):
+        self.srcConn.send(numpy.zeros(1024))
+        first = self.tgtConn.recv()
+        self.srcConn.send(first)
+        second = self.tgtConn.recv()
+        second[0] = 5
+        self.assertEqual(5, first[0])
+
+    def test_release(self):
+        before = len(scheduler.util.arrays.segments)
+        self.srcConn.send(numpy.zeros(1024))
+        received = self.tgtConn.recv()
+        view = received[10:]
+        self.assertEqual(before+1, len(scheduler.util.arrays.segments))
+        del received
+        self.assertEqual(before+1, len(scheduler.util.arrays.segments))
+        del view
+        self.assertEqual(before, len(scheduler.util.arrays.segments))
+
+    def test_badOptions(self):
+        self.assertRaises(ValueError, scheduler.util.connection.new, { 'arrays'    : {},
+                                                                      'transport' : 'shm' })
+        self.assertRaises(ValueError, scheduler.util.connection.new, { 'arrays' : {},
+                                                                      'batch'  : { 'count' : 16 } })
+
+    def test_network(self):
+        # IN -> info -> noop -> OUT, sharing arrays
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'info', 'Info')
+        scheduler.util.editor.process(graph, 'noop', 'NoOp')
+        scheduler.util.editor.connection(graph, 'info', 'noop')
+        scheduler.util.editor.export(graph, 'IN', 'info', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', 'noop', isInport=False)
+        scheduler.util.editor.setConnectionDefaults(graph, { 'arrays' : {} })
+        network = scheduler.network.new(graph)
+        scheduler.network.start(network)
+        arrays = [ numpy.random.rand(256, 256), numpy.arange(5) ]
+        for array in arrays:
+            network['interface']['inports']['IN'][0].send(array)
+        scheduler.network.closePortsByType(network, isInport=True)
+        for array in arrays:
+            numpy.testing.assert_array_equal(array, network['interface']['outports']['OUT'][0].recv())
+        self.assertRaises(EOFError, network['interface']['outports']['OUT'][0].recv)
+        scheduler.network.stop(network)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_arrays')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
@@ -0,0 +1,93 @@
+import unittest, time
+import scheduler.network
+import scheduler.util.batch
+import scheduler.util.connection
+import scheduler.util.editor
+import scheduler.util.ready
+
+class TestBatch(unittest.TestCase):
+
+    def newConnection(self, **batch):
+        tgtConn, srcConn = scheduler.util.connection.new({ 'batch' : batch })
+        self.conns = [tgtConn, srcConn]
+        return tgtConn, srcConn
+
+    def tearDown(self):
+        for conn in self.conns:
+            conn.close()
+
+    def test_new(self):
+        tgtConn, srcConn = scheduler.util.connection.new()
+        self.conns = [tgtConn, srcConn]
+        self.assertFalse(isinstance(srcConn, scheduler.util.batch.Sender))
+        tgtConn, srcConn = self.newConnection(count=4)
+        self.assertTrue(isinstance(tgtConn, scheduler.util.batch.Receiver))
+        self.assertTrue(isinstance(srcConn, scheduler.util.batch.Sender))
+
+    def test_count(self):
+        tgtConn, srcConn = self.newConnection(count=4, linger=None)
+        for i in range(3):
+            srcConn.send(i)
+        self.assertFalse(tgtConn.poll())
+        srcConn.send(3)
+        self.assertTrue(tgtConn.poll())
+        self.assertEqual(range(4), [ tgtConn.recv() for i in range(4) ])
+
+    def test_bytes(self):
+        tgtConn, srcConn = self.newConnection(count=1000, bytes=100, linger=None)
+        srcConn.send('x')
+        self.assertFalse(tgtConn.poll())
+        srcConn.send('y'*100)
+        self.assertEqual(['x', 'y'*100], [ tgtConn.recv(), tgtConn.recv() ])
+
+    def test_linger(self):
+        tgtConn, srcConn = self.newConnection(count=1000, linger=0.05)
+        srcConn.send({'a' : 1})
+        self.assertFalse(tgtConn.poll())
+        self.assertTrue(tgtConn.poll(1.0))
+        self.assertEqual({'a' : 1}, tgtConn.recv())
+
+    def test_close(self):
+        tgtConn, srcConn = self.newConnection(count=1000, linger=None)
+        srcConn.send(1)
+        srcConn.close()
+        self.assertEqual(1, tgtConn.recv())
+        self.assertRaises(EOFError, tgtConn.recv)
+
+    def test_buffered(self):
+        tgtConn, srcConn = self.newConnection(count=2, linger=None)
+        srcConn.send(1)
+        srcConn.send(2)
+        self.assertEqual(1, tgtConn.recv())
+        # the second IP is out of the pipe, but still ready
+        self.assertEqual(1, tgtConn.buffered)
+        self.assertEqual([tgtConn], scheduler.util.ready.wait([tgtConn], timeout=0))
+        self.assertEqual(2, tgtConn.recv())
+
+    def test_network(self):
+        # IN -> noop1 -> noop2 -> OUT, batching on every connection
+        batch = { 'batch' : { 'count' : 16 } }
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'noop1', 'NoOp')
+        scheduler.util.editor.process(graph, 'noop2', 'NoOp')
+        scheduler.util.editor.connection(graph, 'noop1', 'noop2', metadata=batch)
+        scheduler.util.editor.export(graph, 'IN', 'noop1', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', 'noop2', isInport=False)
+        graph['inports']['IN']['metadata']   = batch
+        graph['outports']['OUT']['metadata'] = batch
+        network = scheduler.network.new(graph)
+        self.conns = []
+        scheduler.network.start(network)
+        for i in range(100):
+            network['interface']['inports']['IN'][0].send(i)
+        scheduler.network.closePortsByType(network, isInport=True)
+        self.assertEqual(range(100), [ network['interface']['outports']['OUT'][0].recv() for i in range(100) ])
+        scheduler.network.stop(network)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_batch')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
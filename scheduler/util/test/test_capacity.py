@@ -0,0 +1,93 @@
+import unittest
+from threading import Thread
+import scheduler.network
+import scheduler.util.capacity
+import scheduler.util.connection
+import scheduler.util.editor
+
+def feed(conn, data):
+    for item in data:
+        conn.send(item)
+    conn.close()
+
+class TestCapacity(unittest.TestCase):
+
+    def test_count(self):
+        tgtConn, srcConn = scheduler.util.connection.new({ 'capacity' : { 'count' : 2 } })
+        srcConn.send(1, block=False)
+        srcConn.send(2, block=False)
+        self.assertRaises(scheduler.util.capacity.Full, srcConn.send, 3, block=False)
+        self.assertEqual(1, tgtConn.recv())
+        srcConn.send(3, block=False)
+        self.assertEqual([2, 3], [tgtConn.recv(), tgtConn.recv()])
+        self.assertEqual(2, srcConn.highWater)
+        srcConn.close()
+        tgtConn.close()
+
+    def test_bytes(self):
+        tgtConn, srcConn = scheduler.util.connection.new({ 'capacity' : { 'bytes' : 100 } })
+        srcConn.send('x' * 60, block=False)
+        self.assertRaises(scheduler.util.capacity.Full, srcConn.send, 'x' * 60, block=False)
+        tgtConn.recv()
+        # an IP larger than the capacity fits an empty connection
+        srcConn.send('x' * 500, block=False)
+        self.assertEqual(500, len(tgtConn.recv()))
+        self.assertEqual(500, srcConn.highWaterBytes)
+        srcConn.close()
+        tgtConn.close()
+
+    def test_block(self):
+        tgtConn, srcConn = scheduler.util.connection.new({ 'capacity' : { 'count' : 1 } })
+        feeder = Thread(target=feed, args=(srcConn, range(100)))
+        feeder.start()
+        self.assertEqual(range(100), [ tgtConn.recv() for i in range(100) ])
+        feeder.join()
+        self.assertEqual(1, srcConn.highWater)
+        tgtConn.close()
+
+    def test_blockWithBatch(self):
+        # IPs held in a batch are flushed before the sender waits for room
+        tgtConn, srcConn = scheduler.util.connection.new({ 'capacity' : { 'count' : 5 },
+                                                          'batch'    : { 'count' : 4, 'linger' : None } })
+        feeder = Thread(target=feed, args=(srcConn, range(50)))
+        feeder.start()
+        self.assertEqual(range(50), [ tgtConn.recv() for i in range(50) ])
+        feeder.join()
+        self.assertTrue(srcConn.highWater <= 5)
+        tgtConn.close()
+
+    def test_receiverClosed(self):
+        tgtConn, srcConn = scheduler.util.connection.new({ 'capacity' : { 'count' : 1 } })
+        srcConn.send(1)
+        tgtConn.close()
+        self.assertRaises(IOError, srcConn.send, 2)
+        srcConn.close()
+
+    def test_badOptions(self):
+        self.assertRaises(ValueError, scheduler.util.connection.new, { 'capacity'  : { 'count' : 1 },
+                                                                      'transport' : 'shm' })
+
+    def test_network(self):
+        # IN -> noop1 -> noop2 -> OUT, holding at most 2 IPs per connection
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'noop1', 'NoOp')
+        scheduler.util.editor.process(graph, 'noop2', 'NoOp')
+        scheduler.util.editor.connection(graph, 'noop1', 'noop2', metadata={ 'capacity' : { 'count' : 2 } })
+        scheduler.util.editor.export(graph, 'IN', 'noop1', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', 'noop2', isInport=False)
+        network = scheduler.network.new(graph)
+        scheduler.network.start(network)
+        feeder = Thread(target=feed, args=(network['interface']['inports']['IN'][0], range(1000)))
+        feeder.start()
+        self.assertEqual(range(1000), [ network['interface']['outports']['OUT'][0].recv() for i in range(1000) ])
+        feeder.join()
+        self.assertRaises(EOFError, network['interface']['outports']['OUT'][0].recv)
+        scheduler.network.stop(network)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_capacity')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
@@ -0,0 +1,105 @@
+import os
+import unittest
+import scheduler.network
+import scheduler.component.elementary.test
+import scheduler.util.editor
+import scheduler.util.forkserver
+from scheduler.util.test.test_spawn import chain
+
+def double(core, inports, outports):
+    '''
+    A component that is not in the library until this module is imported.
+    '''
+    while True:
+        try:
+            data = inports['in'][0].recv()
+        except EOFError:
+            break
+        outports['out'][0].send(data * 2)
+    outports['out'][0].close()
+
+scheduler.component.elementary.test.library.setdefault('ForkServerDouble', double)
+
+def parentPid(pid):
+    with open('/proc/{pid}/stat'.format(pid=pid)) as f:
+        return int(f.read().rsplit(')', 1)[1].split()[1])
+
+class TestForkServer(unittest.TestCase):
+
+    def test_network(self):
+        network = scheduler.network.new(chain(4), startMethod='forkserver')
+        scheduler.network.start(network)
+        inConn  = network['interface']['inports']['IN'][0]
+        outConn = network['interface']['outports']['OUT'][0]
+        inConn.send(-1)
+        self.assertEqual(-1, outConn.recv())
+        server = scheduler.util.forkserver.state['process'].pid
+        for process in network['processes']:
+            # Each process is a child of the server, not of this process
+            self.assertEqual(server, parentPid(process.pid))
+            # It holds its in-port and out-port connections and its status
+            # connection, and no other connection of the network.
+            fds     = [ fd for fd in os.listdir('/proc/{pid}/fd'.format(pid=process.pid)) if int(fd) > 2 ] # not standard in, out and error
+            sockets = [ fd for fd in fds if os.readlink('/proc/{pid}/fd/{fd}'.format(pid=process.pid, fd=fd)).startswith('socket:') ]
+            self.assertEqual(3, len(sockets))
+        for i in range(100):
+            inConn.send(i)
+        inConn.close()
+        self.assertEqual(range(100), [ outConn.recv() for i in range(100) ])
+        self.assertRaises(EOFError, outConn.recv)
+        scheduler.network.stop(network)
+
+    def test_reuse(self):
+        # A second network is forked by the same server
+        pids = []
+        for i in range(2):
+            network = scheduler.network.new(chain(2), startMethod='forkserver')
+            scheduler.network.start(network)
+            network['interface']['inports']['IN'][0].send(i)
+            self.assertEqual(i, network['interface']['outports']['OUT'][0].recv())
+            pids.append(scheduler.util.forkserver.state['process'].pid)
+            scheduler.network.stop(network)
+        self.assertEqual(pids[0], pids[1])
+
+    def test_batch(self):
+        # One request starts all the processes of a network
+        requests = []
+        startAll = scheduler.util.forkserver.Process.startAll
+        def record(processes):
+            requests.append(len(processes))
+            startAll(processes)
+        scheduler.util.forkserver.Process.startAll = staticmethod(record)
+        try:
+            network = scheduler.network.new(chain(10), startMethod='forkserver')
+            scheduler.network.start(network)
+        finally:
+            scheduler.util.forkserver.Process.startAll = staticmethod(startAll)
+        self.assertEqual([10], requests)
+        network['interface']['inports']['IN'][0].send(1)
+        self.assertEqual(1, network['interface']['outports']['OUT'][0].recv())
+        scheduler.network.stop(network)
+
+    def test_preload(self):
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'double', 'ForkServerDouble')
+        scheduler.util.editor.export(graph, 'IN', ('double', 'in'), isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', ('double', 'out'), isInport=False)
+        network = scheduler.network.new(graph, startMethod='forkserver', preload=['scheduler.util.test.test_forkserver'])
+        self.assertTrue('scheduler.util.test.test_forkserver' in scheduler.util.forkserver.state['preload'])
+        scheduler.network.start(network)
+        network['interface']['inports']['IN'][0].send(21)
+        self.assertEqual(42, network['interface']['outports']['OUT'][0].recv())
+        scheduler.network.stop(network)
+
+    def test_notSpawnable(self):
+        graph = chain(2, metadata={ 'capacity' : { 'count' : 4 } })
+        self.assertRaises(ValueError, scheduler.network.new, graph, startMethod='forkserver')
+        self.assertRaises(ValueError, scheduler.network.new, chain(2), startMethod='forkserver', workers=2)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_forkserver')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
@@ -0,0 +1,70 @@
+import unittest
+from threading import Thread
+import scheduler.util.capacity
+import scheduler.util.local
+import scheduler.util.ready
+
+def feed(conn, data):
+    for item in data:
+        conn.send(item)
+    conn.close()
+
+class TestLocal(unittest.TestCase):
+
+    def test_sendRecv(self):
+        reader, writer = scheduler.util.local.Pipe()
+        self.assertFalse(reader.poll())
+        data = { 'key' : [1, 2, 3] }
+        writer.send(data)
+        self.assertTrue(reader.poll())
+        # handed over by reference
+        self.assertTrue(data is reader.recv())
+        writer.close()
+        self.assertTrue(reader.poll())
+        self.assertRaises(EOFError, reader.recv)
+        reader.close()
+
+    def test_thread(self):
+        reader, writer = scheduler.util.local.Pipe()
+        feeder = Thread(target=feed, args=(writer, range(1000)))
+        feeder.start()
+        self.assertEqual(range(1000), [ reader.recv() for i in range(1000) ])
+        self.assertRaises(EOFError, reader.recv)
+        feeder.join()
+        reader.close()
+
+    def test_ready(self):
+        reader, writer = scheduler.util.local.Pipe()
+        self.assertEqual([], scheduler.util.ready.wait([reader], timeout=0))
+        feeder = Thread(target=feed, args=(writer, [1]))
+        feeder.start()
+        self.assertEqual([reader], scheduler.util.ready.wait([reader], timeout=5))
+        self.assertEqual(1, reader.recv())
+        feeder.join()
+        self.assertEqual([reader], scheduler.util.ready.wait([reader], timeout=5))
+        reader.close()
+
+    def test_capacity(self):
+        reader, writer = scheduler.util.local.Pipe(count=2)
+        writer.send(1, block=False)
+        writer.send(2, block=False)
+        self.assertRaises(scheduler.util.capacity.Full, writer.send, 3, block=False)
+        reader.recv()
+        writer.send(3, block=False)
+        self.assertEqual(2, writer.highWater)
+        writer.close()
+        reader.close()
+
+    def test_readerClosed(self):
+        reader, writer = scheduler.util.local.Pipe()
+        reader.close()
+        self.assertRaises(IOError, writer.send, 1)
+        writer.close()
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_local')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
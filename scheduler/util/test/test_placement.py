@@ -0,0 +1,73 @@
+import unittest
+import scheduler.network
+import scheduler.util.editor
+import scheduler.util.placement
+from multiprocessing import Process
+from threading import Thread
+
+class TestPlacement(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(self.graph, 'stdin', '_StdIn_')
+        scheduler.util.editor.process(self.graph, 'noop', 'NoOp')
+        scheduler.util.editor.process(self.graph, 'subnet', 'SubNet')
+        scheduler.util.editor.process(self.graph, 'custom', 'Custom')
+        scheduler.util.editor.process(self.graph, '_custom_', '_Custom_')
+
+    def test_names(self):
+        plan = scheduler.util.placement.plan(self.graph)
+        self.assertEqual(('thread',  'name'), plan['stdin'])
+        self.assertEqual(('process', 'name'), plan['noop'])
+        self.assertEqual(('process', 'name'), plan['subnet'])
+        self.assertEqual(('process', 'name'), plan['custom'])
+        self.assertEqual(('thread',  'name'), plan['_custom_'])
+
+    def test_auto(self):
+        plan = scheduler.util.placement.plan(self.graph, 'auto')
+        self.assertEqual(('thread',  'cost'), plan['stdin'])
+        self.assertEqual(('thread',  'cost'), plan['noop'])
+        self.assertEqual(('process', 'cost'), plan['subnet'])
+        # Unknown costs fall back to names
+        self.assertEqual(('process', 'name'), plan['custom'])
+        self.assertEqual(('thread',  'name'), plan['_custom_'])
+
+    def test_metadata(self):
+        scheduler.util.editor.process(self.graph, 'noop', 'NoOp', metadata={ 'placement' : 'process' })
+        scheduler.util.editor.process(self.graph, 'custom', 'Custom', metadata={ 'cost' : 'io' })
+        scheduler.util.editor.process(self.graph, 'stdin', '_StdIn_', metadata={ 'cost' : 'cpu' })
+        plan = scheduler.util.placement.plan(self.graph, 'auto')
+        self.assertEqual(('process', 'metadata'), plan['noop'])
+        self.assertEqual(('thread',  'cost'), plan['custom'])
+        self.assertEqual(('process', 'cost'), plan['stdin'])
+        scheduler.util.editor.process(self.graph, 'bad', 'NoOp', metadata={ 'placement' : 'gpu' })
+        self.assertRaises(ValueError, scheduler.util.placement.plan, self.graph)
+        self.assertRaises(ValueError, scheduler.util.placement.plan, self.graph, 'fastest')
+
+    def test_network(self):
+        graph = scheduler.util.editor.newGraph()
+        for name in ['noop1', 'noop2', 'noop3']:
+            scheduler.util.editor.process(graph, name, 'NoOp')
+        scheduler.util.editor.process(graph, 'add', 'Add', metadata={ 'cost' : 'cpu' })
+        scheduler.util.editor.connection(graph, 'noop1', 'noop2')
+        scheduler.util.editor.connection(graph, 'noop2', 'noop3')
+        scheduler.util.editor.connection(graph, 'noop3', ('add', 'a'))
+        scheduler.util.editor.iip(graph, 1, ('add', 'b'))
+        scheduler.util.editor.export(graph, 'IN', 'noop1', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', ('add', 'sum'), isInport=False)
+        scheduler.util.placement.apply(graph, 'auto')
+        network = scheduler.network.new(graph)
+        self.assertEqual(3, len([ process for process in network['processes'] if isinstance(process, Thread) ]))
+        self.assertEqual(1, len([ process for process in network['processes'] if isinstance(process, Process) ]))
+        scheduler.network.start(network)
+        network['interface']['inports']['IN'][0].send(41)
+        self.assertEqual(42, network['interface']['outports']['OUT'][0].recv())
+        scheduler.network.stop(network)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_placement')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
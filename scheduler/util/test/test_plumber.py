@@ -135,7 +135,8 @@ class TestPlumber(unittest.TestCase):
         testConns= { 'inports'     : inports,
                      'outports'    : outports }
         testLeak = { 'connections' : testConns,
-                     'threads'     : threads }
+                     'threads'     : threads,
+                     'index'       : {} }
         
         leakSetValues   = scheduler.util.plumber.newLeak(inports=inports, outports=outports, threads=threads)
         leakUseDefaults = scheduler.util.plumber.newLeak()
@@ -234,6 +235,22 @@ class TestPlumber(unittest.TestCase):
             self.assertSetEqual(connHaveSet, connNeedSet)
             self.assertSetEqual(leakResult['threads'], testInfos[i]['threads'])
 
+    def test_index(self):
+        leak = scheduler.util.plumber.newLeak(inports=[], outports=[], threads=set([]))
+        for i in range(3):
+            tgtConn, srcConn = Pipe()
+            scheduler.util.plumber.append(leak, 'foo', srcConn, 'proc{num}'.format(num=i), 'out', False, inport=False)
+            scheduler.util.plumber.append(leak, 'foo', tgtConn, 'proc{num}'.format(num=i+1), 'in', False, inport=True)
+        self.assertEqual(set(['proc0', 'proc1', 'proc2', 'proc3']), set(leak['index'].keys()))
+        self.assertEqual(['in'],  [ connInfo['port'] for connInfo in leak['index']['proc1']['inports'] ])
+        self.assertEqual(['out'], [ connInfo['port'] for connInfo in leak['index']['proc1']['outports'] ])
+        # A copy indexes the same connections
+        copy = scheduler.util.plumber.newLeak(inports=leak['connections']['inports'], outports=leak['connections']['outports'])
+        self.assertEqual(leak['index'], copy['index'])
+        scheduler.util.plumber.closeByProcess(leak, 'proc1')
+        closed = [ connInfo['process'] for connInfo in leak['connections']['inports'] + leak['connections']['outports'] if connInfo['connection'].closed ]
+        self.assertEqual(['proc0', 'proc2', 'proc2', 'proc3'], sorted(closed))
+
     def test_append(self):
         tgtConn, srcConn = Pipe()
         leak             = scheduler.util.plumber.newLeak(inports=[], outports=[], threads=set([]))
@@ -0,0 +1,78 @@
+import unittest
+import scheduler.network
+import scheduler.util.editor
+import scheduler.util.local
+import scheduler.util.pool
+
+def chain(length):
+    '''
+    IN -> noop0 -> noop1 -> ... -> OUT
+    '''
+    graph = scheduler.util.editor.newGraph()
+    names = [ 'noop{index}'.format(index=i) for i in range(length) ]
+    for name in names:
+        scheduler.util.editor.process(graph, name, 'NoOp')
+    for src, tgt in zip(names[:-1], names[1:]):
+        scheduler.util.editor.connection(graph, src, tgt)
+    scheduler.util.editor.export(graph, 'IN', names[0], isInport=True)
+    scheduler.util.editor.export(graph, 'OUT', names[-1], isInport=False)
+    return graph
+
+class TestPool(unittest.TestCase):
+
+    def test_assign(self):
+        graph = chain(10)
+        scheduler.util.editor.process(graph, 'thread', '_NoOp_')
+        pool = scheduler.util.pool.assign(graph, 3)
+        self.assertFalse('thread' in pool)
+        self.assertEqual(set([0, 1, 2]), set(pool.values()))
+        # a chain is split into contiguous runs
+        workers = [ pool['noop{index}'.format(index=i)] for i in range(10) ]
+        self.assertEqual(sorted(workers), workers)
+
+    def test_assignFewProcesses(self):
+        pool = scheduler.util.pool.assign(chain(2), 8)
+        self.assertEqual(set([0, 1]), set(pool.values()))
+
+    def test_network(self):
+        network = scheduler.network.new(chain(20), workers=3)
+        self.assertEqual(3, len(network['processes']))
+        local = [ connInfo for connInfo in network['leak']['connections']['inports']
+                  if isinstance(connInfo['connection'], scheduler.util.local.Reader) ]
+        self.assertEqual(17, len(local))
+        scheduler.network.start(network)
+        for i in range(100):
+            network['interface']['inports']['IN'][0].send(i)
+        scheduler.network.closePortsByType(network, isInport=True)
+        self.assertEqual(range(100), [ network['interface']['outports']['OUT'][0].recv() for i in range(100) ])
+        self.assertRaises(EOFError, network['interface']['outports']['OUT'][0].recv)
+        scheduler.network.stop(network)
+
+    def test_merge(self):
+        # Two producers and a Merge in one worker
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'noop1', 'NoOp')
+        scheduler.util.editor.process(graph, 'noop2', 'NoOp')
+        scheduler.util.editor.process(graph, 'merge', 'Merge')
+        scheduler.util.editor.connection(graph, 'noop1', 'merge')
+        scheduler.util.editor.connection(graph, 'noop2', 'merge')
+        scheduler.util.editor.export(graph, 'IN1', 'noop1', isInport=True)
+        scheduler.util.editor.export(graph, 'IN2', 'noop2', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', 'merge', isInport=False)
+        network = scheduler.network.new(graph, workers=1)
+        scheduler.network.start(network)
+        for i in range(50):
+            network['interface']['inports']['IN1'][0].send(i)
+            network['interface']['inports']['IN2'][0].send(-i)
+        scheduler.network.closePortsByType(network, isInport=True)
+        data = [ network['interface']['outports']['OUT'][0].recv() for i in range(100) ]
+        self.assertEqual(sorted(range(50) + [ -i for i in range(50) ]), sorted(data))
+        scheduler.network.stop(network)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_pool')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
@@ -0,0 +1,54 @@
+import scheduler.util.ready
+import unittest, time
+from multiprocessing import Pipe
+
+class TestReady(unittest.TestCase):
+
+    def setUp(self):
+        self.pipes = [ Pipe() for i in range(4) ]
+        self.tgts  = [ tgtConn for tgtConn, _ in self.pipes ]
+        self.srcs  = [ srcConn for _, srcConn in self.pipes ]
+
+    def tearDown(self):
+        for tgtConn, srcConn in self.pipes:
+            tgtConn.close()
+            srcConn.close()
+
+    def test_wait(self):
+        # nothing sent so nothing is ready
+        self.assertEqual([], scheduler.util.ready.wait(self.tgts, timeout=0))
+        # data is ready
+        self.srcs[2].send('data')
+        self.assertEqual([self.tgts[2]], scheduler.util.ready.wait(self.tgts, timeout=0))
+        # EOF is ready
+        self.srcs[0].close()
+        self.assertEqual([self.tgts[0], self.tgts[2]], scheduler.util.ready.wait(self.tgts))
+        # no connections
+        self.assertEqual([], scheduler.util.ready.wait([]))
+
+    def test_waitAny(self):
+        self.assertTrue(scheduler.util.ready.waitAny([]))
+        start = time.time()
+        self.assertFalse(scheduler.util.ready.waitAny(self.tgts, timeout=0.1))
+        self.assertTrue(time.time() - start >= 0.09)
+        self.srcs[3].send('data')
+        self.assertTrue(scheduler.util.ready.waitAny(self.tgts))
+
+    def test_waitAll(self):
+        self.assertTrue(scheduler.util.ready.waitAll([]))
+        for srcConn in self.srcs[:-1]:
+            srcConn.send('data')
+        self.assertFalse(scheduler.util.ready.waitAll(self.tgts, timeout=0.1))
+        self.srcs[-1].send('data')
+        self.assertTrue(scheduler.util.ready.waitAll(self.tgts))
+        # waiting does not consume the data
+        for tgtConn in self.tgts:
+            self.assertEqual('data', tgtConn.recv())
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_ready')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
@@ -0,0 +1,98 @@
+import unittest
+from multiprocessing import Process
+import scheduler.network
+import scheduler.util.connection
+import scheduler.util.editor
+import scheduler.util.ready
+import scheduler.util.ring
+
+def echo(reader, writer, count):
+    for i in range(count):
+        writer.send(reader.recv())
+    writer.close()
+
+class TestRing(unittest.TestCase):
+
+    def test_sendRecv(self):
+        reader, writer = scheduler.util.ring.Pipe(size=1024)
+        self.assertFalse(reader.poll())
+        writer.send({'a' : [1, 2, 3]})
+        self.assertTrue(reader.poll())
+        self.assertEqual({'a' : [1, 2, 3]}, reader.recv())
+        self.assertFalse(reader.poll())
+        writer.close()
+        self.assertTrue(reader.poll())
+        self.assertRaises(EOFError, reader.recv)
+        reader.close()
+
+    def test_wrapAround(self):
+        reader, writer = scheduler.util.ring.Pipe(size=100)
+        for i in range(50):
+            data = str(i) * 7
+            writer.send(data)
+            self.assertEqual(data, reader.recv())
+        writer.close()
+        reader.close()
+
+    def test_largerThanRing(self):
+        # The IP streams through the ring while another process reads it.
+        inReader,  inWriter  = scheduler.util.ring.Pipe(size=4096)
+        outReader, outWriter = scheduler.util.ring.Pipe(size=4096)
+        proc = Process(target=echo, args=(inReader, outWriter, 2))
+        proc.start()
+        outWriter.close()
+        inReader.close()
+        data = 'x' * 100000
+        inWriter.send(data)
+        self.assertEqual(data, outReader.recv())
+        inWriter.send('small')
+        self.assertEqual('small', outReader.recv())
+        self.assertRaises(EOFError, outReader.recv)
+        proc.join()
+        self.assertEqual(0, proc.exitcode)
+
+    def test_readerClosed(self):
+        reader, writer = scheduler.util.ring.Pipe(size=1024)
+        reader.close()
+        self.assertRaises(IOError, writer.send, 'data')
+        writer.close()
+
+    def test_ready(self):
+        reader, writer = scheduler.util.ring.Pipe(size=1024)
+        self.assertEqual([], scheduler.util.ready.wait([reader], timeout=0))
+        writer.send(1)
+        self.assertEqual([reader], scheduler.util.ready.wait([reader]))
+        reader.recv()
+        # the doorbell is still ringing, but there is nothing to receive
+        self.assertEqual([], scheduler.util.ready.wait([reader], timeout=0.05))
+        writer.close()
+        reader.close()
+
+    def test_network(self):
+        # IN -> noop1 -> noop2 -> OUT, over shared memory
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'noop1', 'NoOp')
+        scheduler.util.editor.process(graph, 'noop2', 'NoOp')
+        scheduler.util.editor.connection(graph, 'noop1', 'noop2')
+        scheduler.util.editor.export(graph, 'IN', 'noop1', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', 'noop2', isInport=False)
+        scheduler.util.editor.setConnectionDefaults(graph, { 'transport' : 'shm',
+                                                            'shm'       : { 'size' : 65536 } })
+        network = scheduler.network.new(graph)
+        self.assertTrue(isinstance(network['interface']['inports']['IN'][0], scheduler.util.ring.Writer))
+        scheduler.network.start(network)
+        data = [ 'x' * 100000, 1, { 'key' : 'value' } ]
+        for item in data:
+            network['interface']['inports']['IN'][0].send(item)
+        scheduler.network.closePortsByType(network, isInport=True)
+        self.assertEqual(data, [ network['interface']['outports']['OUT'][0].recv() for item in data ])
+        self.assertRaises(EOFError, network['interface']['outports']['OUT'][0].recv)
+        scheduler.network.stop(network)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_ring')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
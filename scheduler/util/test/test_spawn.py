@@ -0,0 +1,55 @@
+import os
+import unittest
+import scheduler.network
+import scheduler.util.editor
+import scheduler.util.spawn
+
+def chain(length, metadata=None):
+    '''
+    IN -> noop0 -> noop1 -> ... -> OUT
+    '''
+    graph = scheduler.util.editor.newGraph()
+    names = [ 'noop{index}'.format(index=i) for i in range(length) ]
+    for name in names:
+        scheduler.util.editor.process(graph, name, 'NoOp')
+    for src, tgt in zip(names[:-1], names[1:]):
+        scheduler.util.editor.connection(graph, src, tgt, metadata=metadata)
+    scheduler.util.editor.export(graph, 'IN', names[0], isInport=True)
+    scheduler.util.editor.export(graph, 'OUT', names[-1], isInport=False)
+    return graph
+
+class TestSpawn(unittest.TestCase):
+
+    def test_network(self):
+        network = scheduler.network.new(chain(4), startMethod='spawn')
+        scheduler.network.start(network)
+        inConn  = network['interface']['inports']['IN'][0]
+        outConn = network['interface']['outports']['OUT'][0]
+        inConn.send(-1)
+        self.assertEqual(-1, outConn.recv())
+        # Each process holds its in-port and out-port connections, and no
+        # other connection of the network.
+        for process in network['processes']:
+            fds     = os.listdir('/proc/{pid}/fd'.format(pid=process.pid))
+            sockets = [ fd for fd in fds if os.readlink('/proc/{pid}/fd/{fd}'.format(pid=process.pid, fd=fd)).startswith('socket:') ]
+            self.assertEqual(2, len(sockets))
+        for i in range(100):
+            inConn.send(i)
+        inConn.close()
+        self.assertEqual(range(100), [ outConn.recv() for i in range(100) ])
+        self.assertRaises(EOFError, outConn.recv)
+        scheduler.network.stop(network)
+
+    def test_notSpawnable(self):
+        graph = chain(2, metadata={ 'capacity' : { 'count' : 4 } })
+        self.assertRaises(ValueError, scheduler.network.new, graph, startMethod='spawn')
+        self.assertRaises(ValueError, scheduler.network.new, chain(2), startMethod='spawn', workers=2)
+        self.assertRaises(ValueError, scheduler.network.new, chain(2), startMethod='exec')
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_spawn')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
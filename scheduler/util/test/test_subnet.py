@@ -0,0 +1,71 @@
+import unittest, sys, os, json, shutil, tempfile
+import scheduler.network
+import scheduler.util.editor
+import scheduler.util.subnet
+
+class TestSubNet(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.subnetPath = '{prefix}/graphs/test/subnet.json'.format(prefix=sys.prefix)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def usesSubnet(self, subnetPath, metadata=None):
+        # in -> proc1 -> subnet -> proc2 -> out
+        graph    = scheduler.util.editor.newGraph()
+        metadata = dict(metadata or {}, config={ 'graph' : subnetPath })
+        scheduler.util.editor.process(graph, 'proc1', 'NoOp')
+        scheduler.util.editor.process(graph, 'subnet', 'SubNet', metadata=metadata)
+        scheduler.util.editor.process(graph, 'proc2', 'NoOp')
+        scheduler.util.editor.connection(graph, 'proc1', ('subnet', 'IN'))
+        scheduler.util.editor.connection(graph, ('subnet', 'OUT'), 'proc2')
+        scheduler.util.editor.export(graph, 'IN', 'proc1', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', 'proc2', isInport=False)
+        return graph
+
+    def write(self, graph, basename):
+        path = os.path.join(self.tmpDir, basename)
+        with open(path, 'w') as f:
+            f.write(json.dumps(graph))
+        return path
+
+    def test_isFlattened(self):
+        self.assertTrue(scheduler.util.subnet.isFlattened({ 'component' : 'SubNet' }))
+        self.assertFalse(scheduler.util.subnet.isFlattened({ 'component' : 'SubNet',
+                                                             'metadata'  : { 'flatten' : False } }))
+        self.assertFalse(scheduler.util.subnet.isFlattened({ 'component' : 'NoOp' }))
+
+    def test_flatten(self):
+        graph = scheduler.util.subnet.flatten(self.usesSubnet(self.subnetPath))
+        self.assertSetEqual(set(['proc1', 'proc2', 'subnet/proc3', 'subnet/proc4']), set(graph['processes'].keys()))
+        edges = set([ (c['src']['process'], c['src']['port'], c['tgt']['process'], c['tgt']['port']) for c in graph['connections'] ])
+        self.assertSetEqual(set([ ('proc1', 'out', 'subnet/proc3', 'in'),
+                                  ('subnet/proc3', 'out', 'subnet/proc4', 'in'),
+                                  ('subnet/proc4', 'out', 'proc2', 'in') ]), edges)
+
+    def test_flattenNested(self):
+        outerPath = self.write(self.usesSubnet(self.subnetPath), 'outer.json')
+        graph     = scheduler.util.subnet.flatten(self.usesSubnet(outerPath))
+        self.assertSetEqual(set(['proc1', 'proc2', 'subnet/proc1', 'subnet/proc2',
+                                 'subnet/subnet/proc3', 'subnet/subnet/proc4']), set(graph['processes'].keys()))
+        self.assertEqual(5, len(graph['connections']))
+        # Run it: one hop per edge, no relay processes
+        network = scheduler.network.new(graph)
+        scheduler.network.start(network)
+        network['interface']['inports']['IN'][0].send('data')
+        self.assertEqual('data', network['interface']['outports']['OUT'][0].recv())
+        scheduler.network.stop(network)
+
+    def test_flattenOptOut(self):
+        graph = scheduler.util.subnet.flatten(self.usesSubnet(self.subnetPath, metadata={ 'flatten' : False }))
+        self.assertSetEqual(set(['proc1', 'subnet', 'proc2']), set(graph['processes'].keys()))
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_subnet')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+import scheduler.network
+import scheduler.util.editor
+import scheduler.util.trace
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        scheduler.util.trace.disable()
+        shutil.rmtree(self.directory)
+
+    def test_tracer(self):
+        path   = os.path.join(self.directory, 'noop.trace')
+        # A small buffer, so some records are written before close
+        tracer = scheduler.util.trace.Tracer(path, 'noop', ['in'], ['out', 'events'], records=4)
+        tracer.record(scheduler.util.trace.BGIN)
+        for i in range(5):
+            tracer.recv('in', 'x' * i)
+            tracer.send('out', 'x' * i)
+        tracer.record(scheduler.util.trace.END)
+        tracer.close()
+        header, records = scheduler.util.trace.read(path)
+        self.assertEqual({ 'process' : 'noop', 'inports' : ['in'], 'outports' : ['out', 'events'] }, header)
+        self.assertEqual(12, len(records))
+        self.assertEqual(sorted(records), records)
+        lines = [ line for timestamp, line in scheduler.util.trace.decode([path]) ]
+        self.assertEqual('BGIN: noop', lines[0])
+        self.assertEqual('RECV: noop.in = <3 bytes>', lines[7])
+        self.assertEqual('SEND: noop.out = <3 bytes>', lines[8])
+        self.assertEqual('END : noop', lines[-1])
+
+    def test_notATrace(self):
+        path = os.path.join(self.directory, 'other.trace')
+        with open(path, 'w') as f:
+            f.write('hello')
+        self.assertRaises(ValueError, scheduler.util.trace.read, path)
+
+    def test_disabled(self):
+        self.assertEqual(None, scheduler.util.trace.new('noop', ['in'], ['out']))
+
+    def test_network(self):
+        graph = scheduler.util.editor.newGraph()
+        scheduler.util.editor.process(graph, 'noop1', 'NoOp')
+        scheduler.util.editor.process(graph, 'noop2', '_NoOp_')
+        scheduler.util.editor.connection(graph, 'noop1', 'noop2')
+        scheduler.util.editor.export(graph, 'IN', 'noop1', isInport=True)
+        scheduler.util.editor.export(graph, 'OUT', 'noop2', isInport=False)
+        scheduler.util.trace.enable(self.directory)
+        network = scheduler.network.new(graph)
+        scheduler.network.start(network)
+        for i in range(10):
+            network['interface']['inports']['IN'][0].send('x' * i)
+            network['interface']['outports']['OUT'][0].recv()
+        scheduler.network.stop(network)
+        paths = [ os.path.join(self.directory, name) for name in os.listdir(self.directory) ]
+        self.assertEqual(2, len(paths))
+        lines = [ line for timestamp, line in scheduler.util.trace.decode(paths) ]
+        self.assertEqual(1, lines.count('RECV: noop2.in = <9 bytes>'))
+        for name in ['noop1', 'noop2']:
+            self.assertEqual(10, len([ line for line in lines if line.startswith('SEND: {proc}.out'.format(proc=name)) ]))
+            self.assertTrue('END : {proc}'.format(proc=name) in lines)
+
+def suite():
+    suite = unittest.TestLoader().loadTestsFromName('scheduler.util.test.test_trace')
+    return suite
+
+if __name__ == '__main__':
+    suite = suite()
+    suite.debug()
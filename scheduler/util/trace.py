@@ -0,0 +1,251 @@
+import os, sys, json, time, struct, heapq
+from threading import Thread
+from Queue import Queue
+'''
+This module records a binary trace of the IPs that go in and out of each
+process; a cheap alternative to logging every IP at the 'DEBUG' level, which
+calls str() on every IP.
+
+Each process writes its own trace file.  A record is a fixed-size tuple of
+(timestamp, event code, port id, payload size); records are collected in a
+fixed-size buffer and, once it is full, handed to a background thread that
+writes them to disk, so a process never waits on the disk.  decode() turns
+trace files back into the familiar 'BGIN', 'RECV', 'SEND' and 'END ' log
+lines.
+
+Tracing is off until enable() is called; child processes inherit the setting.
+Example:
+    scheduler.util.trace.enable('/tmp/trace')
+    network = scheduler.network.new(graph)
+'''
+
+# Event codes
+BGIN = 1
+RECV = 2
+SEND = 3
+END  = 4
+NAMES = { BGIN : 'BGIN',
+          RECV : 'RECV',
+          SEND : 'SEND',
+          END  : 'END ' }
+
+# A trace file starts with MAGIC, then the length of a JSON header (see
+# Tracer), then the header, then records.
+MAGIC  = 'SCHTRACE'
+LENGTH = struct.Struct('=I')
+RECORD = struct.Struct('=dBHQ') # timestamp, event code, port id, payload size
+# Records held in memory before they are written out
+RECORDS = 4096
+
+# Types whose size needs no look up (see size())
+STRINGS = frozenset([str, unicode, bytearray])
+PLAIN   = frozenset([int, long, float, bool, tuple, list, dict, type(None)])
+
+# The directory trace files are written to; 'None' when tracing is off.
+directory = None
+
+def enable(path):
+    '''
+    Turn on tracing for all processes started after this call.
+
+    Parameters:
+        path - A directory to write trace files to; created if missing.
+    '''
+    global directory
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    directory = path
+
+def disable():
+    '''
+    Turn off tracing for all processes started after this call.
+    '''
+    global directory
+    directory = None
+
+def new(processName, inportNames, outportNames):
+    '''
+    Parameters:
+        processName - The name of the process to trace.
+        inportNames - The names of the in-ports of the process.
+        outportNames - The names of the out-ports of the process.
+    Returns:
+        A Tracer for the given process, writing to a file in the trace
+        directory, or 'None' when tracing is off.
+    '''
+    if directory is None:
+        return None
+    path = os.path.join(directory, '{proc}.{pid}.trace'.format(proc=processName, pid=os.getpid()))
+    return Tracer(path, processName, inportNames, outportNames)
+
+def size(data):
+    '''
+    Parameters:
+        data - an information packet (or data object)
+    Returns:
+        The size, in bytes, of the given IP; without serializing it, so the
+        size of a container does not count what it contains.
+    '''
+    kind = type(data)
+    if kind in STRINGS:
+        return len(data)
+    if kind not in PLAIN:
+        nbytes = getattr(data, 'nbytes', None) # NumPy arrays
+        if nbytes is not None:
+            return nbytes
+    return sys.getsizeof(data)
+
+def writer(f, queue):
+    '''
+    Write chunks of records from the given queue to the given file, until a
+    'None' arrives.
+
+    Parameters:
+        f - A file open for writing.
+        queue - A Queue of strings.
+    '''
+    while True:
+        chunk = queue.get()
+        if chunk is None:
+            break
+        f.write(chunk)
+    f.close()
+
+class Tracer(object):
+    '''
+    Records the events of one process in a trace file.
+    Note: A Tracer is not thread-safe; each process has its own.
+    '''
+    def __init__(self, path, processName, inportNames, outportNames, records=RECORDS):
+        '''
+        Parameters:
+            path - The trace file to write.
+            processName - The name of the process to trace.
+            inportNames - The names of the in-ports of the process.
+            outportNames - The names of the out-ports of the process.
+            records - The number of records held in memory before they are
+                      written out.
+        '''
+        self.path     = path
+        self.inports  = dict( (str(name), i) for i, name in enumerate(inportNames) )
+        self.outports = dict( (str(name), i) for i, name in enumerate(outportNames) )
+        header = json.dumps({ 'process'  : processName,
+                              'inports'  : [ str(name) for name in inportNames ],
+                              'outports' : [ str(name) for name in outportNames ] })
+        f = open(path, 'wb')
+        f.write(MAGIC + LENGTH.pack(len(header)) + header)
+        self.buffer = bytearray(records * RECORD.size)
+        self.offset = 0
+        self.queue  = Queue()
+        self.thread = Thread(target=writer, args=(f, self.queue))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def record(self, event, portId=0, payloadSize=0):
+        '''
+        Record an event.
+
+        Parameters:
+            event - An event code (e.g. RECV).
+            portId - The index of the port of the event.
+            payloadSize - The size, in bytes, of the IP of the event.
+        '''
+        RECORD.pack_into(self.buffer, self.offset, time.time(), event, portId, payloadSize)
+        self.offset += RECORD.size
+        if self.offset == len(self.buffer):
+            self.flush()
+
+    # Note: recv() and send() are called for every IP, so they do the work of
+    #       record() themselves rather than pay for another call.
+    def recv(self, portName, data):
+        '''
+        Record an IP received on the given in-port.
+        '''
+        offset = self.offset
+        RECORD.pack_into(self.buffer, offset, time.time(), RECV, self.inports[portName], size(data))
+        self.offset = offset + RECORD.size
+        if self.offset == len(self.buffer):
+            self.flush()
+
+    def send(self, portName, data):
+        '''
+        Record an IP sent through the given out-port.
+        '''
+        offset = self.offset
+        RECORD.pack_into(self.buffer, offset, time.time(), SEND, self.outports[portName], size(data))
+        self.offset = offset + RECORD.size
+        if self.offset == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        '''
+        Hand the records collected so far to the writer thread.
+        '''
+        if self.offset:
+            self.queue.put(str(self.buffer[:self.offset]))
+            self.offset = 0
+
+    def close(self):
+        '''
+        Write out all records and close the trace file.
+        '''
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+def read(path):
+    '''
+    Parameters:
+        path - A trace file.
+    Returns:
+        A tuple of the form (header, records) where the header is a dict
+        with the keys 'process', 'inports' and 'outports', and the records
+        are a list of (timestamp, event code, port id, payload size) tuples.
+    Exceptions:
+        ValueError - Raised when the given file is not a trace file.
+    '''
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError('Not a trace file: {path}'.format(path=path))
+    offset = len(MAGIC)
+    length, = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    header  = json.loads(data[offset:offset+length])
+    offset += length
+    # A process that was killed may leave a partial record behind
+    end     = offset + (len(data) - offset) // RECORD.size * RECORD.size
+    records = [ RECORD.unpack_from(data, i) for i in xrange(offset, end, RECORD.size) ]
+    return header, records
+
+def line(header, record):
+    '''
+    Parameters:
+        header - The header of a trace file (see read()).
+        record - A record of the same trace file.
+    Returns:
+        The log line for the given record, in the format used by the debug
+        log.  IPs are given by their size.
+    '''
+    timestamp, event, portId, payloadSize = record
+    processName = header['process']
+    if event == RECV:
+        return 'RECV: {proc}.{port} = <{size} bytes>'.format(proc=processName, port=header['inports'][portId], size=payloadSize)
+    if event == SEND:
+        return 'SEND: {proc}.{port} = <{size} bytes>'.format(proc=processName, port=header['outports'][portId], size=payloadSize)
+    return '{event}: {name}'.format(event=NAMES[event], name=processName)
+
+def decode(paths):
+    '''
+    Merge the records of the given trace files in time order.
+
+    Parameters:
+        paths - A list of trace files.
+    Returns:
+        An iterator of (timestamp, log line) tuples.
+    '''
+    traces = []
+    for path in paths:
+        header, records = read(path)
+        traces.append( [ (record[0], line(header, record)) for record in records ] )
+    return heapq.merge(*traces)